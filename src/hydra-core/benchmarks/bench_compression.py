@@ -0,0 +1,82 @@
+"""Benchmark of the response compression.
+
+Compresses the streaming configuration export with every installed
+encoding and prints the size, the time spent compressing, and the time to
+deliver the response at a few link speeds (compression plus transfer).
+Execute explicitly with::
+
+    pytest -s benchmarks/bench_compression.py
+
+The number of records can be changed with ``BENCH_RECORDS``.
+"""
+from datetime import timedelta
+import os
+import time
+
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+import pytest
+
+from hydra_core.middleware import CompressionMiddleware, available_encodings
+from time_reporting import export
+from time_reporting.models import TimeRecord
+from time_reporting.tests.factories import CategoryFactory, ProjectFactory
+
+NUM_RECORDS = int(os.environ.get("BENCH_RECORDS", 100_000))
+BATCH_SIZE = 10_000
+
+# Link speeds in bits per second
+LINKS = {"10 Mbit/s": 10e6, "100 Mbit/s": 100e6, "1 Gbit/s": 1e9}
+
+
+def _populate(project):
+    start = timezone.now() - timedelta(minutes=NUM_RECORDS)
+    for offset in range(0, NUM_RECORDS, BATCH_SIZE):
+        TimeRecord.objects.bulk_create(
+            TimeRecord(
+                project=project,
+                start_time=start + timedelta(minutes=i),
+                stop_time=start + timedelta(minutes=i + 1),
+                approved=bool(i % 2),
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, NUM_RECORDS))
+        )
+
+
+def _compress(chunks, encoding):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=encoding or "")
+    response = StreamingHttpResponse(
+        iter(chunks), content_type="application/json"
+    )
+    response = CompressionMiddleware(lambda request: response)(request)
+    return sum(len(chunk) for chunk in response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_bench_compression(user, settings):
+    _populate(ProjectFactory(category=CategoryFactory(user=user)))
+    # Compression is measured on its own, not together with the export
+    chunks = list(export.iter_config_json())
+
+    print()
+    print(f"{'':<10}{'bytes':>12}{'ratio':>8}{'cpu':>9}", end="")
+    print("".join(f"{link:>12}" for link in LINKS))
+    for encoding in (None, "gzip", "br", "zstd"):
+        name = encoding or "identity"
+        settings.COMPRESSION_ENCODINGS = [encoding] if encoding else []
+        if encoding and not available_encodings():
+            print(f"{name:<10} not installed")
+            continue
+
+        t0 = time.perf_counter()
+        size = _compress(chunks, encoding)
+        elapsed = time.perf_counter() - t0
+
+        ratio = sum(len(chunk) for chunk in chunks) / size
+        print(f"{name:<10}{size:>12}{ratio:>8.1f}{elapsed:>8.3f}s", end="")
+        print(
+            "".join(
+                f"{elapsed + size * 8 / bps:>11.3f}s" for bps in LINKS.values()
+            )
+        )
@@ -0,0 +1,74 @@
+"""Benchmark of ``services.delete_records``.
+
+Compares deleting the same set of records through the deletion collector
+(which is what ``QuerySet.delete()`` falls back to as soon as a delete
+signal receiver is connected), through ``QuerySet.delete()`` and through
+``services.delete_records``. Execute explicitly with::
+
+    pytest -s benchmarks/bench_delete_records.py
+
+The number of records can be changed with ``BENCH_RECORDS``.
+"""
+from datetime import timedelta
+import os
+import time
+
+from django.db.models.signals import pre_delete
+from django.utils import timezone
+import pytest
+
+from time_reporting import daily_totals, rollups, services
+from time_reporting.models import TimeRecord
+from time_reporting.tests.factories import CategoryFactory, ProjectFactory
+
+NUM_RECORDS = int(os.environ.get("BENCH_RECORDS", 1_000_000))
+BATCH_SIZE = 10_000
+
+
+def _populate(project):
+    start = timezone.now() - timedelta(minutes=NUM_RECORDS)
+    for offset in range(0, NUM_RECORDS, BATCH_SIZE):
+        TimeRecord.objects.bulk_create(
+            TimeRecord(
+                project=project,
+                start_time=start + timedelta(minutes=i),
+                stop_time=start + timedelta(minutes=i + 1),
+                approved=True,
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, NUM_RECORDS))
+        )
+    rollups.rebuild([project.pk])
+    daily_totals.rebuild([project.pk])
+
+
+def _noop_receiver(sender, **kwargs):
+    pass
+
+
+def _collector_delete(queryset):
+    pre_delete.connect(_noop_receiver, sender=TimeRecord)
+    try:
+        return queryset.delete()[0]
+    finally:
+        pre_delete.disconnect(_noop_receiver, sender=TimeRecord)
+
+
+@pytest.mark.django_db
+def test_bench_delete_records(user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+
+    print()
+    for name, delete in (
+        ("collector", _collector_delete),
+        ("QuerySet.delete()", lambda qs: qs.delete()[0]),
+        ("delete_records()", services.delete_records),
+    ):
+        _populate(project)
+        queryset = TimeRecord.objects.filter(project__category__user=user)
+
+        t0 = time.perf_counter()
+        deleted = delete(queryset)
+        elapsed = time.perf_counter() - t0
+
+        assert deleted == NUM_RECORDS
+        print(f"{name:<20} {NUM_RECORDS} records in {elapsed:.2f}s")
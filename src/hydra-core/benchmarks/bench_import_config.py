@@ -0,0 +1,120 @@
+"""Benchmark of ``services.import_config``.
+
+Benchmarks are not collected by the regular test run, execute them
+explicitly with::
+
+    pytest -s benchmarks/bench_import_config.py
+
+The number of records can be changed with ``BENCH_RECORDS``.
+"""
+from datetime import timedelta
+import os
+import time
+
+from django.utils import timezone
+import pytest
+
+from time_reporting import services
+from time_reporting.models import TimeRecord
+from time_reporting.tests.factories import CategoryFactory, ProjectFactory
+
+NUM_RECORDS = int(os.environ.get("BENCH_RECORDS", 100_000))
+NUM_PROJECTS = 50
+
+# The row-by-row path is too slow to run for the full data set, its rate
+# is measured on a sample instead.
+LEGACY_SAMPLE = min(NUM_RECORDS, 2_000)
+
+
+def _build_config(user):
+    categories = CategoryFactory.build_batch(5, user=user)
+    for pk, category in enumerate(categories, start=1):
+        category.pk = pk
+
+    projects = ProjectFactory.build_batch(NUM_PROJECTS)
+    for pk, project in enumerate(projects, start=1):
+        project.pk = pk
+        project.category = categories[pk % len(categories)]
+
+    start = timezone.now() - timedelta(hours=NUM_RECORDS)
+    return {
+        "categories": [
+            {
+                "id": c.pk,
+                "user": user.username,
+                "name": c.name,
+                "description": c.description,
+            }
+            for c in categories
+        ],
+        "projects": [
+            {
+                "id": p.pk,
+                "category": p.category.pk,
+                "name": p.name,
+                "description": p.description,
+            }
+            for p in projects
+        ],
+        "time_records": [
+            {
+                "id": i,
+                "project": projects[i % NUM_PROJECTS].pk,
+                "start_time": start + timedelta(hours=i),
+                "stop_time": start + timedelta(hours=i, minutes=45),
+            }
+            for i in range(1, NUM_RECORDS + 1)
+        ],
+    }
+
+
+def _import_row_by_row(config):
+    """The import as it was done before the bulk import engine."""
+    for c in config["categories"]:
+        services.create_category(
+            pk=c["id"],
+            user=services.User.objects.get(username=c["user"]),
+            name=c["name"],
+            description=c["description"],
+        )
+    for p in config["projects"]:
+        services.create_project(
+            pk=p["id"],
+            category=services.Category.objects.get(pk=p["category"]),
+            name=p["name"],
+            description=p["description"],
+        )
+    for r in config["time_records"]:
+        services.create_record(
+            pk=r["id"],
+            project=services.Project.objects.get(pk=r["project"]),
+            start_time=r["start_time"],
+            stop_time=r["stop_time"],
+        )
+
+
+@pytest.mark.django_db
+def test_bench_import_config(user):
+    config = _build_config(user)
+
+    t0 = time.perf_counter()
+    services.import_config(config)
+    elapsed = time.perf_counter() - t0
+
+    assert TimeRecord.objects.count() == NUM_RECORDS
+
+    sample = dict(config, time_records=config["time_records"][:LEGACY_SAMPLE])
+    TimeRecord.objects.all().delete()
+    services.Category.objects.all().delete()
+
+    t0 = time.perf_counter()
+    _import_row_by_row(sample)
+    legacy_elapsed = time.perf_counter() - t0
+
+    rate = NUM_RECORDS / elapsed
+    legacy_rate = LEGACY_SAMPLE / legacy_elapsed
+    print()
+    print(f"bulk import:       {NUM_RECORDS} records in {elapsed:.2f}s")
+    print(f"                   {rate:,.0f} records/s")
+    print(f"row by row import: {legacy_rate:,.0f} records/s (sampled)")
+    print(f"speedup:           {rate / legacy_rate:.1f}x")
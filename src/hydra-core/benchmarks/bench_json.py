@@ -0,0 +1,72 @@
+"""Benchmark of the JSON renderer and parser.
+
+Renders the serialized configuration, the largest response of the API,
+and parses it again like the configuration import does, once with DRF's
+``JSONRenderer`` and ``JSONParser`` and once with the ones in
+``hydra_core``. Execute explicitly with::
+
+    pytest -s benchmarks/bench_json.py
+
+The number of records can be changed with ``BENCH_RECORDS``.
+"""
+from datetime import timedelta
+import io
+import os
+import time
+
+from django.utils import timezone
+import pytest
+from rest_framework import parsers, renderers
+
+from hydra_core.parsers import JSONParser
+from hydra_core.renderers import JSONRenderer
+from time_reporting.models import TimeRecord
+from time_reporting.tests.factories import CategoryFactory, ProjectFactory
+from time_reporting.tests.test_export import serialize_config
+
+NUM_RECORDS = int(os.environ.get("BENCH_RECORDS", 100_000))
+BATCH_SIZE = 10_000
+
+
+def _populate(project):
+    start = timezone.now() - timedelta(minutes=NUM_RECORDS)
+    for offset in range(0, NUM_RECORDS, BATCH_SIZE):
+        TimeRecord.objects.bulk_create(
+            TimeRecord(
+                project=project,
+                start_time=start + timedelta(minutes=i),
+                stop_time=start + timedelta(minutes=i + 1),
+                approved=bool(i % 2),
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, NUM_RECORDS))
+        )
+
+
+def _timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - t0
+
+
+@pytest.mark.django_db
+def test_bench_json(user):
+    _populate(ProjectFactory(category=CategoryFactory(user=user)))
+    data = serialize_config()
+
+    print()
+    contents = set()
+    for name, renderer, parser in (
+        ("rest_framework", renderers.JSONRenderer(), parsers.JSONParser()),
+        ("hydra_core", JSONRenderer(), JSONParser()),
+    ):
+        content, render_time = _timed(renderer.render, data)
+        parsed, parse_time = _timed(parser.parse, io.BytesIO(content))
+        contents.add(content)
+
+        assert len(parsed["time_records"]) == NUM_RECORDS
+        print(
+            f"{name:<15} {NUM_RECORDS} records: "
+            f"render {render_time:.3f}s, parse {parse_time:.3f}s"
+        )
+
+    assert len(contents) == 1
@@ -0,0 +1,73 @@
+"""Benchmark of the JSON output of time records.
+
+Compares rendering records with ``TimeRecordList.OutputSerializer`` and
+DRF's ``JSONRenderer`` to writing them with ``export.dump_time_records``,
+both including fetching the rows. Execute explicitly with::
+
+    pytest -s benchmarks/bench_serialize_records.py
+
+The number of records can be changed with ``BENCH_RECORDS``.
+"""
+from datetime import timedelta
+import os
+import time
+
+from django.utils import timezone
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from time_reporting import export
+from time_reporting.models import TimeRecord
+from time_reporting.tests.factories import CategoryFactory, ProjectFactory
+from time_reporting.views import TimeRecordList
+
+NUM_RECORDS = int(os.environ.get("BENCH_RECORDS", 100_000))
+BATCH_SIZE = 10_000
+
+
+def _populate(project):
+    start = timezone.now() - timedelta(minutes=NUM_RECORDS)
+    for offset in range(0, NUM_RECORDS, BATCH_SIZE):
+        TimeRecord.objects.bulk_create(
+            TimeRecord(
+                project=project,
+                start_time=start + timedelta(minutes=i, microseconds=i),
+                stop_time=(
+                    start + timedelta(minutes=i + 1) if i % 10 else None
+                ),
+                approved=bool(i % 2),
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, NUM_RECORDS))
+        )
+
+
+def _serializer(queryset) -> bytes:
+    serializer = TimeRecordList.OutputSerializer(queryset, many=True)
+    return JSONRenderer().render(serializer.data)
+
+
+def _fast(queryset) -> bytes:
+    rows = queryset.values_list(*export.TIME_RECORD_FIELDS)
+    return export.dump_time_records(rows).content
+
+
+@pytest.mark.django_db
+def test_bench_serialize_records(user):
+    _populate(ProjectFactory(category=CategoryFactory(user=user)))
+    queryset = TimeRecord.objects.order_by("start_time", "id")
+
+    print()
+    results = {}
+    for name, render in (
+        ("OutputSerializer", _serializer),
+        ("dump_time_records()", _fast),
+    ):
+        t0 = time.perf_counter()
+        results[name] = render(queryset.all())
+        elapsed = time.perf_counter() - t0
+        print(
+            f"{name:<20} {NUM_RECORDS} records in {elapsed:.2f}s "
+            f"({NUM_RECORDS / elapsed:,.0f} records/s)"
+        )
+
+    assert len(set(results.values())) == 1
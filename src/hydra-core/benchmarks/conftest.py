@@ -0,0 +1,3 @@
+from hydra_core.tests.conftest import clear_caches, client, user
+
+__all__ = ("clear_caches", "client", "user")
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class HydraCoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "hydra_core"
+
+    def ready(self):
+        # Connect the receivers evicting cached tokens
+        from . import auth  # noqa: F401 pylint: disable=unused-import
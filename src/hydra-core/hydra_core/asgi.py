@@ -7,10 +7,46 @@ For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
+import contextvars
 import os
 
-from django.core.asgi import get_asgi_application
+from asgiref.sync import sync_to_async
+import django
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
+
+from hydra_core.events import EventStreamResponse
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hydra_core.settings")
 
+_receive: contextvars.ContextVar = contextvars.ContextVar("receive")
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """Django's ASGI handler, which also keeps event streams open.
+
+    Requests go through the middleware and views as usual. When the view
+    returns an ``EventStreamResponse``, the events published for it are
+    sent until the client disconnects.
+    """
+
+    async def handle(self, scope, receive, send):
+        _receive.set(receive)
+        await super().handle(scope, receive, send)
+
+    async def send_response(self, response, send):
+        if not isinstance(response, EventStreamResponse):
+            await super().send_response(response, send)
+            return
+
+        try:
+            await response.stream(send, _receive.get())
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return ASGIHandler()
+
+
 application = get_asgi_application()
@@ -1,21 +1,111 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import logging
 
 from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth import login as django_login
+from django.core.cache import caches
 from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as __
+from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework.request import Request
 
 from time_reporting.models import TimeRecord
+from time_reporting.services import delete_records
+
+from .cache import LocalCache
 
 log = logging.getLogger(__name__)
 User = get_user_model()
 
+_local_token_cache = LocalCache(
+    maxsize=settings.TOKEN_CACHE_LOCAL_SIZE,
+    ttl=settings.TOKEN_CACHE_LOCAL_TTL,
+)
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """Token authentication which caches the token to user mapping.
+
+    Successful lookups are kept in a small in-process LRU cache, so that
+    authenticated requests don't have to query the database. The shared
+    cache only keeps the id of the user and whether it is active, never the
+    user itself; on a miss of the local cache, the user is loaded by its
+    primary key. Cached entries are evicted when the token is deleted or its
+    user is saved or deleted, the in-process cache of other processes
+    expires within ``settings.TOKEN_CACHE_LOCAL_TTL`` seconds.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = _token_cache_key(key)
+
+        user = _local_token_cache.get(cache_key)
+        if user is None:
+            shared_cache = caches["redis"]
+            cached = shared_cache.get(cache_key)
+            if cached is None:
+                user, _ = super().authenticate_credentials(key)
+                shared_cache.set(
+                    cache_key,
+                    (user.pk, user.is_active),
+                    timeout=settings.TOKEN_CACHE_TIMEOUT,
+                )
+            else:
+                user_id, is_active = cached
+                if not is_active:
+                    raise AuthenticationFailed(__("User inactive or deleted."))
+                user = User.objects.filter(pk=user_id).first()
+                if user is None:
+                    raise AuthenticationFailed(__("Invalid token."))
+            _local_token_cache.set(cache_key, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(__("User inactive or deleted."))
+
+        user = copy.copy(user)
+        return (user, Token(key=key, user=user))
+
+
+def evict_token(key: str):
+    """Remove a token from the authentication caches."""
+    cache_key = _token_cache_key(key)
+    _local_token_cache.delete(cache_key)
+    caches["redis"].delete(cache_key)
+
+
+@receiver(post_delete, sender=Token)
+def _evict_deleted_token(sender, instance, **kwargs):
+    _evict_on_commit(instance.key)
+
+
+@receiver(post_save, sender=User)
+def _evict_saved_user(sender, instance, created, **kwargs):
+    # The cached user may be deactivated or otherwise outdated
+    if not created:
+        tokens = Token.objects.filter(user=instance)
+        for key in tokens.values_list("key", flat=True):
+            _evict_on_commit(key)
+
+
+def _evict_on_commit(key: str):
+    # Evict right away for readers in this process and once more after
+    # commit, in case another process has cached the token before the
+    # transaction was committed.
+    evict_token(key)
+    transaction.on_commit(lambda: evict_token(key))
+
+
+def _token_cache_key(key: str) -> str:
+    # Don't keep the plain text tokens in the cache
+    return "hydra:token:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
 
 @transaction.atomic
 def create_user(
@@ -42,6 +132,17 @@ def create_user(
     return user
 
 
+@transaction.atomic
+def rotate_token(user: settings.AUTH_USER_MODEL) -> Token:
+    """Replace the API token of ``user`` with a newly generated one."""
+
+    Token.objects.filter(user=user).delete()
+    token = Token.objects.create(user=user)
+    log.info("Rotated API token for user %s", user.username)
+
+    return token
+
+
 def login_user(
     request: Request, username: str, password: str
 ) -> settings.AUTH_USER_MODEL:
@@ -74,7 +175,8 @@ def delete_user(username: str, request: Request | None = None):
     log.info("Deleting user %s", username)
 
     user = User.objects.filter(username=username).last()
+
     # Explicitly delete records for the user, since they are normally
     # protected
-    TimeRecord.objects.filter(project__category__user=user).delete()
+    delete_records(TimeRecord.objects.filter(project__category__user=user))
     user.delete()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Hashable
+import weakref
+
+__all__ = ("LocalCache", "clear_local_caches")
+
+_registry: weakref.WeakSet[LocalCache] = weakref.WeakSet()
+
+
+class LocalCache:
+    """Thread-safe, in-process LRU cache whose entries expire after ``ttl``.
+
+    Meant to sit in front of the shared (Redis) cache for values which are
+    read on every request, saving the network round trip. Since an entry
+    can't be invalidated in other processes, ``ttl`` bounds how long they
+    may keep serving a stale value and should be kept short.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        _registry.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def clear_local_caches():
+    """Empty every ``LocalCache`` in this process."""
+    for cache in list(_registry):
+        cache.clear()
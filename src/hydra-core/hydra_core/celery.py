@@ -19,4 +19,11 @@ app.conf.beat_schedule = {
             "expires": timedelta(days=1).total_seconds(),
         },
     },
+    "purge_changes": {
+        "task": "time_reporting.tasks.purge_changes",
+        "schedule": timedelta(days=1),
+        "options": {
+            "expires": timedelta(days=1).total_seconds(),
+        },
+    },
 }
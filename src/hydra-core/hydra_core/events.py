@@ -0,0 +1,355 @@
+"""Events pushed to the clients connected to ``/v1/stream/``.
+
+Services publish an event for every user whose data they change, once
+their transaction has committed. The stream view answers with an
+``EventStreamResponse``, which the ASGI handler (see ``hydra_core.asgi``)
+keeps open: it subscribes to the events of the user and forwards them to
+the client as server-sent events until the client disconnects. Served over
+WSGI, the response ends right away and the client reconnects after
+``settings.EVENTS_RETRY`` milliseconds, which amounts to polling.
+
+Events are relayed by a broker. The local broker only reaches the clients
+connected to the publishing process, which is enough for tests and for a
+single ASGI worker. The Redis broker publishes on the server of the
+``redis`` cache, every process listens to all channels and forwards the
+events to its own subscribers.
+
+Clients must not rely on receiving every event. Whenever a stream opens,
+it has been subscribed before the response starts, so a client which
+fetches what it missed once the stream is open doesn't miss anything
+after that. A subscriber which falls behind, or whose broker lost its
+connection, has its stream closed and reconnects.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+import json
+import logging
+import threading
+import time
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django_redis import get_redis_connection
+
+__all__ = (
+    "EventStreamResponse",
+    "LocalBroker",
+    "RedisBroker",
+    "Subscription",
+    "event",
+    "get_broker",
+    "publish",
+    "user_channel",
+)
+
+log = logging.getLogger(__name__)
+
+_CHANNEL_PREFIX = "hydra:events:"
+_KEEPALIVE = b": keepalive\n\n"
+
+_brokers: dict[str, LocalBroker] = {}
+_brokers_lock = threading.Lock()
+
+
+def event(name: str, data: Any) -> bytes:
+    """Encode an event in the ``text/event-stream`` format."""
+    data = json.dumps(data, separators=(",", ":"))
+    return f"event: {name}\ndata: {data}\n\n".encode("utf-8")
+
+
+def publish(events: Iterable[tuple[int, bytes]]):
+    """Publish ``(user_id, event)`` pairs once the transaction commits.
+
+    The events of each user are sent as a single message, in order.
+    """
+    messages = defaultdict(list)
+    for user_id, data in events:
+        messages[user_id].append(data)
+    if messages:
+        transaction.on_commit(lambda: _publish(messages))
+
+
+def get_broker() -> LocalBroker:
+    """Return the broker of this process selected by
+    ``settings.EVENTS_BROKER``.
+    """
+    name = settings.EVENTS_BROKER
+    with _brokers_lock:
+        if name not in _brokers:
+            _brokers[name] = _BROKERS[name]()
+        return _brokers[name]
+
+
+class EventStreamResponse(HttpResponse):
+    """Response opening the event stream of ``channel``.
+
+    The content holds the events sent when the stream opens, the events
+    published on the channel follow as long as the connection stays open.
+    """
+
+    def __init__(self, channel: str, content: bytes = b"", **kwargs):
+        retry = f"retry: {settings.EVENTS_RETRY}\n\n".encode("ascii")
+        super().__init__(
+            retry + content, content_type="text/event-stream", **kwargs
+        )
+        self.channel = channel
+        self["Cache-Control"] = "no-cache"
+        # Keep reverse proxies from buffering the events
+        self["X-Accel-Buffering"] = "no"
+
+    async def stream(self, send, receive):
+        """Send the response over ASGI, followed by the events published
+        on the channel until the client disconnects.
+        """
+        disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+        subscription = await get_broker().subscribe(self.channel)
+        next_message = None
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": _headers(self),
+                }
+            )
+            await _send_body(send, self.content)
+
+            while True:
+                if next_message is None:
+                    next_message = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait(
+                    {next_message, disconnected},
+                    timeout=settings.EVENTS_KEEPALIVE,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected in done:
+                    return
+                if next_message in done:
+                    message, next_message = next_message.result(), None
+                    if message is None:
+                        break
+                    await _send_body(send, message)
+                else:
+                    await _send_body(send, _KEEPALIVE)
+
+            await send({"type": "http.response.body"})
+        finally:
+            subscription.close()
+            disconnected.cancel()
+            if next_message is not None:
+                next_message.cancel()
+
+
+class Subscription:
+    """The messages published on ``channel`` after subscribing.
+
+    Messages may be put from any thread, they are handed to the event loop
+    of the subscriber. The subscription is closed once the subscriber falls
+    more than ``settings.EVENTS_QUEUE_SIZE`` messages behind.
+    """
+
+    def __init__(
+        self,
+        broker: LocalBroker,
+        channel: str,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        self.broker = broker
+        self.channel = channel
+        self._loop = loop
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._closed = False
+
+    async def get(self) -> bytes | None:
+        """Wait for the next message, ``None`` once the subscription is
+        closed.
+        """
+        if self._closed and self._queue.empty():
+            return None
+        return await self._queue.get()
+
+    def put(self, message: bytes):
+        self._call(self._put, message)
+
+    def close(self):
+        """Stop receiving messages, ``get`` returns the pending ones."""
+        self.broker.unsubscribe(self)
+        self._call(self._close)
+
+    def _call(self, callback, *args):
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # The event loop of the subscriber is gone
+            self.broker.unsubscribe(self)
+
+    def _put(self, message: bytes):
+        if self._closed:
+            return
+        if self._queue.qsize() >= settings.EVENTS_QUEUE_SIZE:
+            log.info(
+                "Closing subscription to %s, too far behind", self.channel
+            )
+            self.close()
+            return
+        self._queue.put_nowait(message)
+
+    def _close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(None)
+
+
+class LocalBroker:
+    """Relays messages to the subscribers of this process."""
+
+    def __init__(self):
+        self._subscriptions: defaultdict[str, set[Subscription]]
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: bytes):
+        self.deliver(channel, message)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def deliver(self, channel: str, message: bytes):
+        """Hand ``message`` to the subscribers of ``channel``."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    def close_all(self):
+        with self._lock:
+            subscriptions = [
+                s for subs in self._subscriptions.values() for s in subs
+            ]
+        for subscription in subscriptions:
+            subscription.close()
+
+
+class RedisBroker(LocalBroker):
+    """Relays messages through Redis pub/sub, using the connection of the
+    ``redis`` cache.
+
+    A thread of every subscribing process listens to all event channels and
+    delivers the messages to the local subscribers. When its connection
+    breaks, all subscriptions are closed, since messages may have been
+    lost, and the thread reconnects.
+    """
+
+    alias = "redis"
+    reconnect_delay = 1.0
+
+    def __init__(self):
+        super().__init__()
+        self._ready = threading.Event()
+        self._listener: threading.Thread | None = None
+
+    def publish(self, channel: str, message: bytes):
+        connection = get_redis_connection(self.alias)
+        connection.publish(_CHANNEL_PREFIX + channel, message)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = await super().subscribe(channel)
+        self._start()
+        if self._ready.is_set():
+            return subscription
+
+        ready = await asyncio.to_thread(
+            self._ready.wait, settings.EVENTS_KEEPALIVE
+        )
+        if not ready:
+            # Let the client retry later rather than missing events
+            subscription.close()
+        return subscription
+
+    def _start(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="hydra-events", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis_connection(self.alias).pubsub()
+                pubsub.psubscribe(_CHANNEL_PREFIX + "*")
+                for message in pubsub.listen():
+                    if message["type"] == "psubscribe":
+                        self._ready.set()
+                    elif message["type"] == "pmessage":
+                        channel = message["channel"].decode("utf-8")
+                        self.deliver(
+                            channel.removeprefix(_CHANNEL_PREFIX),
+                            message["data"],
+                        )
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Lost the connection to the event broker")
+            finally:
+                self._ready.clear()
+                self.close_all()
+                if pubsub is not None:
+                    pubsub.close()
+            time.sleep(self.reconnect_delay)
+
+
+_BROKERS = {"local": LocalBroker, "redis": RedisBroker}
+
+
+def user_channel(user_id: int) -> str:
+    """Return the channel of the events of the user."""
+    return f"user:{user_id}"
+
+
+def _publish(messages: dict[int, list[bytes]]):
+    broker = get_broker()
+    for user_id, data in messages.items():
+        try:
+            broker.publish(user_channel(user_id), b"".join(data))
+        except Exception:  # pylint: disable=broad-except
+            # The data is committed, the clients catch up once they
+            # reconnect
+            log.exception("Failed to publish the events of %s", user_id)
+
+
+async def _wait_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _send_body(send, body: bytes):
+    await send({"type": "http.response.body", "body": body, "more_body": True})
+
+
+def _headers(response: HttpResponse) -> list[tuple[bytes, bytes]]:
+    headers = [
+        (name.encode("ascii"), value.encode("latin1"))
+        for name, value in response.items()
+        if name.lower() != "content-length"
+    ]
+    for cookie in response.cookies.values():
+        headers.append(
+            (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+        )
+    return headers
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+
+from hydra_core.auth import rotate_token
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Replaces the API token of a user"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", type=str, required=True)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError("User %(username)s does not exist" % options)
+
+        token = rotate_token(user)
+
+        self.stdout.write(token.key)
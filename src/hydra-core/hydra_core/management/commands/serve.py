@@ -1,5 +1,5 @@
 """
-Django admin waitress integration.
+Django admin waitress and uvicorn integration.
 """
 
 from django.conf import settings
@@ -9,12 +9,18 @@ import environ
 from paste.translogger import TransLogger
 import waitress
 
+from hydra_core.prefork import PreforkServer
+
 env = environ.Env()
 
 DEFAULT_LISTEN_ADDRESS = env("LISTEN_ADDRESS", default="127.0.0.1:8000")
 DEFAULT_THREADS = env(
     "THREADS", default=waitress.adjustments.Adjustments.threads
 )
+DEFAULT_WORKERS = env.int("WORKERS", default=1)
+DEFAULT_MAX_REQUESTS = env.int("MAX_REQUESTS", default=0)
+DEFAULT_GRACEFUL_TIMEOUT = env.int("GRACEFUL_TIMEOUT", default=30)
+DEFAULT_ASGI = env.bool("ASGI", default=False)
 
 
 class Command(BaseCommand):
@@ -22,19 +28,53 @@ class Command(BaseCommand):
     Starts a new server listening on the supplied listen address.
 
     Args:
+        --asgi: Serve the ASGI application with uvicorn
         --threads: The number of threads
+        --workers: The number of worker processes
+        --max-requests: Restart workers after this many requests
+        --graceful-timeout: Seconds given to workers to finish requests
         listen-address: The listen address and port
     """
 
     help = "Starts a production-ready web server"
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            default=DEFAULT_ASGI,
+            help="Serve the ASGI application using uvicorn",
+        )
         parser.add_argument(
             "--threads",
             type=int,
             default=DEFAULT_THREADS,
             help=f"Number of threads (default: {DEFAULT_THREADS}",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f"Number of worker processes (default: {DEFAULT_WORKERS})",
+        )
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=DEFAULT_MAX_REQUESTS,
+            help=(
+                "Restart a worker process after it has handled this many "
+                f"requests, 0 to disable (default: {DEFAULT_MAX_REQUESTS})"
+            ),
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=int,
+            default=DEFAULT_GRACEFUL_TIMEOUT,
+            help=(
+                "Seconds workers get to finish their requests when stopping "
+                f"(default: {DEFAULT_GRACEFUL_TIMEOUT})"
+            ),
+        )
         parser.add_argument(
             "listen-address",
             nargs="?",
@@ -49,22 +89,66 @@ class Command(BaseCommand):
                 "You must set settings.ALLOWED_HOSTS if DEBUG is false."
             )
 
+        if options["workers"] < 1:
+            raise CommandError("The number of workers must be at least 1.")
+
         if settings.DEBUG:
             self.stdout.write(
                 "Warning! Never run with DEBUG enabled in production!",
                 style_func=self.style.ERROR,
             )
 
+        if options["asgi"]:
+            self.stdout.write(
+                f"ASGI server listening on http://{options['listen-address']} "
+                f"using {options['workers']} workers"
+            )
+            self.serve_asgi(options)
+            return
+
         self.stdout.write(
             f"Server listening on http://{options['listen-address']} "
-            f"using {options['threads']} threads"
+            f"using {options['workers']} workers "
+            f"with {options['threads']} threads"
         )
 
-        application = get_wsgi_application()
+        application = TransLogger(get_wsgi_application())
+
+        if options["workers"] == 1 and not options["max_requests"]:
+            waitress.serve(
+                application,
+                listen=options["listen-address"],
+                threads=options["threads"],
+                _quiet=True,
+            )
+            return
 
-        waitress.serve(
-            TransLogger(application),
+        server = PreforkServer(
+            application,
             listen=options["listen-address"],
+            workers=options["workers"],
             threads=options["threads"],
-            _quiet=True,
+            max_requests=options["max_requests"],
+            graceful_timeout=options["graceful_timeout"],
+        )
+        server.run()
+
+    def serve_asgi(self, options):
+        import uvicorn  # pylint: disable=import-outside-toplevel
+
+        host, _, port = options["listen-address"].rpartition(":")
+        if not host or not port.isdigit():
+            raise CommandError(
+                "The listen address must be in the format host:port."
+            )
+
+        uvicorn.run(
+            "hydra_core.asgi:application",
+            host=host.strip("[]"),
+            port=int(port),
+            workers=options["workers"],
+            limit_max_requests=options["max_requests"] or None,
+            timeout_graceful_shutdown=options["graceful_timeout"],
+            lifespan="off",
+            log_config=None,
         )
@@ -0,0 +1,195 @@
+"""Compression of responses, negotiated with ``Accept-Encoding``.
+
+gzip is always available. zstd and brotli are offered when ``zstandard``
+and ``brotli`` are installed (``pip install hydra-core[fast]``). Streaming
+responses are compressed chunk by chunk, flushing the compressor after
+every chunk so the client keeps receiving data while the rows are read.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Iterable, Iterator, Protocol
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+__all__ = ("CompressionMiddleware", "available_encodings", "negotiate")
+
+# Event streams are left alone, the ASGI handler keeps appending to them
+_COMPRESSIBLE = re.compile(
+    r"^(text/(?!event-stream)|application/(json|javascript|xml)"
+    r"|[^;]*\+(json|xml))",
+    re.I,
+)
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+    def finish(self) -> bytes:
+        ...
+
+
+class _GzipCompressor:
+    def __init__(self):
+        # wbits 31 writes the gzip header and trailer
+        self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _ZstdCompressor:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        # Quality 4 is the usual trade-off for dynamic content, the
+        # default of 11 is meant for static files.
+        self._obj = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+_COMPRESSORS: dict[str, Callable[[], Compressor]] = {"gzip": _GzipCompressor}
+if zstandard is not None:
+    _COMPRESSORS["zstd"] = _ZstdCompressor
+if brotli is not None:
+    _COMPRESSORS["br"] = _BrotliCompressor
+
+
+def available_encodings() -> list[str]:
+    """Return the configured encodings which are installed, preferred
+    encoding first.
+    """
+    return [e for e in settings.COMPRESSION_ENCODINGS if e in _COMPRESSORS]
+
+
+def negotiate(accept_encoding: str, encodings: Iterable[str]) -> str | None:
+    """Pick the encoding of the response from ``encodings``.
+
+    The encoding with the highest quality in ``accept_encoding`` is picked,
+    among equal ones the first of ``encodings``. ``None`` means the response
+    is sent as it is.
+    """
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+
+    if "x-gzip" in qualities:
+        qualities.setdefault("gzip", qualities["x-gzip"])
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with the best encoding the client accepts.
+
+    Bodies smaller than ``settings.COMPRESSION_MIN_SIZE`` are sent as they
+    are, compressing them would save next to nothing. Streaming responses
+    are always compressed, their size isn't known up front.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not _COMPRESSIBLE.match(response.get("Content-Type", "")):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = negotiate(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""),
+            available_encodings(),
+        )
+        if encoding is None:
+            return response
+
+        compressor = _COMPRESSORS[encoding]()
+        if response.streaming:
+            response.streaming_content = _compress_stream(
+                response.streaming_content, compressor
+            )
+            del response["Content-Length"]
+        else:
+            content = compressor.compress(response.content)
+            response.content = content + compressor.finish()
+            response["Content-Length"] = str(len(response.content))
+
+        # The compressed body is no longer the one a strong ETag identified
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+
+        response["Content-Encoding"] = encoding
+        return response
+
+
+def _compress_stream(
+    chunks: Iterable[bytes], compressor: Compressor
+) -> Iterator[bytes]:
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
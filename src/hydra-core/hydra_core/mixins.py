@@ -1,22 +1,39 @@
 from __future__ import annotations
 
+import asyncio
 from collections import defaultdict
+import hashlib
 from typing import DefaultDict, List
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
 import pydantic
+from rest_framework import status
 from rest_framework.exceptions import (
     APIException,
     ErrorDetail,
     PermissionDenied,
     ValidationError,
 )
+from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from hydra_core import versions
 from hydra_core.exceptions import Http409
 
-__all__ = ("ExceptionHandlerMixin",)
+__all__ = (
+    "AsyncAPIViewMixin",
+    "ConditionalGetMixin",
+    "ExceptionHandlerMixin",
+)
 
 
 ConflictDetail = DefaultDict[str, List[ErrorDetail]]
@@ -78,6 +95,117 @@ class ExceptionHandlerMixin:
         return exc
 
 
+class NotModified(Exception):
+    pass
+
+
+class ConditionalGetMixin(APIView):
+    """Mixin that answers conditional GET and HEAD requests.
+
+    Views which set ``conditional_get`` only return data of the requesting
+    user, so their responses are identified by the user's change marker
+    (see ``hydra_core.versions``). The ETag is derived from it, and
+    requests whose ``If-None-Match`` still matches are answered with "304
+    Not Modified" right after authentication, before the handler runs.
+
+    No Last-Modified header is sent: a date only has a precision of one
+    second, so a client could miss a change made later in the same second.
+    """
+
+    conditional_get = False
+
+    etag: str | None = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self.etag = None
+        if not self.conditional_get or request.method not in ("GET", "HEAD"):
+            return
+
+        token = versions.get_version(request.user.pk)
+        digest = hashlib.sha1(
+            ":".join(
+                (settings.APP_VERSION, token, request.accepted_media_type)
+            ).encode("utf-8")
+        ).hexdigest()
+        self.etag = "W/" + quote_etag(digest)
+
+        if get_conditional_response(request._request, etag=self.etag):
+            raise NotModified()
+
+    def handle_exception(self, exc: Exception) -> Response:
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.etag is not None and response.status_code in (200, 304):
+            response["ETag"] = self.etag
+            # Clients must revalidate their per-user copy on every use
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Accept", "Authorization"))
+        return response
+
+
+class AsyncAPIViewMixin(GenericAPIView):
+    """Mixin that turns a Django REST Framework view into an async view.
+
+    Authentication, permission and throttling checks are run in a worker
+    thread, after which ``async def`` handlers are awaited on the event loop.
+    Handlers which are not coroutine functions are run in a worker thread as
+    well, so read handlers can be made async while the view keeps its
+    regular, synchronous write handlers.
+
+    Served over ASGI, a request which is waiting on the database or on the
+    client doesn't hold on to a thread. Served over WSGI, Django runs the
+    view in an event loop of its own.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            method = request.method.lower()
+            handler = self.http_method_not_allowed
+            if method in self.http_method_names:
+                handler = getattr(self, method, None) or handler
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(
+                    request, *args, **kwargs
+                )
+
+        except Exception as exc:  # pylint: disable=broad-except
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def apaginate_queryset(self, queryset):
+        """Async version of ``GenericAPIView.paginate_queryset``."""
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+
 def _get_first_matching_attr(obj, *attrs, default=None):
     """Return the value of the attribute that's first found in obj.
 
@@ -1,5 +1,17 @@
+import copy
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import caches
+from django.db import models, transaction
+
+from .cache import LocalCache
+
+ACTIVE_SETTINGS_CACHE_KEY = "hydra:settings:active"
+
+_local_settings_cache = LocalCache(
+    maxsize=1, ttl=settings.SETTINGS_CACHE_LOCAL_TTL
+)
 
 
 class User(AbstractUser):
@@ -8,7 +20,31 @@ class User(AbstractUser):
 
 class SettingsQuerySet(models.QuerySet):
     def active(self):
-        return self.last()
+        """Return the active settings.
+
+        The result is cached in the shared cache as well as in a short lived
+        in-process cache, so that reading the settings doesn't normally
+        need a round trip to the database (or even Redis).
+        """
+        active = _local_settings_cache.get(ACTIVE_SETTINGS_CACHE_KEY)
+        if active is None:
+            shared_cache = caches["redis"]
+            active = shared_cache.get(ACTIVE_SETTINGS_CACHE_KEY)
+            if active is None:
+                active = self.last()
+                shared_cache.set(
+                    ACTIVE_SETTINGS_CACHE_KEY,
+                    active,
+                    timeout=settings.SETTINGS_CACHE_TIMEOUT,
+                )
+            _local_settings_cache.set(ACTIVE_SETTINGS_CACHE_KEY, active)
+
+        # Hand out a copy, callers are free to modify what they get
+        return copy.copy(active)
+
+    def invalidate_cache(self):
+        _local_settings_cache.delete(ACTIVE_SETTINGS_CACHE_KEY)
+        caches["redis"].delete(ACTIVE_SETTINGS_CACHE_KEY)
 
 
 class Settings(models.Model):
@@ -18,3 +54,12 @@ class Settings(models.Model):
     align_timestamps = models.BooleanField(default=False)
 
     created = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        # Invalidate right away for readers in this process and once more
+        # after commit, in case another process has cached the old settings
+        # before the transaction was committed.
+        Settings.objects.invalidate_cache()
+        transaction.on_commit(Settings.objects.invalidate_cache)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import json
+from typing import Any, Sequence
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils.translation import gettext_lazy as __
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+__all__ = ("KeysetPagination",)
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (a.k.a. "seek") pagination over a unique ordering.
+
+    Rather than skipping ``OFFSET`` rows, every page is fetched with a
+    ``WHERE (a, b) > (x, y)`` condition on the view's ``ordering``, so the
+    cost of a page does not depend on how deep into the result set it is.
+    The position is handed to the client as an opaque cursor.
+
+    Pagination is only applied when a page size is in effect, either from
+    the ``page_size`` query parameter or from ``settings.RECORD_PAGE_SIZE``,
+    so existing clients keep receiving the complete list.
+
+    The exact ``X-Result-Count`` can be skipped by passing ``count=false``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+
+    invalid_cursor_message = __("Invalid cursor")
+
+    def __init__(self):
+        self.request: Request | None = None
+        self.ordering: Sequence[str] = ()
+        self.next_cursor: str | None = None
+        self.count: int | None = None
+
+    @property
+    def default_page_size(self) -> int:
+        return settings.RECORD_PAGE_SIZE
+
+    @property
+    def max_page_size(self) -> int:
+        return settings.RECORD_MAX_PAGE_SIZE
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ):
+        page_size = self.prepare(request, view)
+
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        queryset = self.seek_queryset(queryset, request)
+
+        if not page_size:
+            return list(queryset)
+
+        # Fetch one extra row to find out whether there is a next page.
+        return self.get_page(list(queryset[: page_size + 1]), page_size)
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ):
+        """Async version of ``paginate_queryset``, using the async ORM."""
+        page_size = self.prepare(request, view)
+
+        if self.wants_count(request):
+            self.count = await queryset.acount()
+        else:
+            self.count = None
+
+        queryset = self.seek_queryset(queryset, request)
+
+        if not page_size:
+            return [obj async for obj in queryset]
+
+        page = [obj async for obj in queryset[: page_size + 1]]
+        return self.get_page(page, page_size)
+
+    def prepare(self, request: Request, view=None) -> int:
+        """Reset the paginator for ``request`` and return the page size."""
+        self.request = request
+        self.ordering = tuple(getattr(view, "ordering", None) or ("pk",))
+        self.next_cursor = None
+
+        return self.get_page_size(request)
+
+    def seek_queryset(self, queryset: QuerySet, request: Request) -> QuerySet:
+        """Order ``queryset`` and skip the rows up to the cursor."""
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position = self.decode_cursor(queryset, cursor)
+            queryset = queryset.filter(self.seek(position))
+
+        return queryset
+
+    def get_page(self, rows: list, page_size: int) -> list:
+        """Trim the extra row fetched past the page and set the cursor."""
+        if len(rows) <= page_size:
+            return rows
+
+        page = rows[:page_size]
+        self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(data=data, headers=self.get_headers())
+
+    def get_headers(self) -> dict[str, Any]:
+        headers: dict[str, Any] = {}
+
+        if self.count is not None:
+            headers["X-Result-Count"] = self.count
+
+        if self.next_cursor is not None:
+            headers["X-Next-Cursor"] = self.next_cursor
+            headers["Link"] = f'<{self.get_next_link()}>; rel="next"'
+
+        return headers
+
+    def get_next_link(self) -> str:
+        assert self.request is not None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.next_cursor
+        )
+
+    def get_page_size(self, request: Request) -> int:
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.default_page_size
+
+        try:
+            page_size = int(value)
+        except ValueError:
+            page_size = 0
+
+        if page_size <= 0:
+            raise ValidationError(
+                {self.page_size_query_param: __("Must be a positive integer")}
+            )
+
+        return min(page_size, self.max_page_size)
+
+    def wants_count(self, request: Request) -> bool:
+        value = request.query_params.get(self.count_query_param, "true")
+        return value.lower() not in {"0", "false", "no", "off"}
+
+    def seek(self, position: Sequence[Any]) -> Q:
+        """Build the filter selecting rows after ``position``.
+
+        For an ordering ``(a, b)`` this expands to
+        ``a > x OR (a = x AND b > y)``.
+        """
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            term = Q(**{f"{field}__gt": position[i]})
+            for previous, value in zip(self.ordering[:i], position):
+                term &= Q(**{previous: value})
+            condition |= term
+        return condition
+
+    def encode_cursor(self, obj) -> str:
+        position = [
+            _to_json(getattr(obj, _attname(obj, f))) for f in self.ordering
+        ]
+        data = json.dumps(position, separators=(",", ":")).encode("utf-8")
+        return urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, queryset: QuerySet, cursor: str) -> list[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            position = json.loads(urlsafe_b64decode(padded.encode("ascii")))
+            if len(position) != len(self.ordering):
+                raise ValueError(cursor)
+
+            return [
+                _get_field(queryset.model, field).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except Exception as exc:  # pylint: disable=broad-except
+            raise ValidationError(
+                {self.cursor_query_param: self.invalid_cursor_message}
+            ) from exc
+
+
+def _get_field(model, field: str):
+    if field == "pk":
+        return model._meta.pk
+    return model._meta.get_field(field)
+
+
+def _attname(obj, field: str) -> str:
+    # Rows fetched with ``values_list(named=True)`` carry the field names
+    if not hasattr(obj, "_meta"):
+        return field
+    return _get_field(obj, field).attname
+
+
+def _to_json(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
@@ -0,0 +1,51 @@
+"""JSON parser of the API.
+
+Like ``hydra_core.renderers``, the parser uses orjson when it is installed
+and the standard library otherwise. Documents orjson doesn't parse the
+same way, i.e. ones in another encoding than UTF-8 or with integers beyond
+64 bits (which orjson turns into floats), are parsed by DRF's
+``JSONParser``, which also reports the errors.
+"""
+from __future__ import annotations
+
+import io
+
+from django.conf import settings
+from rest_framework import parsers
+
+from .renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+__all__ = ("JSONParser",)
+
+# Any integer beyond 64 bits has at least 20 digits. Mapping all digits to
+# "0" and searching for a run of them is a lot faster than a regex.
+_DIGITS = bytes.maketrans(b"123456789", b"000000000")
+_LONG_NUMBER = b"0" * 20
+
+
+class JSONParser(parsers.JSONParser):
+    """JSON parser using orjson when available."""
+
+    renderer_class = JSONRenderer
+    use_orjson = orjson is not None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if not self.use_orjson or encoding.lower() not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        content = stream.read()
+        if _LONG_NUMBER not in content.translate(_DIGITS):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+
+        return super().parse(io.BytesIO(content), media_type, parser_context)
@@ -0,0 +1,240 @@
+"""Pre-forking process manager for the waitress server.
+
+A single waitress process can only use one CPU core for Python code,
+however many threads it runs. ``PreforkServer`` binds the listen socket
+once, forks a number of worker processes which all accept connections from
+that socket, restarts workers that exit, and recycles each worker after a
+configurable number of requests.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from typing import Any, Callable, Iterable, Tuple, cast
+
+from django.db import connections
+import waitress
+from waitress.adjustments import Adjustments
+
+__all__ = ("PreforkServer", "RequestLimitMiddleware")
+
+log = logging.getLogger(__name__)
+
+# Minimum time between two forks of the same worker slot, protects against
+# spinning when workers crash right after starting.
+RESPAWN_INTERVAL = 1.0
+
+
+class RequestLimitMiddleware:
+    """WSGI middleware counting the requests handled by a worker.
+
+    Once ``max_requests`` requests have been served ``exhausted`` is set,
+    signalling that the worker should drain its connections and exit.
+    """
+
+    def __init__(self, application: Callable, max_requests: int):
+        self.application = application
+        self.max_requests = max_requests
+        self.exhausted = threading.Event()
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ: dict[str, Any], start_response: Callable):
+        with self._lock:
+            self._count += 1
+            if self._count >= self.max_requests:
+                self.exhausted.set()
+
+        return self.application(environ, start_response)
+
+
+class PreforkServer:
+    """Serve ``application`` from ``workers`` forked waitress processes.
+
+    Args:
+        application: The WSGI application, loaded before forking.
+        listen: The listen address, in the format accepted by waitress.
+        workers: The number of worker processes.
+        threads: The number of threads per worker process.
+        max_requests: Recycle a worker after it served about this many
+            requests, 0 to never recycle workers.
+        graceful_timeout: Seconds a stopping worker may take to finish
+            its in-flight requests.
+    """
+
+    def __init__(
+        self,
+        application: Callable,
+        *,
+        listen: str,
+        workers: int,
+        threads: int,
+        max_requests: int = 0,
+        graceful_timeout: float = 30,
+    ):
+        self.application = application
+        self.listen = listen
+        self.workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+
+        self.socket: socket.socket | None = None
+        self.children: dict[int, int] = {}  # pid -> worker slot
+        self.stopping = False
+
+    def run(self):
+        self.socket = self.bind()
+
+        # Connections must never be shared with the forked workers
+        connections.close_all()
+
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+
+        last_spawn: dict[int, float] = {}
+        for slot in range(self.workers):
+            last_spawn[slot] = time.monotonic()
+            self.spawn(slot)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            if pid not in self.children:
+                continue
+            slot = self.children.pop(pid)
+
+            if self.stopping:
+                log.info("Worker %d exited", pid)
+                continue
+
+            code = os.waitstatus_to_exitcode(status)
+            if code < 0:
+                log.warning("Worker %d was killed by signal %d", pid, -code)
+            elif code != 0:
+                log.warning("Worker %d exited with code %d", pid, code)
+
+            delay = last_spawn[slot] + RESPAWN_INTERVAL - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if not self.stopping:
+                last_spawn[slot] = time.monotonic()
+                self.spawn(slot)
+
+        self.socket.close()
+
+    def bind(self) -> socket.socket:
+        # The stubs of waitress have the parsed addresses as strings
+        family, socktype, proto, sockaddr = cast(
+            Tuple[int, int, int, Any],
+            Adjustments(listen=self.listen).listen[0],
+        )
+        sock = socket.socket(family, socktype, proto)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(sockaddr)
+        sock.listen(Adjustments.backlog)
+        return sock
+
+    def spawn(self, slot: int):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = slot
+            log.debug("Started worker %d", pid)
+            return
+
+        # In the worker process, never return into the supervisor loop
+        code = 0
+        try:
+            self.run_worker()
+        except BaseException:  # pylint: disable=broad-except
+            log.exception("Worker %d failed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)  # pylint: disable=protected-access
+
+    def handle_stop(self, signum, frame):
+        if self.stopping:
+            return
+
+        log.info("Stopping %d workers", len(self.children))
+        self.stopping = True
+        self._signal_children(signal.SIGTERM, self.children)
+
+        # Kill the workers which didn't manage to stop in time
+        timer = threading.Timer(
+            self.graceful_timeout,
+            self._signal_children,
+            args=(signal.SIGKILL, self.children),
+        )
+        timer.daemon = True
+        timer.start()
+
+    def run_worker(self):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, _exit_worker)
+
+        application = self.application
+        limiter = None
+        if self.max_requests:
+            # Spread the restarts of the workers over time
+            jitter = random.randint(0, max(self.max_requests // 10, 1))
+            limiter = RequestLimitMiddleware(
+                application, self.max_requests + jitter
+            )
+            application = limiter
+
+        assert self.socket is not None
+        server = waitress.create_server(
+            application, sockets=[self.socket], threads=self.threads
+        )
+
+        if limiter is not None:
+            threading.Thread(
+                target=self.recycle_worker,
+                args=(server, limiter.exhausted),
+                daemon=True,
+            ).start()
+
+        server.run()
+
+    def recycle_worker(self, server, exhausted: threading.Event):
+        """Stop the worker gracefully once it served enough requests."""
+        exhausted.wait()
+        log.info("Worker %d reached its request limit", os.getpid())
+
+        # Let the other workers accept the new connections while this one
+        # finishes the requests it is working on.
+        server.accepting = False
+        server.pull_trigger()
+
+        # Idle keep-alive connections are simply closed on exit
+        deadline = time.monotonic() + self.graceful_timeout
+        while time.monotonic() < deadline and any(
+            channel.requests or channel.request is not None
+            for channel in list(server.active_channels.values())
+        ):
+            time.sleep(0.1)
+
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    @staticmethod
+    def _signal_children(signum: int, pids: Iterable[int]):
+        for pid in list(pids):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+
+def _exit_worker(signum, frame):
+    # Makes waitress leave its main loop and shut down the task dispatcher,
+    # which gives the running requests a chance to finish.
+    raise SystemExit(0)
@@ -0,0 +1,83 @@
+"""Renderers of the API.
+
+Data is encoded with orjson when it is installed (``pip install
+hydra-core[fast]``), and with the standard library otherwise. Both produce
+the same bytes as DRF's ``JSONRenderer``: values orjson doesn't encode
+itself, e.g. datetimes and decimals, are handed to DRF's encoder, and
+anything orjson refuses, like integers beyond 64 bits or non-string keys,
+is rendered by the standard library after all. The one difference is the
+notation of floats which Python writes with an exponent, e.g. ``1e16``
+rather than ``1e+16``, and the API doesn't return floats.
+
+Event stream views render their errors as an ``error`` event, their
+responses carry the events themselves.
+"""
+from __future__ import annotations
+
+import json
+
+from rest_framework import renderers
+
+from . import events
+from .fastjson import RawJSON
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+__all__ = ("EventStreamRenderer", "JSONRenderer")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSON renderer using orjson when available.
+
+    ``RawJSON`` bodies are passed through as they are. They are written in
+    the compact format, a body which has to be rendered differently, e.g.
+    indented, is parsed and rendered again.
+    """
+
+    use_orjson = orjson is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        fast = indent is None and self.compact and not self.ensure_ascii
+
+        if isinstance(data, RawJSON):
+            if fast:
+                return data.content
+            data = json.loads(data.content)
+
+        if fast and self.use_orjson and self.strict and data is not None:
+            try:
+                content = orjson.dumps(
+                    data,
+                    default=self.encoder_class().default,
+                    option=_ORJSON_OPTIONS,
+                )
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                # Like DRF, escape the separators which aren't valid in
+                # JavaScript strings.
+                return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                    b"\xe2\x80\xa9", b"\\u2029"
+                )
+
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return events.event("error", data)
@@ -64,6 +64,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "hydra_core.middleware.CompressionMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -159,9 +160,43 @@ CACHES = {
     "redis": env.cache("REDIS_URL", default="locmemcache://"),
 }
 
+# How long the active settings are cached, in seconds. The in-process
+# cache can't be invalidated from other processes, so keep it short.
+SETTINGS_CACHE_TIMEOUT = env.int("SETTINGS_CACHE_TIMEOUT", default=300)
+SETTINGS_CACHE_LOCAL_TTL = env.float("SETTINGS_CACHE_LOCAL_TTL", default=5.0)
+
+# How long authenticated API tokens are cached, in seconds, and how many of
+# them are kept in each process.
+TOKEN_CACHE_TIMEOUT = env.int("TOKEN_CACHE_TIMEOUT", default=300)
+TOKEN_CACHE_LOCAL_TTL = env.float("TOKEN_CACHE_LOCAL_TTL", default=5.0)
+TOKEN_CACHE_LOCAL_SIZE = env.int("TOKEN_CACHE_LOCAL_SIZE", default=1024)
+
+# Relays the events pushed to the clients of /v1/stream/. "redis" uses
+# pub/sub on the server of the "redis" cache, "local" only reaches the
+# clients connected to the publishing process.
+EVENTS_BROKER = env.str(
+    "EVENTS_BROKER",
+    default=(
+        "redis"
+        if CACHES["redis"]["BACKEND"].startswith("django_redis.")
+        else "local"
+    ),
+)
+# Seconds between keep-alive comments on idle event streams, how many
+# messages a stream may fall behind before it is closed, and how many
+# milliseconds clients wait before reconnecting a closed stream.
+EVENTS_KEEPALIVE = env.float("EVENTS_KEEPALIVE", default=15.0)
+EVENTS_QUEUE_SIZE = env.int("EVENTS_QUEUE_SIZE", default=100)
+EVENTS_RETRY = env.int("EVENTS_RETRY", default=5000)
+
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "hydra_core.renderers.JSONRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "hydra_core.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
 }
 
@@ -204,3 +239,35 @@ CELERY_BROKER_TRANSPORT_OPTIONS = {
 CELERY_BROKER_CONNECTION_MAX_RETRIES = None
 
 MINIMUM_RETENTION_PERIOD_DAYS = 31
+
+# Records listing pagination, a page size of 0 returns all records unless
+# the client requests a page size explicitly.
+RECORD_PAGE_SIZE = env.int("RECORD_PAGE_SIZE", default=0)
+RECORD_MAX_PAGE_SIZE = env.int("RECORD_MAX_PAGE_SIZE", default=1000)
+
+# Number of rows fetched per database round trip by the streaming export
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2000)
+
+# Number of changes returned per request by the change feed, and the number
+# of days changes are kept for clients to catch up.
+CHANGES_PAGE_SIZE = env.int("CHANGES_PAGE_SIZE", default=1000)
+CHANGES_RETENTION_DAYS = env.int("CHANGES_RETENTION_DAYS", default=30)
+
+# Response encodings in order of preference, the ones which aren't
+# installed are skipped. Bodies smaller than COMPRESSION_MIN_SIZE bytes are
+# never compressed.
+COMPRESSION_ENCODINGS = env.list(
+    "COMPRESSION_ENCODINGS", default=["zstd", "br", "gzip"]
+)
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+
+# Number of rows inserted per statement when importing a configuration
+IMPORT_BATCH_SIZE = env.int("IMPORT_BATCH_SIZE", default=1000)
+
+# Maximum number of records accepted by a single bulk request
+BULK_MAX_RECORDS = env.int("BULK_MAX_RECORDS", default=10000)
+
+# Old records are purged in batches of PURGE_BATCH_SIZE records, each in its
+# own transaction, sleeping PURGE_BATCH_SLEEP seconds between batches.
+PURGE_BATCH_SIZE = env.int("PURGE_BATCH_SIZE", default=5000)
+PURGE_BATCH_SLEEP = env.float("PURGE_BATCH_SLEEP", default=0.1)
@@ -1,6 +1,11 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.test import AsyncClient
 import pytest
 from rest_framework.test import APIClient
 
+from hydra_core.cache import clear_local_caches
+
 from .factories import UserFactory
 
 
@@ -11,6 +16,25 @@ def authenticate_client(
     return client
 
 
+def asgi_get(path: str, user=None):
+    """Request ``path`` through the ASGI handler rather than through WSGI."""
+    headers = {}
+    if user is not None:
+        headers["authorization"] = f"Token {user.auth_token}"
+
+    async def get():
+        return await AsyncClient().get(path, **headers)
+
+    return async_to_sync(get)()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Make sure no cached values leak from one test into the next one."""
+    caches["redis"].clear()
+    clear_local_caches()
+
+
 @pytest.fixture
 @pytest.mark.django_db
 def user():
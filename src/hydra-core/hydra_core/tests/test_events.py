@@ -0,0 +1,202 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.urls import reverse
+import pytest
+from rest_framework import status
+
+from hydra_core import events
+from hydra_core.asgi import application
+from time_reporting import services
+
+STREAM_VIEW = "stream"
+
+
+def _scope(user=None, accept="text/event-stream"):
+    headers = [(b"accept", accept.encode())]
+    if user is not None:
+        token = f"Token {user.auth_token}"
+        headers.append((b"authorization", token.encode()))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": reverse(STREAM_VIEW),
+        "raw_path": reverse(STREAM_VIEW).encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+    }
+
+
+def _parse(body: bytes) -> list[tuple[str, dict]]:
+    parsed = []
+    for block in body.decode().split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if line
+        )
+        if "event" in fields:
+            parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def test_local_broker():
+    async def run():
+        broker = events.LocalBroker()
+        subscription = await broker.subscribe("a")
+        other = await broker.subscribe("b")
+
+        broker.publish("a", b"first")
+        broker.publish("a", b"second")
+        subscription.close()
+        broker.publish("a", b"after close")
+
+        assert await subscription.get() == b"first"
+        assert await subscription.get() == b"second"
+        assert await subscription.get() is None
+        assert await subscription.get() is None
+        assert other._queue.empty()
+
+    async_to_sync(run)()
+
+
+def test_local_broker_closes_slow_subscription(settings):
+    settings.EVENTS_QUEUE_SIZE = 2
+
+    async def run():
+        broker = events.LocalBroker()
+        subscription = await broker.subscribe("a")
+
+        for i in range(3):
+            broker.publish("a", b"%d" % i)
+        await asyncio.sleep(0)
+
+        assert [await subscription.get() for _ in range(3)] == [
+            b"0",
+            b"1",
+            None,
+        ]
+        assert not broker._subscriptions
+
+    async_to_sync(run)()
+
+
+async def _drain(subscription) -> bytes:
+    messages = []
+    while (message := await subscription.get()) is not None:
+        messages.append(message)
+    return b"".join(messages)
+
+
+@pytest.mark.django_db
+def test_changes_published_on_commit(user, django_capture_on_commit_callbacks):
+    loop = asyncio.new_event_loop()
+    subscription = loop.run_until_complete(
+        events.get_broker().subscribe(events.user_channel(user.pk))
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category = services.create_category(user=user, name="category")
+        services.create_project(category=category, name="project")
+    subscription.close()
+    body = loop.run_until_complete(_drain(subscription))
+    loop.close()
+
+    assert _parse(body)[0] == (
+        "change",
+        {
+            "sequence": 1,
+            "resource": "category",
+            "id": category.pk,
+            "action": "created",
+        },
+    )
+    assert [data["resource"] for _, data in _parse(body)] == [
+        "category",
+        "project",
+    ]
+
+
+@pytest.mark.django_db
+def test_stream_get(client):
+    resp = client.get(reverse(STREAM_VIEW))
+
+    # Served over WSGI, the stream ends right away and the client retries
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["Content-Type"] == "text/event-stream"
+    assert resp["Cache-Control"] == "no-cache"
+    assert not resp.has_header("Content-Encoding")
+    assert resp.content == b"retry: 5000\n\n"
+
+
+@pytest.mark.django_db
+def test_stream_get_unauthenticated(anon_client):
+    resp = anon_client.get(
+        reverse(STREAM_VIEW), HTTP_ACCEPT="text/event-stream"
+    )
+
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+    assert _parse(resp.content)[0][0] == "error"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_asgi(user, settings):
+    settings.EVENTS_KEEPALIVE = 0.05
+
+    async def run():
+        communicator = ApplicationCommunicator(application, _scope(user))
+        await communicator.send_input({"type": "http.request"})
+
+        start = await communicator.receive_output(timeout=5)
+        opened = await communicator.receive_output(timeout=5)
+        keepalive = await communicator.receive_output(timeout=5)
+        category = await sync_to_async(services.create_category)(
+            user=user, name="category"
+        )
+        change = await communicator.receive_output(timeout=5)
+
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait(timeout=5)
+        return start, opened, keepalive, change, category
+
+    start, opened, keepalive, change, category = async_to_sync(run)()
+
+    assert start["status"] == status.HTTP_200_OK
+    headers = dict(start["headers"])
+    assert headers[b"Content-Type"] == b"text/event-stream"
+    assert b"Content-Length" not in headers
+    assert opened["body"] == b"retry: 5000\n\n"
+    assert keepalive["body"] == b": keepalive\n\n"
+    assert _parse(change["body"]) == [
+        (
+            "change",
+            {
+                "sequence": 1,
+                "resource": "category",
+                "id": category.pk,
+                "action": "created",
+            },
+        )
+    ]
+    assert not events.get_broker()._subscriptions
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_asgi_unauthenticated():
+    async def run():
+        communicator = ApplicationCommunicator(application, _scope())
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        body = await communicator.receive_output(timeout=5)
+        await communicator.wait(timeout=5)
+        return start, body
+
+    start, body = async_to_sync(run)()
+
+    assert start["status"] == status.HTTP_403_FORBIDDEN
+    assert _parse(body["body"])[0][0] == "error"
@@ -0,0 +1,141 @@
+import gzip
+import io
+import json
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+import pytest
+
+from hydra_core.middleware import (
+    CompressionMiddleware,
+    available_encodings,
+    negotiate,
+)
+
+BODY = json.dumps([{"id": i, "name": "x" * 10} for i in range(500)]).encode()
+
+
+def _get(response, accept_encoding="gzip"):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+def _json(content=BODY):
+    return HttpResponse(content, content_type="application/json")
+
+
+def _decompress(encoding: str, content: bytes) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(content)
+    if encoding == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(content)
+    brotli = pytest.importorskip("brotli")
+    return brotli.decompress(content)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("gzip", "gzip"),
+        ("GZIP;q=0.5", "gzip"),
+        ("x-gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("*", "zstd"),
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip, br;q=0.9, zstd;q=0.5", "gzip"),
+        ("br, gzip", "br"),
+        ("*, zstd;q=0", "br"),
+        ("gzip;q=invalid", None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+def test_available_encodings(settings):
+    settings.COMPRESSION_ENCODINGS = ["unknown", "gzip"]
+    assert available_encodings() == ["gzip"]
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "br", "gzip"])
+def test_compress(settings, encoding):
+    settings.COMPRESSION_ENCODINGS = [encoding]
+    if encoding not in available_encodings():
+        pytest.skip(f"{encoding} is not installed")
+
+    response = _get(_json(), accept_encoding=encoding)
+
+    assert response["Content-Encoding"] == encoding
+    assert response["Vary"] == "Accept-Encoding"
+    assert int(response["Content-Length"]) == len(response.content)
+    assert len(response.content) < len(BODY)
+    assert _decompress(encoding, response.content) == BODY
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "br", "gzip"])
+def test_compress_streaming(settings, encoding):
+    settings.COMPRESSION_ENCODINGS = [encoding]
+    if encoding not in available_encodings():
+        pytest.skip(f"{encoding} is not installed")
+    stream = io.BytesIO(BODY)
+    chunks = list(iter(lambda: stream.read(1000), b""))
+
+    response = _get(
+        StreamingHttpResponse(iter(chunks), content_type="application/json"),
+        accept_encoding=encoding,
+    )
+
+    assert response["Content-Encoding"] == encoding
+    assert not response.has_header("Content-Length")
+    compressed = list(response.streaming_content)
+    # Every chunk is flushed, so the client receives data as it is produced
+    assert len(compressed) == len(chunks) + 1
+    assert _decompress(encoding, b"".join(compressed)) == BODY
+
+
+def test_compress_skips_small_body(settings):
+    settings.COMPRESSION_MIN_SIZE = len(BODY) + 1
+
+    response = _get(_json())
+
+    assert not response.has_header("Content-Encoding")
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        HttpResponse(BODY, content_type="image/png"),
+        HttpResponse(
+            BODY,
+            content_type="application/json",
+            headers={"Content-Encoding": "br"},
+        ),
+    ],
+    ids=["content-type", "content-encoding"],
+)
+def test_compress_skips_response(response):
+    encoding = response.get("Content-Encoding")
+
+    response = _get(response)
+
+    assert response.get("Content-Encoding") == encoding
+    assert response.content == BODY
+
+
+def test_compress_not_accepted():
+    response = _get(_json(), accept_encoding="")
+
+    assert not response.has_header("Content-Encoding")
+    assert response["Vary"] == "Accept-Encoding"
+    assert response.content == BODY
+
+
+def test_compress_weakens_etag():
+    response = _json()
+    response["ETag"] = '"abc"'
+
+    assert _get(response)["ETag"] == 'W/"abc"'
@@ -0,0 +1,197 @@
+import logging
+import os
+import signal
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from hydra_core import prefork
+from hydra_core.prefork import PreforkServer, RequestLimitMiddleware
+
+
+class FakeProcesses:
+    """Stands in for ``fork``, ``wait`` and ``kill``, no process is ever
+    started or signalled.
+
+    ``exits`` lists what ``wait`` returns, ``(pid, status)`` pairs or
+    callables returning one.
+    """
+
+    def __init__(self):
+        self.forked = []
+        self.exits = []
+        self.signals = []
+
+    def fork(self):
+        pid = 100 + len(self.forked)
+        self.forked.append(pid)
+        return pid
+
+    def wait(self):
+        if not self.exits:
+            raise ChildProcessError()
+        result = self.exits.pop(0)
+        return result() if callable(result) else result
+
+    def kill(self, pid, signum):
+        self.signals.append((pid, signum))
+
+
+class FakeTimer:
+    started: list["FakeTimer"] = []
+
+    def __init__(self, interval, function, args=()):
+        self.interval = interval
+        self.function = function
+        self.args = args
+        self.daemon = False
+
+    def start(self):
+        self.started.append(self)
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    fake = FakeProcesses()
+    monkeypatch.setattr(os, "fork", fake.fork)
+    monkeypatch.setattr(os, "wait", fake.wait)
+    monkeypatch.setattr(os, "kill", fake.kill)
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    monkeypatch.setattr(threading, "Timer", FakeTimer)
+    monkeypatch.setattr(prefork, "RESPAWN_INTERVAL", 0)
+    FakeTimer.started = []
+    return fake
+
+
+class Server(PreforkServer):
+    def bind(self):
+        return socket.socket()
+
+
+def _server(**kwargs):
+    return Server(
+        lambda environ, start_response: [],
+        listen="127.0.0.1:0",
+        workers=2,
+        threads=1,
+        **kwargs,
+    )
+
+
+def _exited(code: int) -> int:
+    return code << 8
+
+
+def test_respawn_workers(processes, caplog):
+    server = _server()
+
+    def stop():
+        server.handle_stop(signal.SIGTERM, None)
+        return 102, _exited(0)
+
+    processes.exits = [
+        (100, _exited(1)),
+        (101, signal.SIGKILL),
+        stop,
+        (103, _exited(0)),
+    ]
+    with caplog.at_level(logging.INFO, logger=prefork.__name__):
+        server.run()
+
+    # Both workers are replaced, none once stopping
+    assert processes.forked == [100, 101, 102, 103]
+    assert not server.children
+    assert processes.signals == [
+        (102, signal.SIGTERM),
+        (103, signal.SIGTERM),
+    ]
+    assert "Worker 100 exited with code 1" in caplog.messages
+    assert "Worker 101 was killed by signal 9" in caplog.messages
+
+
+def test_graceful_shutdown(processes):
+    server = _server(graceful_timeout=5)
+    server.children = {100: 0, 101: 1}
+
+    server.handle_stop(signal.SIGTERM, None)
+    server.handle_stop(signal.SIGINT, None)
+
+    assert server.stopping
+    assert processes.signals == [
+        (100, signal.SIGTERM),
+        (101, signal.SIGTERM),
+    ]
+
+    # The workers which didn't stop in time are killed
+    (timer,) = FakeTimer.started
+    assert timer.interval == 5
+    del server.children[100]
+    timer.function(*timer.args)
+    assert processes.signals[-1] == (101, signal.SIGKILL)
+
+
+def test_failing_worker_exits(monkeypatch):
+    def run_worker():
+        raise RuntimeError("failed")
+
+    def _exit(code):
+        raise SystemExit(code)
+
+    server = _server()
+    monkeypatch.setattr(os, "fork", lambda: 0)
+    monkeypatch.setattr(os, "_exit", _exit)
+    monkeypatch.setattr(server, "run_worker", run_worker)
+
+    with pytest.raises(SystemExit) as exc_info:
+        server.spawn(0)
+
+    assert exc_info.value.code == 1
+    assert not server.children
+
+
+def test_stopping_worker_exits_cleanly():
+    with pytest.raises(SystemExit) as exc_info:
+        prefork._exit_worker(signal.SIGTERM, None)
+
+    assert exc_info.value.code == 0
+
+
+def test_request_limit_middleware():
+    limiter = RequestLimitMiddleware(
+        lambda environ, start_response: [b"ok"], max_requests=3
+    )
+
+    def start_response(status, headers):
+        pass
+
+    for _ in range(2):
+        assert limiter({}, start_response) == [b"ok"]
+    assert not limiter.exhausted.is_set()
+
+    assert limiter({}, start_response) == [b"ok"]
+    assert limiter.exhausted.is_set()
+
+
+def test_recycle_worker(processes, monkeypatch):
+    # A request is in flight until the worker has waited once
+    channel = SimpleNamespace(requests=[], request=object())
+
+    def sleep(seconds):
+        channel.request = None
+
+    monkeypatch.setattr(prefork.time, "sleep", sleep)
+    server = SimpleNamespace(
+        accepting=True,
+        pull_trigger=lambda: None,
+        active_channels={1: channel},
+    )
+    exhausted = threading.Event()
+    exhausted.set()
+
+    _server().recycle_worker(server, exhausted)
+
+    assert not server.accepting
+    assert channel.request is None
+    assert processes.signals == [(os.getpid(), signal.SIGTERM)]
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+import io
+import uuid
+
+from django.utils.translation import gettext_lazy
+import pytest
+from rest_framework import renderers
+from rest_framework.exceptions import ErrorDetail, ParseError
+
+from hydra_core.fastjson import RawJSON
+from hydra_core.parsers import JSONParser
+from hydra_core.renderers import JSONRenderer
+
+DATA: list = [
+    None,
+    [],
+    {},
+    OrderedDict(
+        [
+            ("id", 1),
+            ("name", 'Ünïcode ☃ 🚀 "quoted" \\ \t\x01\x7f'),
+            ("separators", "line\u2028para\u2029"),
+            ("created", datetime(2022, 3, 13, 6, 30, tzinfo=dt_timezone.utc)),
+            ("updated", datetime(2022, 3, 13, 6, 30, 0, 123456)),
+            ("day", date(2022, 3, 13)),
+            ("time", time(6, 30, 0, 500)),
+            ("duration", timedelta(hours=1, microseconds=1)),
+            ("amount", Decimal("1.10")),
+            ("uuid", uuid.UUID(int=1)),
+            ("lazy", gettext_lazy("Invalid cursor")),
+            ("error", [ErrorDetail("Unknown project 1", code="invalid")]),
+            ("nested", {"tuple": (1, 2), "bool": True, "null": None}),
+        ]
+    ),
+    {"big": 2**70},
+    {1: "non-string key"},
+]
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def use_orjson(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(JSONRenderer, "use_orjson", request.param)
+    monkeypatch.setattr(JSONParser, "use_orjson", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("data", DATA)
+@pytest.mark.parametrize("media_type", [None, "application/json; indent=2"])
+def test_render_same_as_drf(use_orjson, data, media_type):
+    expected = renderers.JSONRenderer().render(data, media_type)
+    assert JSONRenderer().render(data, media_type) == expected
+
+
+@pytest.mark.parametrize("media_type", [None, "application/json; indent=2"])
+def test_render_raw_json(media_type):
+    data = [{"name": "line\u2028"}]
+    content = renderers.JSONRenderer().render(data)
+
+    rendered = JSONRenderer().render(RawJSON(content), media_type)
+
+    assert rendered == renderers.JSONRenderer().render(data, media_type)
+
+
+@pytest.mark.parametrize("data", DATA[1:5])
+def test_parse_round_trip(use_orjson, data):
+    content = renderers.JSONRenderer().render(data)
+
+    parsed = JSONParser().parse(io.BytesIO(content))
+
+    assert renderers.JSONRenderer().render(parsed) == content
+
+
+def test_parse_big_integer(use_orjson):
+    content = b'{"big":1180591620717411303424,"small":18446744073709551615}'
+
+    parsed = JSONParser().parse(io.BytesIO(content))
+
+    assert parsed == {"big": 2**70, "small": 2**64 - 1}
+
+
+@pytest.mark.parametrize("content", [b'{"a":', b'{"a":NaN}', b"\xff"])
+def test_parse_invalid(use_orjson, content):
+    with pytest.raises(ParseError):
+        JSONParser().parse(io.BytesIO(content))
@@ -24,3 +24,25 @@ def test_update_settings():
 
     assert updated_settings.align_timestamps is True
     assert updated_settings.retention_period_days == 60
+
+
+@pytest.mark.django_db
+def test_active_settings_cached(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        models.Settings.objects.active()
+
+    with django_assert_num_queries(0):
+        current_settings = models.Settings.objects.active()
+
+    # Modifying the returned object must not modify the cached one
+    current_settings.retention_period_days = 1
+    assert models.Settings.objects.active().retention_period_days == 360
+
+
+@pytest.mark.django_db
+def test_update_settings_invalidates_cache():
+    assert models.Settings.objects.active().retention_period_days == 360
+
+    services.update_settings({"retention_period_days": 60})
+
+    assert models.Settings.objects.active().retention_period_days == 60
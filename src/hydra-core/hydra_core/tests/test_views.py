@@ -2,13 +2,18 @@ import logging
 
 from dateutil.parser import isoparse
 from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
 from django.urls import reverse
 from django.utils.timezone import localtime
 import pytest
 from rest_framework import status
 
+from hydra_core.auth import _token_cache_key, delete_user, rotate_token
+from hydra_core.cache import clear_local_caches
 from hydra_core.models import Settings
 
+from .conftest import asgi_get, authenticate_client
 from .factories import UserFactory
 
 ABOUT_VIEW = "about"
@@ -135,3 +140,106 @@ def test_settings_view_put(client):
     assert resp.status_code == status.HTTP_200_OK, resp.content
 
     assert resp.json() == body
+
+
+@pytest.mark.django_db
+def test_token_authentication_cached(client, django_assert_num_queries):
+    resp = client.get(reverse(SETTINGS_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    # Both the token and the settings are cached now
+    with django_assert_num_queries(0):
+        resp = client.get(reverse(SETTINGS_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+
+@pytest.mark.django_db
+def test_check_user_asgi(user):
+    resp = asgi_get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_403_FORBIDDEN, resp.content
+
+    resp = asgi_get(reverse(AUTH_CHECK_VIEW), user=user)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == {"username": user.username, "email": user.email}
+
+
+@pytest.mark.django_db
+def test_token_authentication_rotated(client, user):
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    token = rotate_token(user)
+
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_403_FORBIDDEN, resp.content
+
+    user.refresh_from_db()
+    assert user.auth_token == token
+    resp = authenticate_client(client, user).get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+
+@pytest.mark.django_db
+def test_token_authentication_deleted_user(client, user):
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    delete_user(user.username)
+
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_403_FORBIDDEN, resp.content
+
+
+@pytest.mark.django_db
+def test_token_authentication_shared_cache(
+    client, user, django_assert_num_queries
+):
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    # Only the id of the user is shared, never its password hash
+    cached = caches["redis"].get(_token_cache_key(user.auth_token.key))
+    assert cached == (user.pk, True)
+
+    clear_local_caches()
+    with django_assert_num_queries(1):
+        resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json()["username"] == user.username
+
+
+@pytest.mark.django_db
+def test_token_authentication_deleted_token(client, user):
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    # As done by the token admin
+    user.auth_token.delete()
+
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_403_FORBIDDEN, resp.content
+
+
+@pytest.mark.django_db
+def test_token_authentication_deactivated_user(client, user):
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    user.is_active = False
+    user.save()
+
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_403_FORBIDDEN, resp.content
+
+
+@pytest.mark.django_db
+def test_rotatetoken_command(client, user, capsys):
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    call_command("rotatetoken", username=user.username)
+
+    user.refresh_from_db()
+    assert capsys.readouterr().out.strip() == user.auth_token.key
+    resp = client.get(reverse(AUTH_CHECK_VIEW))
+    assert resp.status_code == status.HTTP_403_FORBIDDEN, resp.content
@@ -16,7 +16,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
-from .views import AboutView, LoginView, SettingsView, UserDetail
+from .views import (
+    AboutView,
+    EventStreamView,
+    LoginView,
+    SettingsView,
+    UserDetail,
+)
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -24,5 +30,6 @@ urlpatterns = [
     path("v1/auth/check/", UserDetail.as_view(), name="check"),
     path("v1/about/", AboutView.as_view(), name="about"),
     path("v1/settings/", SettingsView.as_view(), name="settings"),
+    path("v1/stream/", EventStreamView.as_view(), name="stream"),
     path("", include("time_reporting.urls")),
 ]
@@ -0,0 +1,66 @@
+"""Per-user change markers, used to answer conditional requests.
+
+Every service writing the data of a user replaces the user's marker with a
+new, random one once its transaction has committed. Responses which only
+depend on that data can be identified by the marker, so a client sending
+back the ETag of its copy gets a "304 Not Modified" until the data changes,
+without the view running a single query.
+
+Markers live in the shared cache. A marker which has been evicted is simply
+replaced by a new one, which only costs the clients a full response.
+"""
+from __future__ import annotations
+
+import time
+from typing import Iterable
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+
+__all__ = ("get_version", "touch", "touch_all")
+
+_ALL_USERS_KEY = "hydra:version:all"
+
+Marker = tuple[str, float]  # (token, changed at)
+
+
+def get_version(user_id: int) -> str:
+    """Return a token identifying the current data of the user."""
+    cache = caches["redis"]
+    keys = [_ALL_USERS_KEY, _user_key(user_id)]
+
+    markers: dict[str, Marker] = cache.get_many(keys)
+    missing = [key for key in keys if key not in markers]
+    if missing:
+        for key in missing:
+            cache.add(key, _new_marker(), timeout=None)
+        # Another process may have added its own marker in the meantime
+        markers.update(cache.get_many(missing))
+
+    return ":".join(markers[key][0] for key in keys)
+
+
+def touch(user_ids: Iterable[int]):
+    """Replace the markers of the users once the transaction commits."""
+    keys = [_user_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: _replace(keys))
+
+
+def touch_all():
+    """Replace the markers of all users once the transaction commits."""
+    transaction.on_commit(lambda: _replace([_ALL_USERS_KEY]))
+
+
+def _replace(keys: list[str]):
+    marker = _new_marker()
+    caches["redis"].set_many({key: marker for key in keys}, timeout=None)
+
+
+def _new_marker() -> Marker:
+    return uuid.uuid4().hex, time.time()
+
+
+def _user_key(user_id: int) -> str:
+    return f"hydra:version:{user_id}"
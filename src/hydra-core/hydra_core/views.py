@@ -15,9 +15,15 @@ from rest_framework.serializers import (
     Serializer,
 )
 
-from .auth import login_user
-from .mixins import ExceptionHandlerMixin
+from . import events
+from .auth import CachingTokenAuthentication, login_user
+from .mixins import (
+    AsyncAPIViewMixin,
+    ConditionalGetMixin,
+    ExceptionHandlerMixin,
+)
 from .models import Settings
+from .renderers import EventStreamRenderer, JSONRenderer
 from .services import update_settings
 
 User = get_user_model()
@@ -25,11 +31,11 @@ AuthenticationClasses = Tuple[authentication.BaseAuthentication, ...]
 PermissionClasses = Tuple[permissions.BasePermission, ...]
 
 
-class BaseAPIView(ExceptionHandlerMixin, GenericAPIView):
+class BaseAPIView(ConditionalGetMixin, ExceptionHandlerMixin, GenericAPIView):
 
     authentication_classes: AuthenticationClasses = (
         authentication.SessionAuthentication,
-        authentication.TokenAuthentication,
+        CachingTokenAuthentication,
     )
     permission_classes: PermissionClasses = (permissions.IsAuthenticated,)
 
@@ -39,7 +45,15 @@ class BasePublicAPIView(ExceptionHandlerMixin, GenericAPIView):
     permission_classes: PermissionClasses = ()
 
 
-class AboutView(BasePublicAPIView):
+class BaseAsyncAPIView(AsyncAPIViewMixin, BaseAPIView):
+    pass
+
+
+class BasePublicAsyncAPIView(AsyncAPIViewMixin, BasePublicAPIView):
+    pass
+
+
+class AboutView(BasePublicAsyncAPIView):
     class OutputSerializer(Serializer):
         app_version = CharField()
         timezone = CharField()
@@ -60,7 +74,7 @@ class AboutView(BasePublicAPIView):
 
         return serializer.data
 
-    def get(self, request: Request, format=None):
+    async def get(self, request: Request, format=None):
         return Response(self.get_data())
 
 
@@ -82,13 +96,13 @@ class LoginView(BasePublicAPIView):
         return Response(self.OutputSerializer(user).data)
 
 
-class UserDetail(BaseAPIView):
+class UserDetail(BaseAsyncAPIView):
     class OutputSerializer(ModelSerializer):
         class Meta:
             model = User
             fields = ("username", "email")
 
-    def get(self, request: Request, format=None) -> Response:
+    async def get(self, request: Request, format=None) -> Response:
         serializer = self.OutputSerializer(request.user)
         return Response(data=serializer.data)
 
@@ -114,3 +128,19 @@ class SettingsView(BaseAPIView):
         serializer.is_valid(raise_exception=True)
         update_settings(serializer.validated_data)
         return Response(self.OutputSerializer(self.get_queryset()).data)
+
+
+class EventStreamView(BaseAsyncAPIView):
+    """Server-sent events telling the client about changes to its data.
+
+    Every entry written to the change log of the user is sent as a
+    ``change`` event, e.g. ``{"sequence": 12, "resource": "record", "id":
+    5, "action": "created"}``. Once the stream is open, the client fetches
+    the changes since its last sync from ``/v1/changes/``, and fetches
+    again whenever an event skips ahead of its sequence.
+    """
+
+    renderer_classes = (JSONRenderer, EventStreamRenderer)
+
+    async def get(self, request: Request, format=None):
+        return events.EventStreamResponse(events.user_channel(request.user.pk))
@@ -1,7 +1,70 @@
 from django.contrib import admin
 
+from . import services
 from .models import Category, Project, TimeRecord
 
-admin.site.register(Category)
-admin.site.register(Project)
-admin.site.register(TimeRecord)
+# The admin writes through the services, like the API does, so that the
+# rollups, daily totals, change log and change markers stay up to date.
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        fields = {
+            "user": obj.user,
+            "name": obj.name,
+            "description": obj.description,
+        }
+        if change:
+            services.update_category(pk=obj.pk, **fields)
+        else:
+            obj.pk = services.create_category(**fields).pk
+
+    def delete_model(self, request, obj):
+        services.delete_category(pk=obj.pk)
+
+    def delete_queryset(self, request, queryset):
+        for pk in queryset.values_list("pk", flat=True):
+            services.delete_category(pk=pk)
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        fields = {
+            "category": obj.category,
+            "name": obj.name,
+            "description": obj.description,
+        }
+        if change:
+            services.update_project(pk=obj.pk, **fields)
+        else:
+            obj.pk = services.create_project(**fields).pk
+
+    def delete_model(self, request, obj):
+        services.delete_project(pk=obj.pk)
+
+    def delete_queryset(self, request, queryset):
+        for pk in queryset.values_list("pk", flat=True):
+            services.delete_project(pk=pk)
+
+
+@admin.register(TimeRecord)
+class TimeRecordAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        fields = {
+            "project": obj.project,
+            "start_time": obj.start_time,
+            "stop_time": obj.stop_time,
+            "approved": obj.approved,
+        }
+        if change:
+            services.update_record(pk=obj.pk, **fields)
+        else:
+            obj.pk = services.create_record(**fields).pk
+
+    def delete_model(self, request, obj):
+        services.delete_record(pk=obj.pk)
+
+    def delete_queryset(self, request, queryset):
+        services.delete_records(queryset)
@@ -0,0 +1,153 @@
+"""Append-only log of the changes to the data of every user.
+
+Every service creating, updating or deleting categories, projects or time
+records describes each changed row as a ``Change`` for each user owning
+it, and hands them to ``write`` inside the same transaction as the write.
+The changes of a user are numbered with a sequence of their own, which
+clients pass back to ``/v1/changes/?since=`` to fetch only what changed
+since their last sync. Once the transaction commits, the entries are
+also pushed to the connected clients of their users (see
+``hydra_core.events``).
+
+A client must never see a change before all changes with a lower sequence
+are visible, or it would skip them. ``write`` locks the users it writes
+entries for until the transaction ends, so concurrent writers of the same
+user number their changes one after the other and commit in that order.
+
+After all data has been replaced, or too much of it to describe row by
+row, ``reset`` replaces the log of the affected users with a single reset
+entry. ``purge`` drops entries past the retention
+period, but always keeps the latest entry of each user, which tells where
+the sequence of the user stands.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.utils import timezone
+
+from hydra_core import events
+
+from .models import ChangeLogEntry
+
+__all__ = ("Change", "bounds", "changes", "purge", "reset", "write")
+
+User = get_user_model()
+
+Resource = ChangeLogEntry.Resource
+Action = ChangeLogEntry.Action
+
+
+class Change(NamedTuple):
+    user_id: int
+    resource: str
+    object_id: int | None
+    action: str
+
+
+def changes(
+    users: Iterable[int], resource: str, ids: Iterable[int], action: str
+) -> list[Change]:
+    """Describe the same change of the rows ``ids`` for all ``users``."""
+    users, ids = set(users), list(ids)
+    return [Change(u, resource, pk, action) for u in users for pk in ids]
+
+
+def write(changes: Iterable[Change]) -> list[ChangeLogEntry]:
+    """Append ``changes`` to the log of their users, in the given order."""
+    changes = list(changes)
+    if not changes:
+        return []
+
+    users = {c.user_id for c in changes}
+    # The sequences are read in a statement of their own, once the lock is
+    # granted. Under READ COMMITTED, a subquery of the locking statement
+    # would read them as they were before waiting on a concurrent writer.
+    list(
+        User.objects.select_for_update()
+        .filter(pk__in=users)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    latest = dict(
+        ChangeLogEntry.objects.filter(user__in=users)
+        .values("user")
+        .annotate(sequence=Max("sequence"))
+        .values_list("user", "sequence")
+    )
+
+    now = timezone.now()
+    entries = []
+    for change in changes:
+        sequence = latest[change.user_id] = latest.get(change.user_id, 0) + 1
+        entries.append(
+            ChangeLogEntry(
+                user_id=change.user_id,
+                sequence=sequence,
+                resource=change.resource,
+                object_id=change.object_id,
+                action=change.action,
+                created=now,
+            )
+        )
+
+    entries = ChangeLogEntry.objects.bulk_create(
+        entries, batch_size=settings.IMPORT_BATCH_SIZE
+    )
+    events.publish((entry.user_id, _event(entry)) for entry in entries)
+    return entries
+
+
+def reset(users: Iterable[int] | None = None):
+    """Replace the log of ``users``, of every user by default, with a reset
+    entry.
+    """
+    if users is None:
+        users = User.objects.values_list("pk", flat=True)
+    users = set(users)
+    write(Change(pk, "", None, Action.RESET) for pk in users)
+    ChangeLogEntry.objects.filter(
+        user__in=users, sequence__lt=_latest_sequence("user")
+    ).delete()
+
+
+def purge(before: datetime) -> int:
+    """Delete the entries created before ``before``, except the latest one
+    of every user, and return how many were deleted.
+    """
+    deleted, _ = ChangeLogEntry.objects.filter(
+        created__lt=before, sequence__lt=_latest_sequence("user")
+    ).delete()
+    return deleted
+
+
+def bounds(user_id: int) -> tuple[int | None, int | None]:
+    """Return the first and the last sequence in the log of the user."""
+    aggregates = ChangeLogEntry.objects.filter(user=user_id).aggregate(
+        first=Min("sequence"), last=Max("sequence")
+    )
+    return aggregates["first"], aggregates["last"]
+
+
+def _event(entry: ChangeLogEntry) -> bytes:
+    return events.event(
+        "change",
+        {
+            "sequence": entry.sequence,
+            "resource": entry.resource,
+            "id": entry.object_id,
+            "action": entry.action,
+        },
+    )
+
+
+def _latest_sequence(user_field: str) -> Subquery:
+    return Subquery(
+        ChangeLogEntry.objects.filter(user=OuterRef(user_field))
+        .order_by("-sequence")
+        .values("sequence")[:1]
+    )
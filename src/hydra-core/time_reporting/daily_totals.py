@@ -0,0 +1,225 @@
+"""Incremental maintenance of the time spent per project and day.
+
+Stopped records are split at midnight in the default time zone
+(``settings.TIME_ZONE``) and every piece is added to the
+``DailyProjectTotal`` row of its project and day. Midnight is converted to
+UTC before splitting, so the days on which daylight saving time starts or
+ends are 23 and 25 hours long.
+
+Like the rollups, the services describe the effect of every write as
+totals per ``(project, day)`` and hand them to ``apply`` in the same
+transaction as the write. ``rebuild`` recomputes the totals from scratch.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import Count, DurationField, F, QuerySet, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyProjectTotal, TimeRecord
+
+__all__ = (
+    "Total",
+    "apply",
+    "combine",
+    "negate",
+    "queryset_totals",
+    "rebuild",
+    "record_totals",
+    "split_days",
+)
+
+Key = tuple[int, date]
+
+
+@dataclass
+class Total:
+    num_records: int = 0
+    duration: timedelta = field(default_factory=timedelta)
+
+    def __add__(self, other: Total) -> Total:
+        return Total(
+            self.num_records + other.num_records,
+            self.duration + other.duration,
+        )
+
+    def __neg__(self) -> Total:
+        return Total(-self.num_records, -self.duration)
+
+
+def split_days(
+    start: datetime, stop: datetime, tzinfo: ZoneInfo | None = None
+) -> Iterator[tuple[date, timedelta]]:
+    """Yield the days from ``start`` to ``stop`` and the time spent on each.
+
+    Days are calendar days in ``tzinfo``, the default time zone if omitted.
+    """
+    tzinfo = tzinfo or timezone.get_default_timezone()
+
+    # Aware datetimes sharing a tzinfo are subtracted by their wall time,
+    # which would make every day 24 hours long.
+    start = start.astimezone(dt_timezone.utc)
+    stop = stop.astimezone(dt_timezone.utc)
+
+    day = start.astimezone(tzinfo).date()
+    while True:
+        midnight = datetime.combine(
+            day + timedelta(days=1), time(), tzinfo=tzinfo
+        ).astimezone(dt_timezone.utc)
+        if midnight >= stop:
+            yield day, stop - start
+            return
+
+        yield day, midnight - start
+        start, day = midnight, day + timedelta(days=1)
+
+
+def record_totals(record: TimeRecord) -> dict[Key, Total]:
+    """The contribution of ``record`` to the daily totals of its project."""
+    if record.stop_time is None:
+        return {}
+
+    return {
+        (record.project_id, day): Total(1, duration)
+        for day, duration in split_days(record.start_time, record.stop_time)
+    }
+
+
+def queryset_totals(queryset: QuerySet[TimeRecord]) -> dict[Key, Total]:
+    """The contribution of the records in ``queryset`` to the daily totals.
+
+    The records starting and stopping on the same day are summed up by the
+    database, only those crossing midnight are split one by one.
+    """
+    tzinfo = timezone.get_default_timezone()
+    stopped = (
+        queryset.filter(stop_time__isnull=False)
+        .order_by()
+        .annotate(
+            day=TruncDate("start_time", tzinfo=tzinfo),
+            stop_day=TruncDate("stop_time", tzinfo=tzinfo),
+        )
+    )
+
+    totals: defaultdict[Key, Total] = defaultdict(Total)
+
+    rows = (
+        stopped.filter(day=F("stop_day"))
+        .values("project", "day")
+        .annotate(
+            n=Count("id"),
+            duration=Sum(
+                F("stop_time") - F("start_time"), output_field=DurationField()
+            ),
+        )
+        .values_list("project", "day", "n", "duration")
+    )
+    for project, day, n, duration in rows:
+        totals[project, day] += Total(n, duration)
+
+    crossing = stopped.exclude(day=F("stop_day")).values_list(
+        "project", "start_time", "stop_time"
+    )
+    for project, start, stop in crossing:
+        for day, duration in split_days(start, stop, tzinfo):
+            totals[project, day] += Total(1, duration)
+
+    return dict(totals)
+
+
+def combine(*totals: dict[Key, Total]) -> dict[Key, Total]:
+    combined: defaultdict[Key, Total] = defaultdict(Total)
+    for t in totals:
+        for key, total in t.items():
+            combined[key] += total
+    return dict(combined)
+
+
+def negate(totals: dict[Key, Total]) -> dict[Key, Total]:
+    return {key: -total for key, total in totals.items()}
+
+
+def apply(totals: dict[Key, Total]):
+    """Add ``totals`` to the daily totals.
+
+    Must be called after the records have been written. The affected rows
+    are locked and read with a single query, then written back with at
+    most one delete and one update, however many days the records cover.
+    Missing rows are first inserted empty, skipping those another
+    transaction inserts at the same time, and locked like the others.
+    """
+    totals = {key: t for key, t in totals.items() if t != Total()}
+    if not totals:
+        return
+
+    rows = _lock(totals)
+    missing = totals.keys() - rows.keys()
+    if missing:
+        DailyProjectTotal.objects.bulk_create(
+            [DailyProjectTotal(project_id=p, day=d) for p, d in missing],
+            ignore_conflicts=True,
+        )
+        rows.update(_lock(missing))
+
+    updated, deleted = [], []
+    for key, total in totals.items():
+        row = rows[key]
+        row.num_records += total.num_records
+        row.duration += total.duration
+        if row.num_records > 0:
+            updated.append(row)
+        else:
+            deleted.append(row.pk)
+
+    if deleted:
+        DailyProjectTotal.objects.filter(pk__in=deleted).delete()
+    if updated:
+        DailyProjectTotal.objects.bulk_update(
+            updated, ["num_records", "duration"]
+        )
+
+
+def rebuild(projects: Iterable[int] | None = None):
+    """Recompute the daily totals, of all or of the given project ids."""
+    records = TimeRecord.objects.all()
+    rows = DailyProjectTotal.objects.all()
+    if projects is not None:
+        projects = list(projects)
+        records = records.filter(project__in=projects)
+        rows = rows.filter(project__in=projects)
+
+    rows.delete()
+    DailyProjectTotal.objects.bulk_create(
+        (
+            DailyProjectTotal(
+                project_id=project,
+                day=day,
+                duration=total.duration,
+                num_records=total.num_records,
+            )
+            for (project, day), total in queryset_totals(records).items()
+        ),
+        batch_size=settings.IMPORT_BATCH_SIZE,
+    )
+
+
+def _lock(keys: Iterable[Key]) -> dict[Key, DailyProjectTotal]:
+    keys = set(keys)
+    days = [day for _, day in keys]
+    rows = DailyProjectTotal.objects.select_for_update().filter(
+        project__in={project for project, _ in keys},
+        day__range=(min(days), max(days)),
+    )
+    return {
+        (row.project_id, row.day): row
+        for row in rows
+        if (row.project_id, row.day) in keys
+    }
@@ -0,0 +1,180 @@
+"""Fast JSON output of categories, projects and time records.
+
+Rows are fetched with ``values_list`` and written as JSON text directly
+(see ``hydra_core.fastjson``). The output is byte for byte the same as
+rendering the rows with the views' output serializers.
+
+The complete configuration is written the same way, section by section
+while the rows are read from database cursors, so the memory needed to
+stream the export doesn't grow with the number of records.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from hydra_core import fastjson
+from hydra_core.fastjson import DateTimeFormatter, RawJSON
+
+from .models import Category, Project, TimeRecord
+
+__all__ = (
+    "CATEGORY_FIELDS",
+    "PROJECT_FIELDS",
+    "TIME_RECORD_FIELDS",
+    "dump_categories",
+    "dump_projects",
+    "dump_time_records",
+    "iter_config_json",
+)
+
+Row = Sequence[Any]
+Encoder = Callable[[Row, DateTimeFormatter], str]
+
+CATEGORY_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "num_records",
+    "created",
+    "updated",
+)
+PROJECT_FIELDS = (
+    "id",
+    "category",
+    "name",
+    "description",
+    "num_records",
+    "created",
+    "updated",
+)
+TIME_RECORD_FIELDS = ("id", "project", "start_time", "stop_time", "approved")
+
+
+def dump_categories(rows: Iterable[Row]) -> RawJSON:
+    """Render rows of ``CATEGORY_FIELDS`` like ``CategoryList``."""
+    return _dump(rows, _category_json)
+
+
+def dump_projects(rows: Iterable[Row]) -> RawJSON:
+    """Render rows of ``PROJECT_FIELDS`` like ``ProjectList``."""
+    return _dump(rows, _project_json)
+
+
+def dump_time_records(rows: Iterable[Row]) -> RawJSON:
+    """Render rows of ``TIME_RECORD_FIELDS`` like ``TimeRecordList``."""
+    return _dump(rows, _time_record_json)
+
+
+def iter_config_json(chunk_size: int | None = None) -> Iterator[bytes]:
+    """Yield the configuration document as chunks of UTF-8 encoded JSON.
+
+    Joined, the chunks are the same as the rendered
+    ``ConfigView.OutputSerializer``.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    fmt = DateTimeFormatter()
+
+    sections = (
+        ("categories", _categories(), _config_category_json),
+        ("projects", _projects(), _project_json),
+        ("time_records", _time_records(), _time_record_json),
+    )
+
+    for i, (name, queryset, encode) in enumerate(sections):
+        prefix = "{" if i == 0 else "],"
+        yield f'{prefix}"{name}":['.encode("utf-8")
+        yield from _iter_chunks(queryset, encode, fmt, chunk_size)
+
+    yield b"]}"
+
+
+def _dump(rows: Iterable[Row], encode: Encoder) -> RawJSON:
+    fmt = DateTimeFormatter()
+    return RawJSON(fastjson.join(encode(row, fmt) for row in rows))
+
+
+def _iter_chunks(
+    queryset: QuerySet,
+    encode: Encoder,
+    fmt: DateTimeFormatter,
+    chunk_size: int,
+) -> Iterator[bytes]:
+    chunk: list[str] = []
+    separator = ""
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(separator + encode(row, fmt))
+        separator = ","
+        if len(chunk) >= chunk_size:
+            yield fastjson.escape("".join(chunk)).encode("utf-8")
+            chunk = []
+
+    if chunk:
+        yield fastjson.escape("".join(chunk)).encode("utf-8")
+
+
+def _categories() -> QuerySet:
+    return (
+        Category.objects.with_num_records()
+        .order_by("id")
+        .values_list(*CATEGORY_FIELDS, "user__username")
+    )
+
+
+def _projects() -> QuerySet:
+    return (
+        Project.objects.with_num_records()
+        .order_by("id")
+        .values_list(*PROJECT_FIELDS)
+    )
+
+
+def _time_records() -> QuerySet:
+    return TimeRecord.objects.order_by("id").values_list(*TIME_RECORD_FIELDS)
+
+
+def _category_json(row: Row, fmt: DateTimeFormatter) -> str:
+    pk, name, description, num_records, created, updated = row
+    return (
+        f'{{"id":{pk},"name":{fastjson.string(name)},'
+        f'"description":{fastjson.string(description)},'
+        f'"num_records":{num_records},'
+        f'"created":{fmt(created)},"updated":{fmt(updated)}}}'
+    )
+
+
+def _project_json(row: Row, fmt: DateTimeFormatter) -> str:
+    pk, category, name, description, num_records, created, updated = row
+    return (
+        f'{{"id":{pk},"category":{category},'
+        f'"name":{fastjson.string(name)},'
+        f'"description":{fastjson.string(description)},'
+        f'"num_records":{num_records},'
+        f'"created":{fmt(created)},"updated":{fmt(updated)}}}'
+    )
+
+
+def _time_record_json(row: Row, fmt: DateTimeFormatter) -> str:
+    pk, project, start_time, stop_time, approved = row
+    return (
+        f'{{"id":{pk},"project":{project},'
+        f'"start_time":{fmt(start_time)},"stop_time":{fmt(stop_time)},'
+        f'"total_seconds":{_total_seconds(start_time, stop_time)},'
+        f'"approved":{fastjson.boolean(approved)}}}'
+    )
+
+
+def _config_category_json(row: Row, fmt: DateTimeFormatter) -> str:
+    *category, username = row
+    return (
+        f"{_category_json(category, fmt)[:-1]},"
+        f'"user":{fastjson.string(username)}}}'
+    )
+
+
+def _total_seconds(start_time, stop_time) -> str:
+    if stop_time is None:
+        return "null"
+    return str(int((stop_time - start_time).total_seconds()))
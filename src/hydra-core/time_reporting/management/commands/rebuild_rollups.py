@@ -0,0 +1,29 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from time_reporting import daily_totals, rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the project and category rollups and the daily totals "
+        "from the records"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only rebuild the totals of this project",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rollups.rebuild(options["projects"])
+        daily_totals.rebuild(options["projects"])
+
+        self.stdout.write(
+            self.style.SUCCESS("Successfully rebuilt rollups and daily totals")
+        )
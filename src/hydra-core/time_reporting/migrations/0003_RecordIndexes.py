@@ -0,0 +1,26 @@
+# Generated by Django 4.1.3 on 2026-10-18 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("time_reporting", "0002_RecordApproval"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="timerecord",
+            index=models.Index(
+                fields=["project", "start_time"],
+                name="timerecord_project_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timerecord",
+            index=models.Index(
+                fields=["start_time"], name="timerecord_start_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 4.1.3 on 2026-10-18 06:28
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Count, DurationField, F, Max, Min, Q, Sum
+import django.db.models.deletion
+
+
+def build_rollups(apps, schema_editor):
+    Category = apps.get_model("time_reporting", "Category")
+    Project = apps.get_model("time_reporting", "Project")
+    CategoryRollup = apps.get_model("time_reporting", "CategoryRollup")
+    ProjectRollup = apps.get_model("time_reporting", "ProjectRollup")
+
+    projects = Project.objects.annotate(
+        n=Count("records"),
+        approved=Count("records", filter=Q(records__approved=True)),
+        duration=Sum(
+            F("records__stop_time") - F("records__start_time"),
+            output_field=DurationField(),
+        ),
+        first=Min("records__start_time"),
+        last=Max("records__start_time"),
+    ).values_list("pk", "n", "approved", "duration", "first", "last")
+    ProjectRollup.objects.bulk_create(
+        ProjectRollup(
+            project_id=pk,
+            num_records=n,
+            num_approved=approved,
+            total_duration=duration or datetime.timedelta(),
+            first_start=first,
+            last_start=last,
+        )
+        for pk, n, approved, duration, first, last in projects
+    )
+
+    categories = Category.objects.annotate(
+        n=Sum("projects__rollup__num_records"),
+        approved=Sum("projects__rollup__num_approved"),
+        duration=Sum("projects__rollup__total_duration"),
+        first=Min("projects__rollup__first_start"),
+        last=Max("projects__rollup__last_start"),
+    ).values_list("pk", "n", "approved", "duration", "first", "last")
+    CategoryRollup.objects.bulk_create(
+        CategoryRollup(
+            category_id=pk,
+            num_records=n or 0,
+            num_approved=approved or 0,
+            total_duration=duration or datetime.timedelta(),
+            first_start=first,
+            last_start=last,
+        )
+        for pk, n, approved, duration, first, last in categories
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("time_reporting", "0003_RecordIndexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryRollup",
+            fields=[
+                ("num_records", models.PositiveIntegerField(default=0)),
+                ("num_approved", models.PositiveIntegerField(default=0)),
+                (
+                    "total_duration",
+                    models.DurationField(default=datetime.timedelta),
+                ),
+                ("first_start", models.DateTimeField(blank=True, null=True)),
+                ("last_start", models.DateTimeField(blank=True, null=True)),
+                (
+                    "category",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rollup",
+                        serialize=False,
+                        to="time_reporting.category",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ProjectRollup",
+            fields=[
+                ("num_records", models.PositiveIntegerField(default=0)),
+                ("num_approved", models.PositiveIntegerField(default=0)),
+                (
+                    "total_duration",
+                    models.DurationField(default=datetime.timedelta),
+                ),
+                ("first_start", models.DateTimeField(blank=True, null=True)),
+                ("last_start", models.DateTimeField(blank=True, null=True)),
+                (
+                    "project",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rollup",
+                        serialize=False,
+                        to="time_reporting.project",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
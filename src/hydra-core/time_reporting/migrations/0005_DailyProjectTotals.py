@@ -0,0 +1,81 @@
+# Generated by Django 4.1.3 on 2026-10-18 06:38
+
+import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from time_reporting.daily_totals import split_days
+
+
+def build_daily_totals(apps, schema_editor):
+    DailyProjectTotal = apps.get_model("time_reporting", "DailyProjectTotal")
+    TimeRecord = apps.get_model("time_reporting", "TimeRecord")
+
+    totals = {}
+    records = TimeRecord.objects.filter(stop_time__isnull=False).values_list(
+        "project", "start_time", "stop_time"
+    )
+    for project, start, stop in records.iterator():
+        for day, duration in split_days(start, stop):
+            n, total = totals.get((project, day), (0, datetime.timedelta()))
+            totals[project, day] = (n + 1, total + duration)
+
+    DailyProjectTotal.objects.bulk_create(
+        (
+            DailyProjectTotal(
+                project_id=project, day=day, num_records=n, duration=duration
+            )
+            for (project, day), (n, duration) in totals.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("time_reporting", "0004_Rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyProjectTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("duration", models.DurationField(default=datetime.timedelta)),
+                ("num_records", models.PositiveIntegerField(default=0)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_totals",
+                        to="time_reporting.project",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="dailyprojecttotal",
+            index=models.Index(
+                fields=["day"], name="dailyprojecttotal_day_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyprojecttotal",
+            constraint=models.UniqueConstraint(
+                fields=("project", "day"),
+                name="dailyprojecttotal_project_day_uniq",
+            ),
+        ),
+        migrations.RunPython(build_daily_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.1.3 on 2026-10-18 07:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("time_reporting", "0005_DailyProjectTotals"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence", models.PositiveBigIntegerField()),
+                (
+                    "resource",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("category", "Category"),
+                            ("project", "Project"),
+                            ("record", "Record"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                            ("reset", "Reset"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="changes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="changelogentry",
+            index=models.Index(
+                fields=["created"], name="changelogentry_created_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="changelogentry",
+            constraint=models.UniqueConstraint(
+                fields=("user", "sequence"),
+                name="changelogentry_user_sequence_uniq",
+            ),
+        ),
+    ]
@@ -1,13 +1,25 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 
+class CategoryQuerySet(models.QuerySet):
+    def with_num_records(self):
+        return self.annotate(
+            num_records=Coalesce(models.F("rollup__num_records"), 0)
+        )
+
+
 class Category(models.Model):
     class Meta:
         unique_together = ("user", "name")
 
+    objects = CategoryQuerySet.as_manager()
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE
     )
@@ -21,7 +33,16 @@ class Category(models.Model):
         return self.name
 
 
+class ProjectQuerySet(models.QuerySet):
+    def with_num_records(self):
+        return self.annotate(
+            num_records=Coalesce(models.F("rollup__num_records"), 0)
+        )
+
+
 class Project(models.Model):
+    objects = ProjectQuerySet.as_manager()
+
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     category = models.ForeignKey(
@@ -35,6 +56,15 @@ class Project(models.Model):
 
 
 class TimeRecord(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["project", "start_time"],
+                name="timerecord_project_start_idx",
+            ),
+            models.Index(fields=["start_time"], name="timerecord_start_idx"),
+        ]
+
     project = models.ForeignKey(
         Project, on_delete=models.PROTECT, related_name="records"
     )
@@ -48,10 +78,6 @@ class TimeRecord(models.Model):
             if self.stop_time < self.start_time:
                 raise ValidationError("Stop time must be after start time")
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super().save(*args, **kwargs)
-
     @property
     def total_seconds(self):
         if self.stop_time is not None:
@@ -60,3 +86,110 @@ class TimeRecord(models.Model):
 
     def __str__(self):
         return f"{self.start_time.isoformat()} - {self.project.name}"
+
+
+class Rollup(models.Model):
+    """Aggregates of the time records, kept up to date by ``rollups``.
+
+    ``total_duration`` only includes the records which have been stopped.
+    """
+
+    class Meta:
+        abstract = True
+
+    num_records = models.PositiveIntegerField(default=0)
+    num_approved = models.PositiveIntegerField(default=0)
+    total_duration = models.DurationField(default=timedelta)
+    first_start = models.DateTimeField(null=True, blank=True)
+    last_start = models.DateTimeField(null=True, blank=True)
+
+
+class ProjectRollup(Rollup):
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rollup",
+    )
+
+
+class CategoryRollup(Rollup):
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rollup",
+    )
+
+
+class DailyProjectTotal(models.Model):
+    """Time spent per project and day, kept up to date by ``daily_totals``.
+
+    Days are calendar days in ``settings.TIME_ZONE``, records crossing
+    midnight are split between the days they cover. Records which are still
+    running are left out.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "day"],
+                name="dailyprojecttotal_project_day_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day"], name="dailyprojecttotal_day_idx"),
+        ]
+
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="daily_totals"
+    )
+    day = models.DateField()
+    duration = models.DurationField(default=timedelta)
+    num_records = models.PositiveIntegerField(default=0)
+
+
+class ChangeLogEntry(models.Model):
+    """A change to the data of a user, written by ``changelog``.
+
+    ``sequence`` counts the changes of every user separately. ``object_id``
+    and ``resource`` are empty for a reset, which tells clients to reload
+    all data.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "sequence"],
+                name="changelogentry_user_sequence_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["created"], name="changelogentry_created_idx"
+            ),
+        ]
+
+    class Resource(models.TextChoices):
+        CATEGORY = "category"
+        PROJECT = "project"
+        RECORD = "record"
+
+    class Action(models.TextChoices):
+        CREATED = "created"
+        UPDATED = "updated"
+        DELETED = "deleted"
+        RESET = "reset"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="changes",
+    )
+    sequence = models.PositiveBigIntegerField()
+    resource = models.CharField(
+        max_length=16, choices=Resource.choices, blank=True
+    )
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=16, choices=Action.choices)
+    created = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,332 @@
+"""Incremental maintenance of the per-project and per-category rollups.
+
+Every service writing time records describes its effect on the projects as
+a ``Delta`` per project and hands it to ``apply``, inside the same
+transaction as the write. Counts and durations are adjusted with a single
+``UPDATE ... SET num_records = num_records + n`` per project and category,
+the first and last start times are re-read through the
+``(project, start_time)`` index in the same statement.
+
+The services create empty rollups along with their projects and
+categories, see ``create``. Rollups which are missing anyway, e.g. of rows
+written outside the services, are built from the records when they are
+first needed. ``rebuild`` recomputes all of them from scratch.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Iterable
+
+from django.db.models import (
+    Count,
+    DurationField,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+)
+
+from .models import (
+    Category,
+    CategoryRollup,
+    Project,
+    ProjectRollup,
+    TimeRecord,
+)
+
+__all__ = (
+    "Delta",
+    "apply",
+    "apply_categories",
+    "category_deltas",
+    "create",
+    "move_project",
+    "queryset_deltas",
+    "rebuild",
+    "record_delta",
+)
+
+
+@dataclass
+class Delta:
+    num_records: int = 0
+    num_approved: int = 0
+    total_duration: timedelta = field(default_factory=timedelta)
+
+    def __add__(self, other: Delta) -> Delta:
+        return Delta(
+            self.num_records + other.num_records,
+            self.num_approved + other.num_approved,
+            self.total_duration + other.total_duration,
+        )
+
+    def __neg__(self) -> Delta:
+        return Delta(
+            -self.num_records, -self.num_approved, -self.total_duration
+        )
+
+
+def create(*, projects: Iterable[int] = (), categories: Iterable[int] = ()):
+    """Create the empty rollups of new projects and categories.
+
+    With their rollups in place, the first records of a project only ever
+    update them. Concurrent writers building a missing rollup would insert
+    the same row, and the changes of all but the first would be lost.
+    """
+    ProjectRollup.objects.bulk_create(
+        ProjectRollup(project_id=pk) for pk in projects
+    )
+    CategoryRollup.objects.bulk_create(
+        CategoryRollup(category_id=pk) for pk in categories
+    )
+
+
+def record_delta(record: TimeRecord) -> Delta:
+    """The contribution of ``record`` to the rollup of its project."""
+    duration = timedelta()
+    if record.stop_time is not None:
+        duration = record.stop_time - record.start_time
+    return Delta(1, int(record.approved), duration)
+
+
+def queryset_deltas(queryset: QuerySet[TimeRecord]) -> dict[int, Delta]:
+    """The contribution of the records in ``queryset`` per project."""
+    rows = (
+        queryset.order_by()
+        .values("project")
+        .annotate(
+            n=Count("id"),
+            approved=Count("id", filter=Q(approved=True)),
+            duration=Sum(
+                F("stop_time") - F("start_time"), output_field=DurationField()
+            ),
+        )
+        .values_list("project", "n", "approved", "duration")
+    )
+    return {
+        project: Delta(n, approved, duration or timedelta())
+        for project, n, approved, duration in rows
+    }
+
+
+def apply(deltas: dict[int, Delta], categories: dict[int, int] | None = None):
+    """Apply the per-project ``deltas`` to the project and category rollups.
+
+    Must be called after the records have been written. ``categories`` maps
+    project ids to their category ids. The rollups of the categories which
+    aren't in it are updated through their projects instead, one project
+    at a time.
+    """
+    if not deltas:
+        return
+
+    categories = categories or {}
+
+    # Concurrent writers of the same projects, or of projects of the same
+    # categories, take turns from here on. Under READ COMMITTED, the first
+    # and last start times are then re-read once the records and rollups
+    # of the other writer are committed.
+    _lock(Project.objects.filter(pk__in=deltas))
+    _lock(
+        Category.objects.filter(
+            pk__in=Project.objects.filter(pk__in=deltas).values("category")
+        )
+    )
+
+    missing = [
+        project_id
+        for project_id, delta in deltas.items()
+        if not _update_project(project_id, delta)
+    ]
+    if missing:
+        _build_projects(Project.objects.filter(pk__in=missing))
+
+    by_category: defaultdict[int, Delta] = defaultdict(Delta)
+    missing = []
+    for project_id, delta in deltas.items():
+        if project_id in categories:
+            by_category[categories[project_id]] += delta
+        else:
+            project = Project.objects.filter(pk=project_id)
+            condition = Q(category__in=project.values("category"))
+            if not _update_category(condition, delta):
+                missing.append(project_id)
+
+    _apply_categories(by_category)
+    if missing:
+        _build_categories(Category.objects.filter(projects__in=missing))
+
+
+def apply_categories(deltas: dict[int, Delta]):
+    """Apply the per-category ``deltas`` to the category rollups."""
+    _lock(Category.objects.filter(pk__in=deltas))
+    _apply_categories(deltas)
+
+
+def _apply_categories(deltas: dict[int, Delta]):
+    missing = [
+        category_id
+        for category_id, delta in deltas.items()
+        if not _update_category(Q(category=category_id), delta)
+    ]
+    if missing:
+        _build_categories(Category.objects.filter(pk__in=missing))
+
+
+def category_deltas(projects: QuerySet[Project]) -> dict[int, Delta]:
+    """The contribution of the ``projects`` to their category rollups."""
+    rows = (
+        ProjectRollup.objects.filter(project__in=projects)
+        .values("project__category")
+        .annotate(
+            n=Sum("num_records"),
+            approved=Sum("num_approved"),
+            duration=Sum("total_duration"),
+        )
+        .values_list("project__category", "n", "approved", "duration")
+    )
+    return {
+        category: Delta(n, approved, duration or timedelta())
+        for category, n, approved, duration in rows
+    }
+
+
+def move_project(project: Project, old_category_id: int):
+    """Move the rollup of ``project`` over from its previous category.
+
+    Must be called after the project has been saved.
+    """
+    if project.category_id == old_category_id:
+        return
+
+    deltas = category_deltas(Project.objects.filter(pk=project.pk))
+    if project.category_id in deltas:
+        delta = deltas[project.category_id]
+        apply_categories({old_category_id: -delta, project.category_id: delta})
+
+
+def rebuild(projects: Iterable[int] | None = None):
+    """Recompute the rollups from the time records.
+
+    Rebuilds all rollups, or those of the given project ids and of their
+    categories.
+    """
+    project_queryset = Project.objects.all()
+    category_queryset = Category.objects.all()
+    if projects is not None:
+        project_queryset = project_queryset.filter(pk__in=list(projects))
+        category_queryset = category_queryset.filter(
+            pk__in=project_queryset.values("category")
+        )
+
+    ProjectRollup.objects.filter(project__in=project_queryset).delete()
+    _build_projects(project_queryset)
+
+    CategoryRollup.objects.filter(category__in=category_queryset).delete()
+    _build_categories(category_queryset)
+
+
+def _lock(queryset: QuerySet):
+    list(queryset.select_for_update().order_by("pk").values_list("pk"))
+
+
+def _update_project(project_id: int, delta: Delta) -> int:
+    records = TimeRecord.objects.filter(project=OuterRef("project"))
+    return _update(
+        ProjectRollup.objects.filter(project=project_id),
+        delta,
+        first_start=Subquery(
+            records.order_by("start_time").values("start_time")[:1]
+        ),
+        last_start=Subquery(
+            records.order_by("-start_time").values("start_time")[:1]
+        ),
+    )
+
+
+def _update_category(condition: Q, delta: Delta) -> int:
+    rollups = ProjectRollup.objects.filter(
+        project__category=OuterRef("category")
+    )
+    return _update(
+        CategoryRollup.objects.filter(condition),
+        delta,
+        first_start=Subquery(
+            rollups.filter(first_start__isnull=False)
+            .order_by("first_start")
+            .values("first_start")[:1]
+        ),
+        last_start=Subquery(
+            rollups.filter(last_start__isnull=False)
+            .order_by("-last_start")
+            .values("last_start")[:1]
+        ),
+    )
+
+
+def _update(queryset: QuerySet, delta: Delta, **bounds) -> int:
+    return queryset.update(
+        num_records=F("num_records") + delta.num_records,
+        num_approved=F("num_approved") + delta.num_approved,
+        total_duration=F("total_duration") + delta.total_duration,
+        **bounds,
+    )
+
+
+def _build_projects(queryset: QuerySet[Project]):
+    rows = queryset.annotate(
+        n=Count("records"),
+        approved=Count("records", filter=Q(records__approved=True)),
+        duration=Sum(
+            F("records__stop_time") - F("records__start_time"),
+            output_field=DurationField(),
+        ),
+        first=Min("records__start_time"),
+        last=Max("records__start_time"),
+    ).values_list("pk", "n", "approved", "duration", "first", "last")
+
+    ProjectRollup.objects.bulk_create(
+        [
+            ProjectRollup(
+                project_id=pk,
+                num_records=n,
+                num_approved=approved,
+                total_duration=duration or timedelta(),
+                first_start=first,
+                last_start=last,
+            )
+            for pk, n, approved, duration, first, last in rows
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _build_categories(queryset: QuerySet[Category]):
+    rows = queryset.annotate(
+        n=Sum("projects__rollup__num_records"),
+        approved=Sum("projects__rollup__num_approved"),
+        duration=Sum("projects__rollup__total_duration"),
+        first=Min("projects__rollup__first_start"),
+        last=Max("projects__rollup__last_start"),
+    ).values_list("pk", "n", "approved", "duration", "first", "last")
+
+    CategoryRollup.objects.bulk_create(
+        [
+            CategoryRollup(
+                category_id=pk,
+                num_records=n or 0,
+                num_approved=approved or 0,
+                total_duration=duration or timedelta(),
+                first_start=first,
+                last_start=last,
+            )
+            for pk, n, approved, duration, first, last in rows
+        ],
+        ignore_conflicts=True,
+    )
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-from datetime import datetime
+from collections import defaultdict
+import copy
+from datetime import date, datetime
 import logging
+from typing import Collection
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.db.models.deletion import Collector
 from django.utils import timezone
 
+from hydra_core import versions
+
+from . import changelog, daily_totals, rollups
+from .changelog import Action, Resource
 from .models import Category, Project, TimeRecord
 
 User = get_user_model()
@@ -24,7 +35,13 @@ def create_category(
     description: str | None = None,
 ):
     category = Category(pk=pk, user=user, name=name, description=description)
-    category.save()
+    category.save(force_insert=True)
+    rollups.create(categories=[category.pk])
+    _log(
+        changelog.changes(
+            [user.pk], Resource.CATEGORY, [category.pk], Action.CREATED
+        )
+    )
     log.info("Created category %s", category)
 
     return category
@@ -34,18 +51,25 @@ def create_category(
 def update_category(
     *,
     pk: int | None = None,
+    queryset: QuerySet[Category] | None = None,
     user: settings.AUTH_USER_MODEL,
     name: str,
     description: str | None = None,
 ):
 
-    category = Category.objects.get(pk=pk)
+    category = _get(Category, queryset, pk)
+    owners = [category.user_id, user.pk]
 
     category.user = user
     category.name = name
     category.description = description
 
-    category.save()
+    category.save(update_fields=["user", "name", "description", "updated"])
+    _log(
+        changelog.changes(
+            owners, Resource.CATEGORY, [category.pk], Action.UPDATED
+        )
+    )
 
     log.info("Updated category %s", category)
     return category
@@ -55,16 +79,26 @@ def update_category(
 def patch_category(
     *,
     pk: int | None = None,
+    queryset: QuerySet[Category] | None = None,
     user: settings.AUTH_USER_MODEL,
     **kwargs,
 ):
-    category = Category.objects.get(pk=pk)
+    category = _get(Category, queryset, pk)
+    owners = [category.user_id, user.pk]
 
     category.user = user
-    category.name = kwargs.get("name", category.name)
-    category.description = kwargs.get("description", category.description)
-
-    category.save()
+    fields = ["user", "updated"]
+    for field in ("name", "description"):
+        if field in kwargs:
+            setattr(category, field, kwargs[field])
+            fields.append(field)
+
+    category.save(update_fields=fields)
+    _log(
+        changelog.changes(
+            owners, Resource.CATEGORY, [category.pk], Action.UPDATED
+        )
+    )
     log.info("Patched category %s", category)
 
     return category
@@ -72,7 +106,19 @@ def patch_category(
 
 @transaction.atomic
 def delete_category(*, pk: int | None = None):
-    Category.objects.filter(pk=pk).delete()
+    assert pk is not None
+    categories = Category.objects.filter(pk=pk)
+    # The projects of the category are deleted along with it. Their records
+    # are protected, so there are none left to log.
+    rows = list(categories.values_list("user", "projects"))
+    categories.delete()
+
+    owners = {user_id for user_id, _ in rows}
+    projects = [p for _, p in rows if p is not None]
+    _log(
+        changelog.changes(owners, Resource.PROJECT, projects, Action.DELETED)
+        + changelog.changes(owners, Resource.CATEGORY, [pk], Action.DELETED)
+    )
     log.info("Deleted category %s", pk)
 
 
@@ -84,12 +130,19 @@ def create_project(
     name: str,
     description: str | None = None,
 ):
-    project = category.projects.create(
+    project = Project(
         pk=pk,
+        category=category,
         name=name,
         description=description,
     )
-    project.save()
+    project.save(force_insert=True)
+    rollups.create(projects=[project.pk])
+    _log(
+        changelog.changes(
+            [category.user_id], Resource.PROJECT, [project.pk], Action.CREATED
+        )
+    )
     log.info("Created project %s", project)
 
     return project
@@ -99,17 +152,21 @@ def create_project(
 def update_project(
     *,
     pk: int | None = None,
+    queryset: QuerySet[Project] | None = None,
     category: Category,
     name: str,
     description: str | None = None,
 ):
 
-    project = Project.objects.get(pk=pk)
+    project = _get(Project, queryset, pk)
+    old_category_id = project.category_id
     project.category = category
     project.name = name
     project.description = description
 
-    project.save()
+    project.save(update_fields=["category", "name", "description", "updated"])
+    rollups.move_project(project, old_category_id)
+    _log_project_change(project, old_category_id)
     log.info("Updated project %s", project)
     return project
 
@@ -118,22 +175,32 @@ def update_project(
 def patch_project(
     *,
     pk: int | None = None,
+    queryset: QuerySet[Project] | None = None,
     **kwargs,
 ):
-    project = Project.objects.get(pk=pk)
-
-    project.category = kwargs.get("category", project.category)
-    project.name = kwargs.get("name", project.name)
-    project.description = kwargs.get("description", project.description)
-
-    project.save()
+    project = _get(Project, queryset, pk)
+    old_category_id = project.category_id
+
+    fields = ["updated"]
+    for field in ("category", "name", "description"):
+        if field in kwargs:
+            setattr(project, field, kwargs[field])
+            fields.append(field)
+
+    project.save(update_fields=fields)
+    rollups.move_project(project, old_category_id)
+    _log_project_change(project, old_category_id)
     log.info("Patched project %s", project)
     return project
 
 
 @transaction.atomic
 def delete_project(*, pk: int | None = None):
+    assert pk is not None
+    owners = _owners(projects=[pk])
+    # Records are protected, a project is only deleted once it has none
     Project.objects.filter(pk=pk).delete()
+    _log(changelog.changes(owners, Resource.PROJECT, [pk], Action.DELETED))
     log.info("Deleted project %s", pk)
 
 
@@ -147,93 +214,516 @@ def create_record(
     approved: bool | None = None,
 ):
 
+    _validate_times(start_time, stop_time)
+
     if approved is None:
         approved = start_time <= timezone.now()
 
-    record = project.records.create(
+    record = TimeRecord(
         pk=pk,
+        project=project,
         start_time=start_time,
         stop_time=stop_time,
         approved=approved,
     )
-    record.save()
-    log.info("Created time record %s", record)
+    record.save(force_insert=True)
+    rollups.apply({project.pk: rollups.record_delta(record)})
+    daily_totals.apply(daily_totals.record_totals(record))
+    _log(
+        changelog.changes(
+            _owners(projects=[project.pk]),
+            Resource.RECORD,
+            [record.pk],
+            Action.CREATED,
+        )
+    )
+    log.info("Created time record %d", record.pk)
 
     return record
 
 
+@transaction.atomic
+def create_records(
+    *,
+    user: settings.AUTH_USER_MODEL,
+    records: list[dict],
+    batch_size: int | None = None,
+) -> list[TimeRecord | ValidationError]:
+    """Create many time records for projects owned by ``user`` at once.
+
+    The referenced projects are loaded with a single query and the valid
+    records are written with ``bulk_create``. Returns, in the order of
+    ``records``, either the created record or the ``ValidationError``
+    explaining why that item was rejected.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    categories = dict(
+        Project.objects.filter(
+            category__user=user, pk__in={r["project"] for r in records}
+        ).values_list("pk", "category_id")
+    )
+
+    now = timezone.now()
+    results: list[TimeRecord | ValidationError] = []
+    for r in records:
+        try:
+            results.append(_build_record(r, categories.keys(), now))
+        except ValidationError as exc:
+            results.append(exc)
+
+    created = [r for r in results if isinstance(r, TimeRecord)]
+    TimeRecord.objects.bulk_create(created, batch_size=batch_size)
+
+    deltas: defaultdict[int, rollups.Delta] = defaultdict(rollups.Delta)
+    for record in created:
+        deltas[record.project_id] += rollups.record_delta(record)
+    rollups.apply(deltas, categories)
+    daily_totals.apply(
+        daily_totals.combine(*map(daily_totals.record_totals, created))
+    )
+    _log(
+        changelog.changes(
+            [user.pk], Resource.RECORD, [r.pk for r in created], Action.CREATED
+        )
+    )
+
+    log.info(
+        "Created %d time records, rejected %d",
+        len(created),
+        len(results) - len(created),
+    )
+
+    return results
+
+
+def _build_record(
+    r, project_ids: Collection[int], now: datetime
+) -> TimeRecord:
+    if r["project"] not in project_ids:
+        raise ValidationError({"project": f"Unknown project {r['project']}"})
+
+    stop_time = r.get("stop_time")
+    _validate_times(r["start_time"], stop_time)
+
+    approved = r.get("approved")
+    if approved is None:
+        approved = r["start_time"] <= now
+
+    return TimeRecord(
+        project_id=r["project"],
+        start_time=r["start_time"],
+        stop_time=stop_time,
+        approved=approved,
+    )
+
+
+def _log(changes: list[changelog.Change]):
+    """Write ``changes`` to the change log and replace the change markers
+    of their users.
+    """
+    changelog.write(changes)
+    versions.touch(c.user_id for c in changes)
+
+
+def _owners(*, categories=(), projects=()) -> set[int]:
+    """Return the users owning the given categories and projects."""
+    return set(
+        Category.objects.filter(
+            Q(pk__in=categories) | Q(projects__in=projects)
+        ).values_list("user", flat=True)
+    )
+
+
+def _log_project_change(project: Project, old_category_id: int):
+    owners = {project.category.user_id}
+    if project.category_id != old_category_id:
+        owners |= _owners(categories=[old_category_id])
+    _log(
+        changelog.changes(
+            owners, Resource.PROJECT, [project.pk], Action.UPDATED
+        )
+    )
+
+
+def _get(model, queryset: QuerySet | None, pk: int | None):
+    """Fetch the row ``pk`` of ``queryset``, or of all ``model`` rows.
+
+    Views pass the queryset they're scoped to, so that looking up the row
+    also checks that it belongs to the user.
+    """
+    if queryset is None:
+        queryset = model.objects.all()
+    return queryset.get(pk=pk)
+
+
+def _validate_times(start_time: datetime, stop_time: datetime | None):
+    if stop_time is not None and stop_time < start_time:
+        raise ValidationError(
+            {"stop_time": "Stop time must be after start time"}
+        )
+
+
 @transaction.atomic
 def update_record(
     *,
     pk: int | None = None,
+    queryset: QuerySet[TimeRecord] | None = None,
     project: Project,
     start_time: datetime,
     stop_time: datetime | None = None,
     approved: bool = False,
 ):
 
-    record = TimeRecord.objects.get(pk=pk)
+    _validate_times(start_time, stop_time)
+
+    record = _get(TimeRecord, queryset, pk)
+    old = copy.copy(record)
+
     record.project = project
     record.start_time = start_time
     record.stop_time = stop_time
     record.approved = approved
-    record.save()
-    log.info("Updated time record %s", record)
+    record.save(
+        update_fields=["project", "start_time", "stop_time", "approved"]
+    )
+    _apply_record_change(old, record)
+    log.info("Updated time record %d", record.pk)
 
     return record
 
 
 @transaction.atomic
-def patch_record(*, pk: int | None = None, **kwargs):
-    record = TimeRecord.objects.get(pk=pk)
+def patch_record(
+    *,
+    pk: int | None = None,
+    queryset: QuerySet[TimeRecord] | None = None,
+    **kwargs,
+):
+    record = _get(TimeRecord, queryset, pk)
+    old = copy.copy(record)
+
+    fields = []
+    for field in ("project", "start_time", "stop_time", "approved"):
+        if field in kwargs:
+            setattr(record, field, kwargs[field])
+            fields.append(field)
 
-    record.project = kwargs.get("project", record.project)
-    record.start_time = kwargs.get("start_time", record.start_time)
-    record.stop_time = kwargs.get("stop_time", record.stop_time)
-    record.approved = kwargs.get("approved", record.approved)
-    record.save()
+    _validate_times(record.start_time, record.stop_time)
+    record.save(update_fields=fields)
+    _apply_record_change(old, record)
 
-    log.info("Patched time record %s", record)
+    log.info("Patched time record %d", record.pk)
 
     return record
 
 
+def _apply_record_change(old: TimeRecord, record: TimeRecord):
+    deltas = {old.project_id: -rollups.record_delta(old)}
+    new_delta = rollups.record_delta(record)
+    if record.project_id in deltas:
+        deltas[record.project_id] += new_delta
+    else:
+        deltas[record.project_id] = new_delta
+    rollups.apply(deltas)
+
+    daily_totals.apply(
+        daily_totals.combine(
+            daily_totals.negate(daily_totals.record_totals(old)),
+            daily_totals.record_totals(record),
+        )
+    )
+    owners = _owners(projects={old.project_id, record.project_id})
+    _log(
+        changelog.changes(owners, Resource.RECORD, [record.pk], Action.UPDATED)
+    )
+
+
+@transaction.atomic
+def update_records(
+    queryset: QuerySet[TimeRecord],
+    *,
+    project: Project | None = None,
+    approved: bool | None = None,
+) -> int:
+    """Update the time records selected by ``queryset``.
+
+    Issues a single set-based ``UPDATE`` of the fields which aren't
+    ``None`` and returns the number of updated records.
+    """
+    fields: dict = {}
+    if project is not None:
+        fields["project"] = project
+    if approved is not None:
+        fields["approved"] = approved
+
+    if not fields:
+        return 0
+
+    # The records may no longer match the queryset after the update, their
+    # new contribution to the rollups is derived from the old one instead.
+    before = rollups.queryset_deltas(queryset)
+    totals = {}
+    if project is not None:
+        # Only moving records to another project changes the daily totals
+        totals = daily_totals.queryset_totals(queryset)
+    rows = list(queryset.values_list("pk", "project__category__user"))
+    updated = queryset.update(**fields)
+
+    deltas: defaultdict[int, rollups.Delta] = defaultdict(rollups.Delta)
+    for project_id, delta in before.items():
+        deltas[project_id] += -delta
+        if approved is not None:
+            delta.num_approved = delta.num_records if approved else 0
+        deltas[project.pk if project is not None else project_id] += delta
+    rollups.apply(deltas)
+
+    moved: defaultdict[tuple[int, date], daily_totals.Total]
+    moved = defaultdict(daily_totals.Total)
+    if project is not None:
+        for (_, day), total in totals.items():
+            moved[project.pk, day] += total
+    daily_totals.apply(
+        daily_totals.combine(daily_totals.negate(totals), moved)
+    )
+
+    changes = [
+        changelog.Change(owner, Resource.RECORD, pk, Action.UPDATED)
+        for pk, owner in rows
+    ]
+    if project is not None:
+        # Records moved to a project of another user appear in their log too
+        new_owner = project.category.user_id
+        changes += [
+            changelog.Change(new_owner, Resource.RECORD, pk, Action.UPDATED)
+            for pk, owner in rows
+            if owner != new_owner
+        ]
+    _log(changes)
+
+    log.info("Updated %d time records", updated)
+
+    return updated
+
+
 @transaction.atomic
 def delete_record(*, pk: int | None = None):
-    TimeRecord.objects.filter(pk=pk).delete()
+    delete_records(TimeRecord.objects.filter(pk=pk))
     log.info("Deleted time record %s", pk)
 
 
 @transaction.atomic
-def import_config(config):
+def delete_records(queryset: QuerySet[TimeRecord]) -> int:
+    """Delete the time records selected by ``queryset``.
+
+    ``QuerySet.delete()`` runs the deletion collector, which has to fetch
+    every row into Python whenever signal receivers or cascading relations
+    are involved. Time records have no dependent rows, so unless someone
+    connects a delete signal for them this issues a single set-based
+    ``DELETE ... WHERE`` and returns the number of deleted rows.
+    """
+    deltas = rollups.queryset_deltas(queryset)
+    totals = daily_totals.queryset_totals(queryset)
+    rows = list(queryset.values_list("pk", "project__category__user"))
+
+    deleted = _delete(queryset)
+
+    rollups.apply({p: -d for p, d in deltas.items()})
+    daily_totals.apply(daily_totals.negate(totals))
+    _log(
+        [
+            changelog.Change(owner, Resource.RECORD, pk, Action.DELETED)
+            for pk, owner in rows
+        ]
+    )
+    return deleted
 
-    log.debug("Importing configuration %s", config)
 
-    TimeRecord.objects.all().delete()
+@transaction.atomic
+def purge_records(queryset: QuerySet[TimeRecord]) -> int:
+    """Delete the time records selected by ``queryset`` in bulk.
+
+    Unlike ``delete_records``, the deleted records aren't logged one by one.
+    The change log of every user owning any of them is reset instead, which
+    tells their clients to reload all data.
+    """
+    deltas = rollups.queryset_deltas(queryset)
+    totals = daily_totals.queryset_totals(queryset)
+    owners = set(
+        queryset.order_by()
+        .values_list("project__category__user", flat=True)
+        .distinct()
+    )
+
+    deleted = _delete(queryset)
+
+    rollups.apply({p: -d for p, d in deltas.items()})
+    daily_totals.apply(daily_totals.negate(totals))
+    changelog.reset(owners)
+    versions.touch(owners)
+    return deleted
+
+
+def _delete(queryset: QuerySet[TimeRecord]) -> int:
+    if Collector(using=queryset.db).can_fast_delete(queryset):
+        return queryset._raw_delete(queryset.db)
+
+    log.debug("Fast delete not possible, using the deletion collector")
+    deleted, _ = queryset.delete()
+    return deleted
+
+
+@transaction.atomic
+def import_config(config, *, batch_size: int | None = None):
+    """Replace all categories, projects and records with ``config``.
+
+    Rows are validated in Python and written with ``bulk_create``, so the
+    number of queries depends on the number of batches rather than on the
+    number of rows. Since ``full_clean`` isn't run, the validation has to
+    cover every constraint of the tables: an invalid row must raise a
+    ``ValidationError`` rather than fail the insert.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    log.info(
+        "Importing %d categories, %d projects and %d time records",
+        len(config["categories"]),
+        len(config["projects"]),
+        len(config["time_records"]),
+    )
+
+    # The rollups, daily totals and change log are rebuilt from scratch
+    _delete(TimeRecord.objects.all())
     Category.objects.all().delete()
 
-    for c in config["categories"]:
-        create_category(
+    usernames = {c["user"] for c in config["categories"]}
+    users = dict(
+        User.objects.filter(username__in=usernames).values_list(
+            "username", "pk"
+        )
+    )
+
+    categories = list(_build_categories(config["categories"], users))
+    Category.objects.bulk_create(categories, batch_size=batch_size)
+
+    category_ids = {c.pk for c in categories}
+    projects = list(_build_projects(config["projects"], category_ids))
+    Project.objects.bulk_create(projects, batch_size=batch_size)
+
+    project_ids = {p.pk for p in projects}
+    record_ids: set[int] = set()
+    records = config["time_records"]
+    now = timezone.now()
+    for offset in range(0, len(records), batch_size):
+        end = offset + batch_size
+        batch = _build_records(
+            records[offset:end], project_ids, record_ids, offset, now
+        )
+        TimeRecord.objects.bulk_create(batch)
+
+    _reset_sequences(Category, Project, TimeRecord)
+    # Builds the rollups of all projects and categories, including the
+    # empty ones
+    rollups.rebuild()
+    daily_totals.rebuild()
+    changelog.reset()
+    versions.touch_all()
+
+
+def _build_categories(rows, users: dict[str, int]):
+    ids: set[int] = set()
+    names = set()
+    for i, c in enumerate(rows):
+        _check_id("categories", i, c["id"], ids)
+        _check_name("categories", i, Category, c["name"])
+        if c["user"] not in users:
+            raise ValidationError(
+                {"categories": f"Item {i}: unknown user {c['user']}"}
+            )
+
+        key = (c["user"], c["name"])
+        if key in names:
+            raise ValidationError(
+                {"categories": f"Item {i}: duplicate name {c['name']}"}
+            )
+        names.add(key)
+
+        yield Category(
             pk=c["id"],
-            user=User.objects.get(username=c["user"]),
+            user_id=users[c["user"]],
             name=c["name"],
             description=c["description"],
         )
 
-    for p in config["projects"]:
-        create_project(
+
+def _build_projects(rows, category_ids: set[int]):
+    ids: set[int] = set()
+    for i, p in enumerate(rows):
+        _check_id("projects", i, p["id"], ids)
+        _check_name("projects", i, Project, p["name"])
+        if p["category"] not in category_ids:
+            raise ValidationError(
+                {"projects": f"Item {i}: unknown category {p['category']}"}
+            )
+
+        yield Project(
             pk=p["id"],
-            category=Category.objects.get(pk=p["category"]),
+            category_id=p["category"],
             name=p["name"],
             description=p["description"],
         )
 
-    for r in config["time_records"]:
-        default_approved = r["start_time"] <= timezone.now()
-        create_record(
-            pk=r["id"],
-            project=Project.objects.get(pk=r["project"]),
-            start_time=r["start_time"],
-            stop_time=r["stop_time"],
-            approved=r.get("approved", default_approved),
+
+def _build_records(
+    rows,
+    project_ids: set[int],
+    ids: set[int],
+    offset: int,
+    now: datetime,
+) -> list[TimeRecord]:
+    records = []
+    for i, r in enumerate(rows, start=offset):
+        _check_id("time_records", i, r["id"], ids)
+        if r["project"] not in project_ids:
+            raise ValidationError(
+                {"time_records": f"Item {i}: unknown project {r['project']}"}
+            )
+
+        stop_time = r.get("stop_time")
+        if stop_time is not None and stop_time < r["start_time"]:
+            raise ValidationError(
+                {"time_records": f"Item {i}: stop time must be after start"}
+            )
+
+        records.append(
+            TimeRecord(
+                pk=r["id"],
+                project_id=r["project"],
+                start_time=r["start_time"],
+                stop_time=stop_time,
+                approved=r.get("approved", r["start_time"] <= now),
+            )
+        )
+    return records
+
+
+def _check_id(resource: str, i: int, pk: int, ids: set[int]):
+    if pk in ids:
+        raise ValidationError({resource: f"Item {i}: duplicate id {pk}"})
+    ids.add(pk)
+
+
+def _check_name(resource: str, i: int, model, name: str):
+    max_length = model._meta.get_field("name").max_length
+    if len(name) > max_length:
+        raise ValidationError(
+            {resource: f"Item {i}: name longer than {max_length} characters"}
         )
+
+
+def _reset_sequences(*models):
+    """Move the primary key sequences past the explicitly inserted ids."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
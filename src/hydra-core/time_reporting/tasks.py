@@ -1,7 +1,11 @@
+from __future__ import annotations
+
 from datetime import datetime, timedelta
 import time
 
 from celery import shared_task
+from celery.backends.base import DisabledBackend
+from celery.exceptions import SoftTimeLimitExceeded
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.db import transaction
@@ -9,19 +13,96 @@ from django.utils import timezone
 
 from hydra_core.models import Settings
 
+from . import changelog, services
 from .models import TimeRecord
 
 log = get_task_logger(__name__)
 
 
+@shared_task(bind=True, max_retries=None)
+def purge_old_records(self, cutoff: str | None = None, deleted: int = 0):
+    """Delete all records started before the retention period.
+
+    Records are deleted in batches of ``settings.PURGE_BATCH_SIZE``, each in
+    its own short transaction, pausing ``settings.PURGE_BATCH_SLEEP`` seconds
+    between batches so that other writers aren't locked out for the duration
+    of the purge.
+
+    Every batch is committed as soon as it is deleted, so when the task
+    runs out of time it is retried with the same ``cutoff`` and simply picks
+    up the records that are left.
+
+    The purged records aren't logged one by one, the change log of their
+    owners is reset after every batch instead.
+    """
+
+    if cutoff is None:
+        purge_before = get_cutoff()
+        if purge_before is None:
+            return 0
+    else:
+        purge_before = datetime.fromisoformat(cutoff)
+
+    log.info("Purging all records started before %s", purge_before.isoformat())
+
+    queryset = TimeRecord.objects.filter(start_time__lte=purge_before)
+
+    try:
+        while True:
+            batch = queryset.order_by("start_time").values("pk")[
+                : settings.PURGE_BATCH_SIZE
+            ]
+            with transaction.atomic():
+                count = services.purge_records(
+                    TimeRecord.objects.filter(pk__in=batch)
+                )
+            if not count:
+                break
+
+            deleted += count
+            log.debug("Purged %d records so far", deleted)
+            _report_progress(self, purge_before, deleted)
+
+            if settings.PURGE_BATCH_SLEEP:
+                time.sleep(settings.PURGE_BATCH_SLEEP)
+
+    except SoftTimeLimitExceeded as exc:
+        log.warning(
+            "Purge interrupted after %d records, scheduling retry", deleted
+        )
+        raise self.retry(
+            exc=exc,
+            countdown=0,
+            kwargs={"cutoff": purge_before.isoformat(), "deleted": deleted},
+        )
+
+    log.info("Purged %d records", deleted)
+    return deleted
+
+
 @shared_task
-@transaction.atomic
-def purge_old_records():
+def purge_changes():
+    """Delete the change log entries past ``settings.CHANGES_RETENTION_DAYS``.
+
+    The latest entry of every user is kept, clients syncing from before the
+    oldest remaining entry are told to reload all data.
+    """
+    before = timezone.now() - timedelta(days=settings.CHANGES_RETENTION_DAYS)
+    deleted = changelog.purge(before)
+    log.info("Purged %d change log entries", deleted)
+    return deleted
+
+
+def get_cutoff() -> datetime | None:
+    """Return the start time before which records should be purged.
+
+    Returns ``None`` if purging has been disabled.
+    """
 
     active_settings = Settings.objects.active()
     if active_settings.retention_period_days == 0:
         log.debug("Purging old records has been disabled")
-        return
+        return None
 
     if (
         active_settings.retention_period_days
@@ -38,7 +119,7 @@ def purge_old_records():
     now = (
         time.time() // 86400 * 86400
     )  # Floor the date to the start of the current day UTC
-    cutoff = timezone.make_aware(
+    return timezone.make_aware(
         datetime.fromtimestamp(
             now
             - timedelta(
@@ -46,6 +127,15 @@ def purge_old_records():
             ).total_seconds()
         )
     )
-    log.info("Purging all records started before %s", cutoff.isoformat())
 
-    TimeRecord.objects.filter(start_time__lte=cutoff).delete()
+
+def _report_progress(task, cutoff: datetime, deleted: int):
+    if task.request.called_directly or isinstance(
+        task.backend, DisabledBackend
+    ):
+        return
+
+    task.update_state(
+        state="PROGRESS",
+        meta={"cutoff": cutoff.isoformat(), "deleted": deleted},
+    )
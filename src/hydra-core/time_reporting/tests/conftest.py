@@ -1,3 +1,3 @@
-from hydra_core.tests.conftest import client, user
+from hydra_core.tests.conftest import clear_caches, client, user
 
-__all__ = ("client", "user")
+__all__ = ("clear_caches", "client", "user")
@@ -4,6 +4,7 @@ from factory.django import DjangoModelFactory
 import factory.fuzzy
 
 from hydra_core.tests.factories import UserFactory
+from time_reporting import services
 from time_reporting.models import Category, Project, TimeRecord
 
 
@@ -36,3 +37,8 @@ class TimeRecordFactory(DjangoModelFactory):
 
     class Meta:
         model = TimeRecord
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        # Keeps the project and category rollups up to date
+        return services.create_record(*args, **kwargs)
@@ -0,0 +1,202 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+import pytest
+from rest_framework import status
+
+from time_reporting import models
+
+from .factories import CategoryFactory, ProjectFactory, TimeRecordFactory
+from .test_daily_totals import (
+    _assert_consistent as _assert_daily_totals_consistent,
+)
+from .test_rollups import _assert_consistent
+from .test_views import CATEGORY_INDEX_VIEW
+
+
+def _datetime(name, value):
+    """Form data of the split date and time widget of the admin."""
+    value = timezone.localtime(value)
+    return {
+        f"{name}_0": value.strftime("%Y-%m-%d"),
+        f"{name}_1": value.strftime("%H:%M:%S"),
+    }
+
+
+def _record_data(project, start_time, stop_time):
+    return {
+        "project": project.pk,
+        **_datetime("start_time", start_time),
+        **_datetime("stop_time", stop_time),
+        "approved": "on",
+    }
+
+
+def _post(client, url, data):
+    resp = client.post(url, data)
+    # The admin redirects after saving, or shows the form with its errors
+    assert resp.status_code == 302, resp.content
+    return resp
+
+
+def _url(model, action, *args):
+    return reverse(f"admin:time_reporting_{model}_{action}", args=args)
+
+
+@pytest.mark.django_db
+def test_admin_category_and_project(admin_client, user):
+    _post(
+        admin_client,
+        _url("category", "add"),
+        {"user": user.pk, "name": "category", "description": ""},
+    )
+    category = models.Category.objects.get(name="category")
+    other = CategoryFactory(user=user)
+
+    _post(
+        admin_client,
+        _url("project", "add"),
+        {"category": category.pk, "name": "project", "description": ""},
+    )
+    project = models.Project.objects.get(name="project")
+    TimeRecordFactory(project=project)
+    assert models.ProjectRollup.objects.filter(project=project).exists()
+
+    # The rollup of the project moves along with it
+    _post(
+        admin_client,
+        _url("project", "change", project.pk),
+        {"category": other.pk, "name": "project", "description": ""},
+    )
+    assert models.CategoryRollup.objects.get(category=other).num_records == 1
+    _assert_consistent()
+
+
+@pytest.mark.django_db
+def test_admin_record(admin_client, user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    now = timezone.now().replace(microsecond=0)
+
+    _post(
+        admin_client,
+        _url("timerecord", "add"),
+        _record_data(project, now - timedelta(hours=2), now),
+    )
+    record = models.TimeRecord.objects.get()
+    assert project.rollup.num_records == 1
+    _assert_consistent()
+
+    _post(
+        admin_client,
+        _url("timerecord", "change", record.pk),
+        _record_data(project, now - timedelta(hours=1), now),
+    )
+    project.rollup.refresh_from_db()
+    assert project.rollup.total_duration == timedelta(hours=1)
+    _assert_consistent()
+
+    _post(
+        admin_client, _url("timerecord", "delete", record.pk), {"post": "yes"}
+    )
+    project.rollup.refresh_from_db()
+    assert project.rollup.num_records == 0
+    _assert_consistent()
+
+
+@pytest.mark.django_db
+def test_admin_delete_selected_records(admin_client, user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    records = TimeRecordFactory.create_batch(3, project=project)
+
+    _post(
+        admin_client,
+        _url("timerecord", "changelist"),
+        {
+            "action": "delete_selected",
+            "_selected_action": [r.pk for r in records[:2]],
+            "post": "yes",
+        },
+    )
+
+    project.rollup.refresh_from_db()
+    assert project.rollup.num_records == 1
+    _assert_consistent()
+
+
+@pytest.mark.django_db
+def test_admin_record_daily_totals(admin_client, user):
+    project, other = ProjectFactory.create_batch(
+        2, category=CategoryFactory(user=user)
+    )
+    now = timezone.now().replace(microsecond=0)
+    start = now - timedelta(days=1, hours=2)
+
+    _post(
+        admin_client,
+        _url("timerecord", "add"),
+        _record_data(project, start, now),
+    )
+    record = models.TimeRecord.objects.get()
+    assert models.DailyProjectTotal.objects.filter(project=project).exists()
+    _assert_daily_totals_consistent()
+
+    _post(
+        admin_client,
+        _url("timerecord", "change", record.pk),
+        _record_data(other, start, now),
+    )
+    assert not models.DailyProjectTotal.objects.filter(
+        project=project
+    ).exists()
+    _assert_daily_totals_consistent()
+
+    _post(
+        admin_client, _url("timerecord", "delete", record.pk), {"post": "yes"}
+    )
+    assert not models.DailyProjectTotal.objects.exists()
+
+
+@pytest.mark.django_db
+def test_admin_changes_etag(
+    admin_client, client, user, django_capture_on_commit_callbacks
+):
+    category = CategoryFactory(user=user)
+    url = reverse(CATEGORY_INDEX_VIEW)
+    etag = client.get(url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _post(
+            admin_client,
+            _url("category", "change", category.pk),
+            {"user": user.pk, "name": "renamed", "description": ""},
+        )
+
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json()[0]["name"] == "renamed"
+
+
+@pytest.mark.django_db
+def test_admin_writes_changes(admin_client, user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    now = timezone.now().replace(microsecond=0)
+
+    _post(
+        admin_client,
+        _url("timerecord", "add"),
+        _record_data(project, now - timedelta(hours=1), now),
+    )
+    record = models.TimeRecord.objects.get()
+    _post(
+        admin_client, _url("timerecord", "delete", record.pk), {"post": "yes"}
+    )
+
+    assert list(
+        models.ChangeLogEntry.objects.filter(user=user)
+        .order_by("sequence")
+        .values_list("resource", "object_id", "action")
+    )[-2:] == [
+        ("record", record.pk, "created"),
+        ("record", record.pk, "deleted"),
+    ]
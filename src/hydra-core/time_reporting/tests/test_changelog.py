@@ -0,0 +1,191 @@
+from datetime import timedelta
+import threading
+import time
+
+from django.db import connection, transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
+import pytest
+
+from hydra_core.tests.factories import UserFactory
+from time_reporting import changelog, models, services
+
+from .factories import CategoryFactory, ProjectFactory, TimeRecordFactory
+from .test_services import _config_for
+
+
+def _changes(user):
+    return list(
+        models.ChangeLogEntry.objects.filter(user=user)
+        .order_by("sequence")
+        .values_list("sequence", "resource", "object_id", "action")
+    )
+
+
+@pytest.mark.django_db
+def test_services_write_changes(user):
+    now = timezone.now()
+
+    category = services.create_category(user=user, name="category")
+    services.patch_category(pk=category.pk, user=user, name="renamed")
+    project = services.create_project(category=category, name="project")
+    services.patch_project(pk=project.pk, name="renamed")
+    record = services.create_record(project=project, start_time=now)
+    services.update_record(pk=record.pk, project=project, start_time=now)
+    services.patch_record(pk=record.pk, approved=True)
+    services.delete_record(pk=record.pk)
+    services.delete_project(pk=project.pk)
+    empty = services.create_project(category=category, name="empty")
+    services.delete_category(pk=category.pk)
+
+    assert _changes(user) == [
+        (1, "category", category.pk, "created"),
+        (2, "category", category.pk, "updated"),
+        (3, "project", project.pk, "created"),
+        (4, "project", project.pk, "updated"),
+        (5, "record", record.pk, "created"),
+        (6, "record", record.pk, "updated"),
+        (7, "record", record.pk, "updated"),
+        (8, "record", record.pk, "deleted"),
+        (9, "project", project.pk, "deleted"),
+        (10, "project", empty.pk, "created"),
+        (11, "project", empty.pk, "deleted"),
+        (12, "category", category.pk, "deleted"),
+    ]
+
+
+@pytest.mark.parametrize("delete", ["project", "category"])
+@pytest.mark.django_db
+def test_delete_with_records_is_refused(user, delete):
+    project = ProjectFactory(category__user=user)
+    records = TimeRecordFactory.create_batch(2, project=project)
+    logged = _changes(user)
+
+    # The records are never deleted along with their project, so clients
+    # can't be left with records whose deletion wasn't logged
+    with pytest.raises(ProtectedError):
+        if delete == "project":
+            services.delete_project(pk=project.pk)
+        else:
+            services.delete_category(pk=project.category_id)
+
+    assert models.TimeRecord.objects.filter(project=project).count() == len(
+        records
+    )
+    assert _changes(user) == logged
+
+
+@pytest.mark.django_db
+def test_bulk_services_write_changes(user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    models.ChangeLogEntry.objects.all().delete()
+    now = timezone.now()
+
+    created = services.create_records(
+        user=user,
+        records=[{"project": project.pk, "start_time": now}] * 2,
+    )
+    queryset = models.TimeRecord.objects.filter(project=project)
+    services.update_records(queryset, approved=True)
+    services.delete_records(queryset)
+
+    ids = [r.pk for r in created]
+    assert [c[1:] for c in _changes(user)] == (
+        [("record", pk, "created") for pk in ids]
+        + [("record", pk, "updated") for pk in ids]
+        + [("record", pk, "deleted") for pk in ids]
+    )
+
+
+@pytest.mark.django_db
+def test_update_records_to_other_user(user):
+    record = TimeRecordFactory(project__category__user=user)
+    other = ProjectFactory()
+    models.ChangeLogEntry.objects.all().delete()
+
+    services.update_records(
+        models.TimeRecord.objects.filter(pk=record.pk), project=other
+    )
+
+    assert _changes(user) == [(1, "record", record.pk, "updated")]
+    assert _changes(other.category.user) == [
+        (1, "record", record.pk, "updated")
+    ]
+
+
+@pytest.mark.django_db
+def test_sequences_per_user(user):
+    other = UserFactory()
+
+    services.create_category(user=user, name="first")
+    services.create_category(user=other, name="first")
+    services.create_category(user=user, name="second")
+
+    assert [c[0] for c in _changes(user)] == [1, 2]
+    assert [c[0] for c in _changes(other)] == [1]
+
+
+@pytest.mark.django_db
+def test_import_config_resets_changes(user):
+    other = UserFactory()
+    records = TimeRecordFactory.create_batch(3, project__category__user=user)
+    latest = _changes(user)[-1][0]
+
+    services.import_config(_config_for(records))
+
+    assert _changes(user) == [(latest + 1, "", None, "reset")]
+    assert _changes(other) == [(1, "", None, "reset")]
+
+
+@pytest.mark.django_db
+def test_purge_keeps_latest_change(user):
+    category = services.create_category(user=user, name="category")
+    services.create_project(category=category, name="first")
+    services.create_project(category=category, name="second")
+    models.ChangeLogEntry.objects.update(
+        created=timezone.now() - timedelta(days=2)
+    )
+    services.create_project(category=category, name="recent")
+
+    assert changelog.purge(timezone.now() - timedelta(days=1)) == 3
+    assert [c[0] for c in _changes(user)] == [4]
+
+    # Without newer changes, the latest one is kept however old it is
+    models.ChangeLogEntry.objects.update(
+        created=timezone.now() - timedelta(days=2)
+    )
+    assert changelog.purge(timezone.now()) == 0
+    assert changelog.bounds(user.pk) == (4, 4)
+
+
+@pytest.mark.skipif(
+    not connection.features.has_select_for_update,
+    reason="The database doesn't lock rows",
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_writes(user):
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def write():
+        try:
+            barrier.wait()
+            with transaction.atomic():
+                changelog.write(
+                    changelog.changes([user.pk], "category", [1], "updated")
+                )
+                # Hold the lock, so the other writer has to wait on it
+                time.sleep(0.2)
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=write) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert [c[0] for c in _changes(user)] == [1, 2]
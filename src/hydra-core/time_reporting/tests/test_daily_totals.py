@@ -0,0 +1,199 @@
+from datetime import date, datetime, timedelta, timezone
+import threading
+import time
+from zoneinfo import ZoneInfo
+
+from django.db import connection, transaction
+import pytest
+
+from time_reporting import daily_totals, models, services
+
+from .factories import CategoryFactory, ProjectFactory
+
+NEW_YORK = ZoneInfo("America/New_York")
+HOUR = timedelta(hours=1)
+
+
+def _local(*args):
+    return datetime(*args, tzinfo=NEW_YORK)
+
+
+def test_split_days_same_day():
+    start, stop = _local(2026, 10, 5, 9), _local(2026, 10, 5, 17)
+    assert list(daily_totals.split_days(start, stop, NEW_YORK)) == [
+        (date(2026, 10, 5), timedelta(hours=8)),
+    ]
+
+
+def test_split_days_crossing_midnight():
+    # Midnight in New York, not in UTC
+    start = _local(2026, 10, 5, 22).astimezone(timezone.utc)
+    stop = _local(2026, 10, 7, 2).astimezone(timezone.utc)
+    assert list(daily_totals.split_days(start, stop, NEW_YORK)) == [
+        (date(2026, 10, 5), timedelta(hours=2)),
+        (date(2026, 10, 6), timedelta(hours=24)),
+        (date(2026, 10, 7), timedelta(hours=2)),
+    ]
+
+
+def test_split_days_daylight_saving_time():
+    # Daylight saving time starts on March 8th and ends on November 1st
+    start, stop = _local(2026, 3, 7, 23), _local(2026, 3, 9, 1)
+    assert list(daily_totals.split_days(start, stop, NEW_YORK)) == [
+        (date(2026, 3, 7), timedelta(hours=1)),
+        (date(2026, 3, 8), timedelta(hours=23)),
+        (date(2026, 3, 9), timedelta(hours=1)),
+    ]
+
+    start, stop = _local(2026, 10, 31, 23), _local(2026, 11, 2, 1)
+    assert list(daily_totals.split_days(start, stop, NEW_YORK)) == [
+        (date(2026, 10, 31), timedelta(hours=1)),
+        (date(2026, 11, 1), timedelta(hours=25)),
+        (date(2026, 11, 2), timedelta(hours=1)),
+    ]
+
+
+def test_split_days_ending_at_midnight():
+    start, stop = _local(2026, 10, 5, 20), _local(2026, 10, 6)
+    assert list(daily_totals.split_days(start, stop, NEW_YORK)) == [
+        (date(2026, 10, 5), timedelta(hours=4)),
+    ]
+
+
+def _snapshot():
+    return sorted(
+        models.DailyProjectTotal.objects.values_list(
+            "project", "day", "num_records", "duration"
+        )
+    )
+
+
+def _assert_consistent():
+    maintained = _snapshot()
+    daily_totals.rebuild()
+    assert maintained == _snapshot()
+
+
+@pytest.mark.django_db
+def test_daily_totals_follow_record_services(user):
+    category = CategoryFactory(user=user)
+    project, other = ProjectFactory.create_batch(2, category=category)
+
+    record = services.create_record(
+        project=project,
+        start_time=_local(2026, 10, 31, 22),
+        stop_time=_local(2026, 11, 1, 3),
+    )
+    services.create_records(
+        user=user,
+        records=[
+            {
+                "project": other.pk,
+                "start_time": _local(2026, 11, 1, h),
+                "stop_time": _local(2026, 11, 1, h + 1),
+            }
+            for h in range(8, 12)
+        ],
+    )
+    _assert_consistent()
+    assert _snapshot() == [
+        (project.pk, date(2026, 10, 31), 1, timedelta(hours=2)),
+        # The clocks are turned back at 2 am
+        (project.pk, date(2026, 11, 1), 1, timedelta(hours=4)),
+        (other.pk, date(2026, 11, 1), 4, timedelta(hours=4)),
+    ]
+
+    services.patch_record(pk=record.pk, project=other)
+    _assert_consistent()
+
+    services.update_record(
+        pk=record.pk,
+        project=project,
+        start_time=_local(2026, 11, 2, 22),
+        stop_time=_local(2026, 11, 4, 1),
+    )
+    _assert_consistent()
+
+    services.update_records(models.TimeRecord.objects.all(), project=project)
+    _assert_consistent()
+    assert not models.DailyProjectTotal.objects.filter(project=other).exists()
+
+    services.delete_record(pk=record.pk)
+    _assert_consistent()
+    assert _snapshot() == [
+        (project.pk, date(2026, 11, 1), 4, timedelta(hours=4)),
+    ]
+
+    services.delete_records(models.TimeRecord.objects.all())
+    assert _snapshot() == []
+
+
+@pytest.mark.django_db
+def test_daily_totals_skip_running_records(user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+
+    record = services.create_record(
+        project=project, start_time=_local(2026, 10, 5, 9)
+    )
+    assert _snapshot() == []
+
+    services.patch_record(pk=record.pk, stop_time=_local(2026, 10, 5, 12))
+    assert _snapshot() == [
+        (project.pk, date(2026, 10, 5), 1, timedelta(hours=3)),
+    ]
+
+
+@pytest.mark.django_db
+def test_apply_adds_to_new_and_existing_days(user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    day = date(2026, 10, 5)
+    daily_totals.apply({(project.pk, day): daily_totals.Total(1, HOUR)})
+
+    daily_totals.apply(
+        {
+            (project.pk, day): daily_totals.Total(1, HOUR),
+            (project.pk, day + timedelta(days=1)): daily_totals.Total(1, HOUR),
+        }
+    )
+
+    assert sorted(
+        models.DailyProjectTotal.objects.values_list(
+            "day", "num_records", "duration"
+        )
+    ) == [(day, 2, 2 * HOUR), (day + timedelta(days=1), 1, HOUR)]
+
+
+@pytest.mark.skipif(
+    not connection.features.has_select_for_update,
+    reason="The database doesn't support concurrent writers",
+)
+@pytest.mark.django_db(transaction=True)
+def test_apply_concurrently_to_a_new_day(user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    day = date(2026, 10, 5)
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def apply():
+        try:
+            barrier.wait()
+            with transaction.atomic():
+                daily_totals.apply(
+                    {(project.pk, day): daily_totals.Total(1, HOUR)}
+                )
+                # Keep the row uncommitted while the other writer inserts
+                time.sleep(0.2)
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=apply) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    row = models.DailyProjectTotal.objects.get(project=project, day=day)
+    assert (row.num_records, row.duration) == (2, 2 * HOUR)
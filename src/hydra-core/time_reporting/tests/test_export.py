@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+from django.utils import timezone
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from hydra_core.fastjson import DateTimeFormatter
+from hydra_core.tests.factories import UserFactory
+from time_reporting import daily_totals, export, rollups
+from time_reporting.models import Category, Project, TimeRecord
+from time_reporting.views import (
+    CategoryList,
+    ConfigView,
+    ProjectList,
+    TimeRecordList,
+)
+
+GOLDEN_CONFIG = Path(__file__).parent / "golden" / "config.json"
+
+TIME_ZONES = (
+    "America/New_York",
+    "UTC",
+    "Asia/Kathmandu",
+    "America/St_Johns",
+    "Australia/Lord_Howe",
+)
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def golden_data():
+    """Rows with fixed values covering what the JSON output has to handle:
+    non-ASCII text, quotes and separators to escape, null descriptions,
+    running records and times at the transitions of daylight saving time.
+    """
+    user = UserFactory(username="golden")
+    Category.objects.bulk_create(
+        [
+            Category(
+                id=1,
+                user=user,
+                name="Ünïcode ☃",
+                description='"quoted"\\ line\u2028para\u2029\ttab',
+            ),
+            Category(id=2, user=user, name="plain", description=None),
+        ]
+    )
+    Project.objects.bulk_create(
+        [
+            Project(id=10, category_id=1, name="emoji 🚀", description=""),
+            Project(id=11, category_id=1, name="ctrl \x01", description=None),
+            Project(id=12, category_id=2, name="p", description="d"),
+        ]
+    )
+    TimeRecord.objects.bulk_create(
+        [
+            # Around the start and the end of daylight saving time in
+            # New York
+            TimeRecord(
+                id=100,
+                project_id=10,
+                start_time=_utc(2022, 3, 13, 6, 30),
+                stop_time=_utc(2022, 3, 13, 7, 30, 0, 500000),
+                approved=True,
+            ),
+            TimeRecord(
+                id=101,
+                project_id=10,
+                start_time=_utc(2022, 11, 6, 5, 59, 59, 999999),
+                stop_time=_utc(2022, 11, 6, 6, 0, 1),
+                approved=False,
+            ),
+            # Around the start of daylight saving time in Lord Howe
+            TimeRecord(
+                id=102,
+                project_id=11,
+                start_time=_utc(2022, 10, 1, 15, 0),
+                stop_time=_utc(2022, 10, 1, 15, 45, 30),
+                approved=True,
+            ),
+            TimeRecord(
+                id=103,
+                project_id=12,
+                start_time=_utc(2023, 1, 1, 0, 0, 0, 1),
+                stop_time=None,
+                approved=False,
+            ),
+        ]
+    )
+    rollups.rebuild()
+    daily_totals.rebuild()
+
+    created = _utc(2021, 12, 31, 23, 59, 59, 123456)
+    updated = _utc(2022, 7, 1, 12)
+    Category.objects.update(created=created, updated=updated)
+    Project.objects.update(created=created, updated=updated)
+
+
+def serialize_config():
+    """Serialize the configuration with ``ConfigView.OutputSerializer``.
+
+    Responses are written by ``export.iter_config_json``, which produces the
+    same JSON a lot faster. This is the reference it is tested against.
+    """
+    config = {
+        "categories": (
+            Category.objects.select_related("user")
+            .with_num_records()
+            .order_by("id")
+        ),
+        "projects": Project.objects.with_num_records().order_by("id"),
+        "time_records": TimeRecord.objects.order_by("id"),
+    }
+    return ConfigView.OutputSerializer(config).data
+
+
+def _render(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_config_json_matches_golden_file(golden_data):
+    content = b"".join(export.iter_config_json(chunk_size=2))
+
+    assert content == GOLDEN_CONFIG.read_bytes().rstrip(b"\n")
+    assert content == _render(serialize_config())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("tz", TIME_ZONES)
+def test_dump_matches_serializers(golden_data, tz):
+    categories = Category.objects.with_num_records().order_by("id")
+    projects = Project.objects.with_num_records().order_by("id")
+    records = TimeRecord.objects.order_by("id")
+
+    with timezone.override(tz):
+        assert export.dump_categories(
+            categories.values_list(*export.CATEGORY_FIELDS)
+        ).content == _render(
+            CategoryList.OutputSerializer(categories, many=True).data
+        )
+        assert export.dump_projects(
+            projects.values_list(*export.PROJECT_FIELDS)
+        ).content == _render(
+            ProjectList.OutputSerializer(projects, many=True).data
+        )
+        assert export.dump_time_records(
+            records.values_list(*export.TIME_RECORD_FIELDS)
+        ).content == _render(
+            TimeRecordList.OutputSerializer(records, many=True).data
+        )
+
+
+@pytest.mark.parametrize("tz", TIME_ZONES)
+def test_datetime_formatter_around_transitions(tz):
+    """Every minute of the days with a transition is formatted like DRF."""
+    field = TimeRecordList.OutputSerializer().fields["start_time"]
+    start = _utc(2022, 3, 12)
+    values = [start + timedelta(minutes=m) for m in range(0, 4 * 1440, 7)]
+    for days in (203, 238):
+        values += [
+            start + timedelta(days=days, minutes=m) for m in range(2880)
+        ]
+
+    with timezone.override(tz):
+        fmt = DateTimeFormatter()
+        for value in values:
+            assert fmt(value) == f'"{field.to_representation(value)}"'
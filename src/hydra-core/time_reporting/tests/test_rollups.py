@@ -0,0 +1,237 @@
+from datetime import timedelta
+import threading
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+import pytest
+
+from time_reporting import models, rollups, services
+
+from .factories import CategoryFactory, ProjectFactory, TimeRecordFactory
+
+
+def _snapshot():
+    fields = (
+        "num_records",
+        "num_approved",
+        "total_duration",
+        "first_start",
+        "last_start",
+    )
+    return (
+        {
+            r["project"]: r
+            for r in models.ProjectRollup.objects.values("project", *fields)
+        },
+        {
+            r["category"]: r
+            for r in models.CategoryRollup.objects.values("category", *fields)
+        },
+    )
+
+
+def _assert_consistent():
+    maintained = _snapshot()
+    rollups.rebuild()
+    assert maintained == _snapshot()
+
+
+@pytest.mark.django_db
+def test_rollups_follow_record_services(user):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    other = ProjectFactory(category=category)
+    now = timezone.now()
+
+    record = services.create_record(
+        project=project,
+        start_time=now - timedelta(hours=3),
+        stop_time=now - timedelta(hours=1),
+    )
+    services.create_records(
+        user=user,
+        records=[
+            {"project": other.pk, "start_time": now - timedelta(hours=h)}
+            for h in range(1, 4)
+        ],
+    )
+    _assert_consistent()
+
+    rollup = models.ProjectRollup.objects.get(project=project)
+    assert rollup.num_records == 1
+    assert rollup.num_approved == 1
+    assert rollup.total_duration == timedelta(hours=2)
+    assert rollup.first_start == rollup.last_start == record.start_time
+
+    rollup = models.CategoryRollup.objects.get(category=category)
+    assert rollup.num_records == 4
+    assert rollup.first_start == now - timedelta(hours=3)
+    assert rollup.last_start == now - timedelta(hours=1)
+
+    services.patch_record(pk=record.pk, project=other, approved=False)
+    _assert_consistent()
+
+    services.update_record(
+        pk=record.pk,
+        project=project,
+        start_time=now - timedelta(hours=5),
+        stop_time=now - timedelta(hours=4),
+    )
+    _assert_consistent()
+
+    services.update_records(
+        models.TimeRecord.objects.filter(project=other), approved=False
+    )
+    _assert_consistent()
+
+    services.update_records(
+        models.TimeRecord.objects.filter(approved=False), project=project
+    )
+    _assert_consistent()
+    assert models.ProjectRollup.objects.get(project=other).num_records == 0
+
+    services.delete_record(pk=record.pk)
+    _assert_consistent()
+
+    services.delete_records(models.TimeRecord.objects.all())
+    _assert_consistent()
+
+    rollup = models.CategoryRollup.objects.get(category=category)
+    assert rollup.num_records == 0
+    assert rollup.first_start is None
+    assert rollup.last_start is None
+
+
+@pytest.mark.django_db
+def test_rollups_follow_projects(user):
+    category = CategoryFactory(user=user)
+    other_category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    TimeRecordFactory.create_batch(3, project=project)
+    TimeRecordFactory(project__category=category)
+
+    services.patch_project(pk=project.pk, category=other_category)
+    _assert_consistent()
+    assert other_category.rollup.num_records == 3
+
+    services.update_project(
+        pk=project.pk, category=category, name=project.name
+    )
+    _assert_consistent()
+    assert (
+        models.CategoryRollup.objects.get(category=category).num_records == 4
+    )
+
+
+@pytest.mark.django_db
+def test_rollups_created_with_their_rows(user):
+    category = services.create_category(user=user, name="category")
+    project = services.create_project(category=category, name="project")
+
+    assert models.ProjectRollup.objects.get(project=project).num_records == 0
+    assert (
+        models.CategoryRollup.objects.get(category=category).num_records == 0
+    )
+
+    services.create_record(project=project, start_time=timezone.now())
+    _assert_consistent()
+
+
+@pytest.mark.skipif(
+    not connection.features.has_select_for_update,
+    reason="The database doesn't support concurrent writers",
+)
+@pytest.mark.django_db(transaction=True)
+def test_first_records_written_concurrently(user):
+    category = services.create_category(user=user, name="category")
+    project = services.create_project(category=category, name="project")
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def create():
+        try:
+            barrier.wait()
+            services.create_record(project=project, start_time=timezone.now())
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=create) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert models.ProjectRollup.objects.get(project=project).num_records == 2
+    _assert_consistent()
+
+
+@pytest.mark.skipif(
+    not connection.features.has_select_for_update,
+    reason="The database doesn't support concurrent writers",
+)
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("same_project", [True, False])
+def test_records_written_concurrently(user, same_project):
+    category = services.create_category(user=user, name="category")
+    projects = [
+        services.create_project(category=category, name=name)
+        for name in ("first", "second")
+    ]
+    if same_project:
+        projects[1] = projects[0]
+    now = timezone.now()
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def create(project, start_time):
+        try:
+            barrier.wait()
+            services.create_record(project=project, start_time=start_time)
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    # Each writer's first and last start depend on the other's record
+    threads = [
+        threading.Thread(target=create, args=(projects[0], now)),
+        threading.Thread(
+            target=create, args=(projects[1], now - timedelta(hours=1))
+        ),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    _assert_consistent()
+
+
+@pytest.mark.django_db
+def test_rollups_built_when_missing(user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    TimeRecordFactory.create_batch(2, project=project)
+    models.ProjectRollup.objects.all().delete()
+    models.CategoryRollup.objects.all().delete()
+
+    TimeRecordFactory(project=project)
+
+    assert project.rollup.num_records == 3
+    assert project.category.rollup.num_records == 3
+
+
+@pytest.mark.django_db
+def test_rebuild_rollups_command(user, capsys):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    TimeRecordFactory.create_batch(2, project=project)
+    models.ProjectRollup.objects.update(num_records=0)
+
+    call_command("rebuild_rollups", project=[project.pk])
+
+    assert models.ProjectRollup.objects.get(project=project).num_records == 2
+    assert "Successfully rebuilt" in capsys.readouterr().out
@@ -1,7 +1,9 @@
 from datetime import timedelta
 
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 import pytest
 
@@ -247,6 +249,113 @@ def test_create_record_fails_negative_duration(user):
         )
 
 
+@pytest.mark.django_db
+def test_create_records(user, django_assert_num_queries):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    other_project = ProjectFactory()
+    now = timezone.now()
+
+    records = [
+        {"project": project.pk, "start_time": now - timedelta(hours=h)}
+        for h in range(1, 6)
+    ]
+    records.insert(2, {"project": other_project.pk, "start_time": now})
+    records.insert(
+        4,
+        {
+            "project": project.pk,
+            "start_time": now,
+            "stop_time": now - timedelta(hours=1),
+        },
+    )
+
+    TimeRecordFactory(project=project, start_time=now)
+
+    # The project lookup, the insert, locking the project and category and
+    # updating their rollups and the change log entries (locking the user
+    # and reading their latest sequence first), wrapped in a savepoint
+    with django_assert_num_queries(11):
+        results = services.create_records(user=user, records=records)
+
+    errors = [
+        i for i, r in enumerate(results) if isinstance(r, ValidationError)
+    ]
+    assert errors == [2, 4]
+    assert "project" in results[2].message_dict
+    assert "stop_time" in results[4].message_dict
+
+    assert models.TimeRecord.objects.filter(project=project).count() == 6
+    assert not models.TimeRecord.objects.filter(project=other_project).exists()
+    for result, record in zip(results, records):
+        if isinstance(result, models.TimeRecord):
+            assert result.pk is not None
+            assert result.start_time == record["start_time"]
+            assert result.approved
+
+
+def _writes(queries):
+    # The writes of the rollups, daily totals and change log are left out
+    return [
+        q["sql"]
+        for q in queries.captured_queries
+        if q["sql"].startswith(("INSERT", "UPDATE"))
+        and "rollup" not in q["sql"].split("SET")[0]
+        and "dailyprojecttotal" not in q["sql"].split("SET")[0]
+        and "changelogentry" not in q["sql"].split("SET")[0]
+    ]
+
+
+@pytest.mark.django_db
+def test_record_services_write_once(user):
+    category = CategoryFactory(user=user)
+    now = timezone.now()
+
+    with CaptureQueriesContext(connection) as queries:
+        project = services.create_project(category=category, name="project")
+    assert len(_writes(queries)) == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        record = services.create_record(
+            project=project, start_time=now - timedelta(hours=1)
+        )
+    assert len(_writes(queries)) == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        services.update_record(
+            pk=record.pk,
+            project=project,
+            start_time=now - timedelta(hours=2),
+            stop_time=now,
+        )
+    assert len(_writes(queries)) == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        services.patch_record(pk=record.pk, approved=False)
+    (update,) = _writes(queries)
+    assert '"approved"' in update
+    assert '"start_time"' not in update.split("WHERE")[0]
+
+    record.refresh_from_db()
+    assert record.start_time == now - timedelta(hours=2)
+    assert not record.approved
+
+
+@pytest.mark.django_db
+def test_patch_record_fails_negative_duration(user):
+    now = timezone.now()
+    record = TimeRecordFactory(
+        project__category__user=user,
+        start_time=now - timedelta(hours=1),
+        stop_time=now,
+    )
+
+    with pytest.raises(ValidationError):
+        services.patch_record(pk=record.pk, stop_time=now - timedelta(hours=2))
+
+    record.refresh_from_db()
+    assert record.stop_time == now
+
+
 @pytest.mark.django_db
 def test_update_record(user):
     now = timezone.now()
@@ -315,6 +424,160 @@ def test_delete_record(user):
     assert not models.TimeRecord.objects.filter(pk=record.pk).exists()
 
 
+@pytest.mark.django_db
+def test_delete_records(user, django_assert_num_queries):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    TimeRecordFactory.create_batch(5, project=project)
+    other = TimeRecordFactory()
+
+    queryset = models.TimeRecord.objects.filter(project__category__user=user)
+    # Reading the totals, the daily totals and the owners of the records
+    # and deleting them, then locking the project and category and updating
+    # their rollups and the change log entries (locking the user and reading
+    # their latest sequence first), wrapped in a savepoint. The records are
+    # running, so there are no daily totals to update.
+    with django_assert_num_queries(14):
+        assert services.delete_records(queryset) == 5
+
+    assert list(models.TimeRecord.objects.all()) == [other]
+
+
+@pytest.mark.django_db
+def test_delete_records_with_signal_receivers(user):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    records = TimeRecordFactory.create_batch(3, project=project)
+
+    deleted = []
+
+    def receiver(sender, instance, **kwargs):
+        deleted.append(instance.pk)
+
+    pre_delete.connect(receiver, sender=models.TimeRecord)
+    try:
+        assert services.delete_records(models.TimeRecord.objects.all()) == 3
+    finally:
+        pre_delete.disconnect(receiver, sender=models.TimeRecord)
+
+    assert sorted(deleted) == sorted(r.pk for r in records)
+
+
+def _config_for(records):
+    projects = {r.project for r in records}
+    categories = {p.category for p in projects}
+    return {
+        "categories": [
+            {
+                "id": c.pk,
+                "user": c.user.username,
+                "name": c.name,
+                "description": c.description,
+            }
+            for c in categories
+        ],
+        "projects": [
+            {
+                "id": p.pk,
+                "category": p.category.pk,
+                "name": p.name,
+                "description": p.description,
+            }
+            for p in projects
+        ],
+        "time_records": [
+            {
+                "id": r.pk,
+                "project": r.project.pk,
+                "start_time": r.start_time,
+                "stop_time": r.stop_time,
+            }
+            for r in records
+        ],
+    }
+
+
+@pytest.mark.django_db
+def test_import_config(user):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    records = TimeRecordFactory.create_batch(25, project=project)
+    config = _config_for(records)
+
+    services.import_config(config, batch_size=10)
+
+    assert models.Category.objects.count() == 1
+    assert models.Project.objects.count() == 1
+    assert sorted(
+        models.TimeRecord.objects.values_list("pk", flat=True)
+    ) == sorted(r.pk for r in records)
+
+    # Objects created after the import must not collide with imported ids
+    new_record = services.create_record(
+        project=project, start_time=timezone.now()
+    )
+    assert new_record.pk not in {r.pk for r in records}
+
+
+@pytest.mark.django_db
+def test_import_config_invalid_record(user):
+    now = timezone.now()
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    records = TimeRecordFactory.create_batch(3, project=project)
+    config = _config_for(records)
+    config["time_records"][2]["stop_time"] = now - timedelta(days=365)
+
+    with pytest.raises(ValidationError):
+        services.import_config(config, batch_size=2)
+
+    # Nothing was replaced since the import happens in one transaction
+    assert models.TimeRecord.objects.count() == len(records)
+
+
+@pytest.mark.django_db
+def test_import_config_unknown_user(user):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    config = _config_for([TimeRecordFactory(project=project)])
+    config["categories"][0]["user"] = "no-such-user"
+
+    with pytest.raises(ValidationError):
+        services.import_config(config)
+
+
+def _long_name(config, resource):
+    config[resource][0]["name"] = "x" * 256
+
+
+def _duplicate_id(config, resource):
+    config[resource].append(dict(config[resource][0]))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "invalidate, resource",
+    [
+        (_long_name, "categories"),
+        (_long_name, "projects"),
+        (_duplicate_id, "categories"),
+        (_duplicate_id, "projects"),
+        (_duplicate_id, "time_records"),
+    ],
+)
+def test_import_config_violating_constraints(user, invalidate, resource):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    records = TimeRecordFactory.create_batch(3, project=project)
+    config = _config_for(records)
+    invalidate(config, resource)
+
+    # Rejected before the rows are inserted
+    with pytest.raises(ValidationError) as exc_info:
+        services.import_config(config, batch_size=2)
+    assert resource in exc_info.value.message_dict
+
+
 # TODO: The following test case doesn't really belong to services, but
 # there really isn't a better place to test this functionality since it
 # is heavily dependent on verifying that the models are cleaned up after
@@ -1,12 +1,14 @@
 from datetime import timedelta
 
+from celery.exceptions import SoftTimeLimitExceeded
 from django.conf import settings
 from django.utils import timezone
 import pytest
 
 from hydra_core.models import Settings
-from time_reporting.models import TimeRecord
-from time_reporting.tasks import purge_old_records
+from time_reporting import changelog, daily_totals, tasks
+from time_reporting.models import ChangeLogEntry, DailyProjectTotal, TimeRecord
+from time_reporting.tasks import purge_changes, purge_old_records
 
 from .factories import CategoryFactory, ProjectFactory, TimeRecordFactory
 
@@ -115,3 +117,118 @@ def test_purge_old_records_disabled():
     # Make sure we didn't delete anything
     min_record = TimeRecord.objects.order_by("start_time").first()
     assert min_record.start_time == start
+
+
+@pytest.mark.django_db
+def test_purge_old_records_batched(settings, monkeypatch):
+    settings.PURGE_BATCH_SIZE = 7
+    settings.PURGE_BATCH_SLEEP = 1
+
+    sleeps = []
+    monkeypatch.setattr(tasks.time, "sleep", sleeps.append)
+
+    now = timezone.now()
+    project = ProjectFactory(category=CategoryFactory())
+    for days in range(60):
+        TimeRecordFactory.create(
+            project=project, start_time=now - timedelta(days=days)
+        )
+
+    deleted = purge_old_records(cutoff=(now - timedelta(days=40)).isoformat())
+
+    assert deleted == 20
+    assert len(sleeps) == 3
+    assert TimeRecord.objects.count() == 40
+
+
+@pytest.mark.django_db
+def test_purge_old_records_resumes(settings, monkeypatch):
+    settings.PURGE_BATCH_SIZE = 5
+    settings.PURGE_BATCH_SLEEP = 1
+
+    def interrupt(_):
+        raise SoftTimeLimitExceeded()
+
+    monkeypatch.setattr(tasks.time, "sleep", interrupt)
+
+    now = timezone.now()
+    project = ProjectFactory(category=CategoryFactory())
+    for days in range(30):
+        TimeRecordFactory.create(
+            project=project, start_time=now - timedelta(days=days)
+        )
+    cutoff = (now - timedelta(days=10)).isoformat()
+
+    # The first batch is committed before the task runs out of time
+    with pytest.raises(SoftTimeLimitExceeded):
+        purge_old_records(cutoff=cutoff)
+    assert TimeRecord.objects.count() == 25
+
+    monkeypatch.setattr(tasks.time, "sleep", lambda _: None)
+    assert purge_old_records(cutoff=cutoff, deleted=5) == 20
+    assert TimeRecord.objects.count() == 10
+
+
+@pytest.mark.django_db
+def test_purge_old_records_daily_totals(settings):
+    settings.PURGE_BATCH_SIZE = 3
+    settings.PURGE_BATCH_SLEEP = 0
+    now = timezone.now()
+    project = ProjectFactory()
+
+    for days in range(10):
+        TimeRecordFactory(
+            project=project,
+            start_time=now - timedelta(days=days, hours=30),
+            stop_time=now - timedelta(days=days),
+        )
+
+    purge_old_records(cutoff=(now - timedelta(days=5)).isoformat())
+
+    maintained = sorted(
+        DailyProjectTotal.objects.values_list("day", "num_records", "duration")
+    )
+    daily_totals.rebuild()
+    assert maintained == sorted(
+        DailyProjectTotal.objects.values_list("day", "num_records", "duration")
+    )
+
+
+@pytest.mark.django_db
+def test_purge_old_records_changes(settings, monkeypatch):
+    settings.PURGE_BATCH_SIZE = 3
+    settings.PURGE_BATCH_SLEEP = 0
+    now = timezone.now()
+    project = ProjectFactory()
+    for d in range(6):
+        TimeRecordFactory(project=project, start_time=now - timedelta(days=d))
+    other = TimeRecordFactory(start_time=now).project.category.user
+
+    published = []
+    monkeypatch.setattr(
+        changelog.events,
+        "publish",
+        lambda events: published.extend(user for user, _ in events),
+    )
+    purge_old_records(cutoff=(now - timedelta(days=2, hours=1)).isoformat())
+
+    # The records aren't logged one by one, the log of their owner is reset
+    user = project.category.user
+    assert list(
+        ChangeLogEntry.objects.filter(user=user).values_list(
+            "sequence", "action"
+        )
+    ) == [(7, "reset")]
+    assert published == [user.pk]
+    assert ChangeLogEntry.objects.filter(user=other).count() == 1
+
+
+@pytest.mark.django_db
+def test_purge_changes(settings):
+    settings.CHANGES_RETENTION_DAYS = 30
+    project = ProjectFactory()
+    TimeRecordFactory.create_batch(3, project=project)
+    ChangeLogEntry.objects.update(created=timezone.now() - timedelta(days=31))
+
+    assert purge_changes() == 2
+    assert ChangeLogEntry.objects.count() == 1
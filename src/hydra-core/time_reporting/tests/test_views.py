@@ -1,12 +1,22 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
+import gzip
 from itertools import chain
 import random
+import time
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date
 import pytest
 from rest_framework import status
 
+from hydra_core.tests.conftest import asgi_get
+from hydra_core.tests.factories import UserFactory
+from time_reporting import changelog, services
 from time_reporting.models import Category, Project, TimeRecord
 from time_reporting.urls import app_name
 
@@ -14,9 +24,13 @@ from .factories import CategoryFactory, ProjectFactory, TimeRecordFactory
 
 CATEGORY_INDEX_VIEW = f"{app_name}:category_index"
 CATEGORY_DETAIL_VIEW = f"{app_name}:category_detail"
+CHANGE_INDEX_VIEW = f"{app_name}:change_index"
 CONFIG_VIEW = f"{app_name}:config"
 PROJECT_INDEX_VIEW = f"{app_name}:project_index"
 PROJECT_DETAIL_VIEW = f"{app_name}:project_detail"
+REPORT_DAILY_VIEW = f"{app_name}:report_daily"
+REPORT_SUMMARY_VIEW = f"{app_name}:report_summary"
+TIME_RECORD_BULK_VIEW = f"{app_name}:record_bulk"
 TIME_RECORD_INDEX_VIEW = f"{app_name}:record_index"
 TIME_RECORD_DETAIL_VIEW = f"{app_name}:record_detail"
 
@@ -55,6 +69,46 @@ def test_category_index_get(client, user):
         )
 
 
+@pytest.mark.django_db
+def test_category_index_get_indented(client, user):
+    CategoryFactory.create_batch(2, user=user, description="caf\u00e9")
+
+    compact = client.get(reverse(CATEGORY_INDEX_VIEW))
+    indented = client.get(
+        reverse(CATEGORY_INDEX_VIEW),
+        HTTP_ACCEPT="application/json; indent=2",
+    )
+    assert indented.status_code == status.HTTP_200_OK, indented.content
+    assert indented.content.startswith(b"[\n  {")
+    assert indented.json() == compact.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "view", [CATEGORY_INDEX_VIEW, PROJECT_INDEX_VIEW, CONFIG_VIEW]
+)
+def test_index_get_constant_queries(view, client, user):
+    def count_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(reverse(view))
+        assert resp.status_code == status.HTTP_200_OK, resp.content
+        return len(ctx.captured_queries)
+
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    TimeRecordFactory(project=project)
+
+    # Warm up the caches, e.g. for authentication
+    count_queries()
+    baseline = count_queries()
+
+    for c in CategoryFactory.create_batch(10, user=user):
+        for p in ProjectFactory.create_batch(5, category=c):
+            TimeRecordFactory.create_batch(2, project=p)
+
+    assert count_queries() == baseline
+
+
 @pytest.mark.django_db
 def test_category_index_post(client):
     category_stub = CategoryFactory.stub()
@@ -455,6 +509,114 @@ def test_records_index_get_preserves_order(client, user):
     assert timestamps == timestamps_sorted
 
 
+@pytest.mark.django_db
+def test_records_index_get_paginated(client, user):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    now = timezone.now()
+
+    # Create records sharing start times to make sure that ties are broken
+    # by the id and no record is skipped or returned twice.
+    records = [
+        TimeRecordFactory(project=project, start_time=now - timedelta(hours=h))
+        for h in range(12)
+        for _ in range(2)
+    ]
+    expected = [
+        r.pk for r in sorted(records, key=lambda r: (r.start_time, r.pk))
+    ]
+
+    got = []
+    url = reverse(TIME_RECORD_INDEX_VIEW) + "?page_size=5"
+    while url:
+        resp = client.get(url)
+        assert resp.status_code == status.HTTP_200_OK, resp.content
+        assert len(resp.json()) <= 5
+        assert int(resp["X-Result-Count"]) == len(records)
+        got.extend(r["id"] for r in resp.json())
+
+        url = None
+        if resp.has_header("Link"):
+            assert resp.has_header("X-Next-Cursor")
+            url = resp["Link"].split(">")[0].lstrip("<")
+
+    assert got == expected
+
+
+@pytest.mark.django_db
+def test_records_index_get_paginated_skip_count(client, user):
+    category = CategoryFactory(user=user)
+    project = ProjectFactory(category=category)
+    TimeRecordFactory.create_batch(3, project=project)
+
+    resp = client.get(
+        reverse(TIME_RECORD_INDEX_VIEW), {"page_size": 2, "count": "false"}
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert len(resp.json()) == 2
+    assert not resp.has_header("X-Result-Count")
+    assert resp.has_header("X-Next-Cursor")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params", [{"cursor": "not-a-cursor"}, {"page_size": "0"}]
+)
+def test_records_index_get_paginated_invalid(params, client, user):
+    resp = client.get(reverse(TIME_RECORD_INDEX_VIEW), params)
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST, resp.content
+
+
+@pytest.mark.django_db
+def test_records_index_get_asgi(user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    records = TimeRecordFactory.create_batch(3, project=project)
+    TimeRecordFactory.create_batch(2)
+
+    resp = asgi_get(reverse(TIME_RECORD_INDEX_VIEW) + "?page_size=2", user)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert int(resp["X-Result-Count"]) == len(records)
+    assert resp.has_header("X-Next-Cursor")
+
+    expected = sorted(records, key=lambda r: (r.start_time, r.pk))
+    assert [r["id"] for r in resp.json()] == [r.pk for r in expected[:2]]
+
+
+@pytest.mark.django_db
+def test_records_index_get_filtered(client, user):
+    now = timezone.now()
+    category_1 = CategoryFactory(user=user)
+    category_2 = CategoryFactory(user=user)
+    project_1 = ProjectFactory(category=category_1)
+    project_2 = ProjectFactory(category=category_2)
+
+    old = TimeRecordFactory(
+        project=project_1, start_time=now - timedelta(days=10), approved=True
+    )
+    recent_1 = TimeRecordFactory(
+        project=project_1, start_time=now - timedelta(days=1), approved=False
+    )
+    recent_2 = TimeRecordFactory(
+        project=project_2, start_time=now - timedelta(hours=1), approved=True
+    )
+
+    def get_ids(**params):
+        resp = client.get(reverse(TIME_RECORD_INDEX_VIEW), params)
+        assert resp.status_code == status.HTTP_200_OK, resp.content
+        assert int(resp["X-Result-Count"]) == len(resp.json())
+        return [r["id"] for r in resp.json()]
+
+    week_ago = (now - timedelta(days=7)).isoformat()
+
+    assert get_ids() == [old.pk, recent_1.pk, recent_2.pk]
+    assert get_ids(start=week_ago) == [recent_1.pk, recent_2.pk]
+    assert get_ids(end=week_ago) == [old.pk]
+    assert get_ids(project=project_1.pk) == [old.pk, recent_1.pk]
+    assert get_ids(category=category_2.pk) == [recent_2.pk]
+    assert get_ids(approved="true") == [old.pk, recent_2.pk]
+    assert get_ids(approved="false", start=week_ago) == [recent_1.pk]
+
+
 @pytest.mark.django_db
 def test_records_index_post(client, user):
     category = CategoryFactory(user=user)
@@ -643,6 +805,35 @@ def test_records_detail_patch_field_project(client, user):
     assert resp.json()["project"] == record_stub.project.pk
 
 
+@pytest.mark.django_db
+def test_records_detail_patch_queries(client, user, django_assert_num_queries):
+    record = TimeRecordFactory(project__category__user=user, approved=False)
+    url = reverse(TIME_RECORD_DETAIL_VIEW, kwargs={"pk": record.pk})
+    client.get(url)  # Warm up the authentication cache
+
+    # Fetching the record, updating it, locking its project and category and
+    # updating their rollups, looking up its owner and writing the change
+    # log entry (locking the user and reading their latest sequence first),
+    # the rest is the savepoint of the service's transaction.
+    with django_assert_num_queries(12):
+        resp = client.patch(url, {"approved": True}, format="json")
+
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json()["approved"] is True
+
+
+@pytest.mark.django_db
+def test_records_detail_patch_other_user(client):
+    record = TimeRecordFactory(approved=False)
+    url = reverse(TIME_RECORD_DETAIL_VIEW, kwargs={"pk": record.pk})
+
+    resp = client.patch(url, {"approved": True}, format="json")
+    assert resp.status_code == status.HTTP_404_NOT_FOUND, resp.content
+
+    record.refresh_from_db()
+    assert not record.approved
+
+
 @pytest.mark.django_db
 def test_records_detail_patch_field_start_time(client, user):
     now = timezone.now()
@@ -717,6 +908,316 @@ def test_records_detail_patch_field_approved(client, user):
     assert resp.json()["approved"] == body["approved"]
 
 
+@pytest.mark.django_db
+def test_report_summary_by_project(client, user):
+    now = timezone.now()
+    category = CategoryFactory(user=user)
+    project_1, project_2 = ProjectFactory.create_batch(2, category=category)
+
+    for hours in (1, 2):
+        TimeRecordFactory(
+            project=project_1,
+            start_time=now - timedelta(days=hours, hours=hours),
+            stop_time=now - timedelta(days=hours),
+        )
+    TimeRecordFactory(
+        project=project_2,
+        start_time=now - timedelta(days=30, hours=3),
+        stop_time=now - timedelta(days=30),
+    )
+    # Running records are not included in the totals
+    TimeRecordFactory(project=project_2, start_time=now, stop_time=None)
+
+    resp = client.get(reverse(REPORT_SUMMARY_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert sorted(resp.json(), key=lambda r: r["project"]) == [
+        {"project": project_1.pk, "total_seconds": 3 * 3600, "num_records": 2},
+        {"project": project_2.pk, "total_seconds": 3 * 3600, "num_records": 1},
+    ]
+
+    resp = client.get(
+        reverse(REPORT_SUMMARY_VIEW),
+        {"start": (now - timedelta(days=7)).isoformat()},
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == [
+        {"project": project_1.pk, "total_seconds": 3 * 3600, "num_records": 2},
+    ]
+
+
+@pytest.mark.django_db
+def test_report_summary_by_category_and_day(client, user):
+    category = CategoryFactory(user=user)
+    project_1, project_2 = ProjectFactory.create_batch(2, category=category)
+
+    # 23:30 local time, so that the UTC date differs from the local one
+    start = timezone.localtime().replace(
+        hour=23, minute=30, second=0, microsecond=0
+    ) - timedelta(days=2)
+    for project in (project_1, project_2):
+        TimeRecordFactory(
+            project=project,
+            start_time=start,
+            stop_time=start + timedelta(minutes=15),
+        )
+    TimeRecordFactory(
+        project=project_1,
+        start_time=start + timedelta(days=1),
+        stop_time=start + timedelta(days=1, hours=1),
+    )
+
+    resp = client.get(
+        reverse(REPORT_SUMMARY_VIEW), {"group_by": "category,day"}
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == [
+        {
+            "category": category.pk,
+            "day": start.date().isoformat(),
+            "total_seconds": 30 * 60,
+            "num_records": 2,
+        },
+        {
+            "category": category.pk,
+            "day": (start + timedelta(days=1)).date().isoformat(),
+            "total_seconds": 3600,
+            "num_records": 1,
+        },
+    ]
+
+
+@pytest.mark.django_db
+def test_report_summary_invalid_group_by(client):
+    resp = client.get(reverse(REPORT_SUMMARY_VIEW), {"group_by": "year"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST, resp.content
+
+
+@pytest.mark.django_db
+def test_report_daily(client, user, django_assert_num_queries):
+    tzinfo = ZoneInfo("America/New_York")
+    category = CategoryFactory(user=user)
+    project_1, project_2 = ProjectFactory.create_batch(2, category=category)
+
+    TimeRecordFactory(
+        project=project_1,
+        start_time=datetime(2026, 10, 30, 22, tzinfo=tzinfo),
+        stop_time=datetime(2026, 10, 31, 2, tzinfo=tzinfo),
+    )
+    for day in (30, 31):
+        TimeRecordFactory(
+            project=project_2,
+            start_time=datetime(2026, 10, day, 9, tzinfo=tzinfo),
+            stop_time=datetime(2026, 10, day, 10, tzinfo=tzinfo),
+        )
+    # Neither running records nor those of other users are included
+    TimeRecordFactory(project=project_2, stop_time=None)
+    TimeRecordFactory(
+        start_time=datetime(2026, 10, 30, 9, tzinfo=tzinfo),
+        stop_time=datetime(2026, 10, 30, 10, tzinfo=tzinfo),
+    )
+
+    client.get(reverse(REPORT_DAILY_VIEW))  # Warm up the authentication cache
+    with django_assert_num_queries(1):
+        resp = client.get(
+            reverse(REPORT_DAILY_VIEW),
+            {"start": "2026-10-01", "end": "2026-11-01"},
+        )
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp["X-Result-Count"] == "4"
+    assert resp.json() == [
+        {
+            "project": project_1.pk,
+            "day": "2026-10-30",
+            "total_seconds": 2 * 3600,
+            "num_records": 1,
+        },
+        {
+            "project": project_2.pk,
+            "day": "2026-10-30",
+            "total_seconds": 3600,
+            "num_records": 1,
+        },
+        {
+            "project": project_1.pk,
+            "day": "2026-10-31",
+            "total_seconds": 2 * 3600,
+            "num_records": 1,
+        },
+        {
+            "project": project_2.pk,
+            "day": "2026-10-31",
+            "total_seconds": 3600,
+            "num_records": 1,
+        },
+    ]
+
+    resp = client.get(
+        reverse(REPORT_DAILY_VIEW),
+        {"start": "2026-10-31", "project": project_2.pk},
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert [(r["project"], r["day"]) for r in resp.json()] == [
+        (project_2.pk, "2026-10-31"),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "view", [CATEGORY_INDEX_VIEW, PROJECT_INDEX_VIEW, TIME_RECORD_INDEX_VIEW]
+)
+def test_index_get_not_modified(view, client, user, django_assert_num_queries):
+    TimeRecordFactory(project__category__user=user)
+
+    resp = client.get(reverse(view))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    etag = resp["ETag"]
+    assert etag.startswith('W/"')
+    assert not resp.has_header("Last-Modified")
+    assert "no-cache" in resp["Cache-Control"]
+
+    # Answered before the view touches the database
+    with django_assert_num_queries(0):
+        resp = client.get(reverse(view), HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+    assert resp.content == b""
+    assert resp["ETag"] == etag
+
+    resp = client.get(reverse(view), HTTP_IF_NONE_MATCH='W/"other"')
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+
+@pytest.mark.django_db
+def test_index_get_modified(client, user, django_capture_on_commit_callbacks):
+    category = CategoryFactory(user=user)
+    url = reverse(PROJECT_INDEX_VIEW)
+    etag = client.get(url)["ETag"]
+
+    # Changes of other users don't affect the ETag
+    with django_capture_on_commit_callbacks(execute=True):
+        TimeRecordFactory()
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.post(
+            url,
+            {"name": "project", "description": "", "category": category.pk},
+            format="json",
+        )
+    assert resp.status_code == status.HTTP_201_CREATED, resp.content
+
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp["ETag"] != etag
+    assert [p["name"] for p in resp.json()] == ["project"]
+
+    # Records are owned through their project
+    etag = resp["ETag"]
+    project = Project.objects.get(name="project")
+    with django_capture_on_commit_callbacks(execute=True):
+        services.create_record(project=project, start_time=timezone.now())
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+
+@pytest.mark.django_db
+def test_detail_get_if_modified_since(
+    client, user, django_capture_on_commit_callbacks
+):
+    record = TimeRecordFactory(project__category__user=user)
+    url = reverse(TIME_RECORD_DETAIL_VIEW, kwargs={"pk": record.pk})
+    resp = client.get(url)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+
+    # A date can't tell apart the changes made within the same second, only
+    # the ETag is used to validate the client's copy
+    last_modified = http_date(time.time() + 1)
+    with django_capture_on_commit_callbacks(execute=True):
+        services.patch_record(pk=record.pk, approved=not record.approved)
+    resp = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json()["approved"] is not record.approved
+
+
+@pytest.mark.django_db
+def test_changes_get(client, user, settings):
+    settings.CHANGES_PAGE_SIZE = 3
+    category = services.create_category(user=user, name="category")
+    project = services.create_project(category=category, name="project")
+    record = services.create_record(project=project, start_time=timezone.now())
+    services.patch_record(pk=record.pk, approved=True)
+    deleted = services.create_project(category=category, name="deleted")
+    services.delete_project(pk=deleted.pk)
+    services.create_category(user=UserFactory(), name="other")
+
+    resp = client.get(reverse(CHANGE_INDEX_VIEW))
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    body = resp.json()
+    assert (body["sequence"], body["reset"], body["more"]) == (3, False, True)
+    assert [
+        (c["sequence"], c["resource"], c["id"], c["action"])
+        for c in body["changes"]
+    ] == [
+        (1, "category", category.pk, "created"),
+        (2, "project", project.pk, "created"),
+        (3, "record", record.pk, "created"),
+    ]
+    # Changes carry the current state of the rows
+    assert body["changes"][0]["data"]["num_records"] == 1
+    assert body["changes"][2]["data"]["approved"] is True
+
+    resp = client.get(reverse(CHANGE_INDEX_VIEW), {"since": 3})
+    body = resp.json()
+    assert (body["sequence"], body["reset"], body["more"]) == (6, False, False)
+    assert [(c["id"], c["action"], c["data"]) for c in body["changes"]][
+        1:
+    ] == [(deleted.pk, "created", None), (deleted.pk, "deleted", None)]
+
+    resp = client.get(reverse(CHANGE_INDEX_VIEW), {"since": 6})
+    assert resp.json() == {
+        "sequence": 6,
+        "reset": False,
+        "more": False,
+        "changes": [],
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "since, purge, expected",
+    [(0, False, False), (3, False, False), (4, False, True), (1, True, True)],
+)
+def test_changes_get_reset(client, user, since, purge, expected):
+    category = services.create_category(user=user, name="category")
+    for name in ("first", "second"):
+        services.create_project(category=category, name=name)
+    if purge:
+        changelog.purge(timezone.now() + timedelta(seconds=1))
+
+    resp = client.get(reverse(CHANGE_INDEX_VIEW), {"since": since})
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    body = resp.json()
+    assert body["reset"] is expected
+    if expected:
+        assert (body["sequence"], body["changes"]) == (3, [])
+
+
+@pytest.mark.django_db
+def test_changes_get_after_import(client, user):
+    services.create_category(user=user, name="category")
+    services.import_config(
+        {"categories": [], "projects": [], "time_records": []}
+    )
+
+    resp = client.get(reverse(CHANGE_INDEX_VIEW), {"since": 1})
+    assert resp.json() == {
+        "sequence": 2,
+        "reset": True,
+        "more": False,
+        "changes": [],
+    }
+
+
 @pytest.mark.django_db
 def test_config_get(client, user):
 
@@ -743,6 +1244,53 @@ def test_config_get(client, user):
     assert len(body["time_records"]) == 16
 
 
+@pytest.mark.django_db
+def test_config_get_stream(client, user, settings):
+    # Use a small chunk size to make sure rows are split across chunks
+    settings.EXPORT_CHUNK_SIZE = 4
+
+    categories = CategoryFactory.create_batch(3, user=user)
+    categories[0].description = None
+    categories[0].save()
+    for category in categories:
+        for project in ProjectFactory.create_batch(2, category=category):
+            TimeRecordFactory.create_batch(3, project=project)
+            TimeRecordFactory(
+                project=project,
+                start_time=timezone.now() - timedelta(hours=1),
+                stop_time=timezone.now(),
+            )
+
+    url = reverse(CONFIG_VIEW)
+
+    expected = client.get(url)
+    assert expected.status_code == status.HTTP_200_OK, expected.content
+
+    resp = client.get(url, {"stream": "true"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.streaming
+    assert resp["Content-Type"] == "application/json"
+    assert b"".join(resp.streaming_content) == expected.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_config_get_gzip(client, user, stream):
+    for project in ProjectFactory.create_batch(
+        2, category=CategoryFactory(user=user)
+    ):
+        TimeRecordFactory.create_batch(20, project=project)
+
+    url = reverse(CONFIG_VIEW)
+    expected = client.get(url)
+
+    resp = client.get(url, {"stream": stream}, HTTP_ACCEPT_ENCODING="gzip")
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["Content-Encoding"] == "gzip"
+    content = b"".join(resp) if resp.streaming else resp.content
+    assert gzip.decompress(content) == expected.content
+
+
 @pytest.mark.django_db
 def test_config_put(client, user):
 
@@ -874,3 +1422,208 @@ def test_config_get_put_together(client, user):
         assert got.project == expected.project
         assert got.start_time == expected.start_time
         assert got.stop_time == expected.stop_time
+
+
+@pytest.mark.django_db
+def test_records_bulk_post(client, user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    now = timezone.now()
+
+    body = [
+        {
+            "project": project.pk,
+            "start_time": (now - timedelta(hours=h + 1)).isoformat(),
+            "stop_time": (now - timedelta(hours=h)).isoformat(),
+        }
+        for h in range(3)
+    ]
+
+    resp = client.post(reverse(TIME_RECORD_BULK_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_201_CREATED, resp.content
+
+    records = TimeRecord.objects.filter(project=project).order_by("-pk")
+    assert resp.json() == [
+        {
+            "status": 201,
+            "record": {
+                "id": record.pk,
+                "project": project.pk,
+                "start_time": timezone.localtime(
+                    record.start_time
+                ).isoformat(),
+                "stop_time": timezone.localtime(record.stop_time).isoformat(),
+                "total_seconds": 3600,
+                "approved": True,
+            },
+        }
+        for record in reversed(records)
+    ]
+
+
+@pytest.mark.django_db
+def test_records_bulk_post_partial(client, user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    other_project = ProjectFactory()
+    now = timezone.now().isoformat()
+
+    body = [
+        {"project": project.pk, "start_time": now},
+        {"project": other_project.pk, "start_time": now},
+        {"project": project.pk},
+        {"project": project.pk, "start_time": now, "approved": False},
+    ]
+
+    resp = client.post(reverse(TIME_RECORD_BULK_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_207_MULTI_STATUS, resp.content
+
+    results = resp.json()
+    assert [r["status"] for r in results] == [201, 400, 400, 201]
+    assert "project" in results[1]["errors"]
+    assert "start_time" in results[2]["errors"]
+    assert results[3]["record"]["approved"] is False
+
+    assert TimeRecord.objects.filter(project=project).count() == 2
+    assert not TimeRecord.objects.filter(project=other_project).exists()
+
+
+@pytest.mark.django_db
+def test_records_bulk_post_invalid(client, user):
+    project = ProjectFactory()
+    now = timezone.now().isoformat()
+
+    body = [{"project": project.pk, "start_time": now}]
+    resp = client.post(reverse(TIME_RECORD_BULK_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST, resp.content
+
+    body = {"project": project.pk, "start_time": now}
+    resp = client.post(reverse(TIME_RECORD_BULK_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST, resp.content
+
+    assert not TimeRecord.objects.exists()
+
+
+@pytest.mark.django_db
+def test_records_bulk_post_constant_queries(client, user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    now = timezone.now()
+
+    def post(num_records):
+        body = [
+            {
+                "project": project.pk,
+                "start_time": (now - timedelta(hours=h)).isoformat(),
+            }
+            for h in range(num_records)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            resp = client.post(
+                reverse(TIME_RECORD_BULK_VIEW), body, format="json"
+            )
+        assert resp.status_code == status.HTTP_201_CREATED, resp.content
+        return len(queries)
+
+    post(1)  # Warm up the authentication cache
+    assert post(2) == post(50)
+
+
+@pytest.mark.django_db
+def test_records_bulk_patch(client, user):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    records = TimeRecordFactory.create_batch(
+        4, project=project, approved=False
+    )
+    other_record = TimeRecordFactory(approved=False)
+
+    body = {"ids": [records[0].pk, records[2].pk, other_record.pk]}
+    body["approved"] = True
+    resp = client.patch(reverse(TIME_RECORD_INDEX_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == {"updated": 2}
+
+    approved = TimeRecord.objects.filter(approved=True)
+    assert set(approved) == {records[0], records[2]}
+
+    new_project = ProjectFactory(category=project.category)
+    url = reverse(TIME_RECORD_INDEX_VIEW) + "?approved=false"
+    body = {"project": new_project.pk}
+    resp = client.patch(url, body, format="json")
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == {"updated": 2}
+
+    moved = TimeRecord.objects.filter(project=new_project)
+    assert set(moved) == {records[1], records[3]}
+    other_record.refresh_from_db()
+    assert not other_record.approved
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"approved": True},
+        {"all": True},
+        {"all": True, "project": 0},
+    ],
+)
+def test_records_bulk_patch_invalid(client, user, body):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    TimeRecordFactory(project=project, approved=False)
+
+    if "project" in body:
+        body["project"] = ProjectFactory().pk
+
+    resp = client.patch(reverse(TIME_RECORD_INDEX_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST, resp.content
+    assert not TimeRecord.objects.filter(approved=True).exists()
+
+
+@pytest.mark.django_db
+def test_records_bulk_delete(client, user, django_assert_num_queries):
+    project = ProjectFactory(category=CategoryFactory(user=user))
+    now = timezone.now()
+    records = [
+        TimeRecordFactory(project=project, start_time=now - timedelta(days=d))
+        for d in range(1, 5)
+    ]
+    other_record = TimeRecordFactory()
+
+    body = {"ids": [records[0].pk, other_record.pk]}
+    resp = client.delete(reverse(TIME_RECORD_INDEX_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == {"deleted": 1}
+
+    start = (now - timedelta(days=2, hours=1)).isoformat()
+    url = reverse(TIME_RECORD_INDEX_VIEW) + "?" + urlencode({"start": start})
+    with django_assert_num_queries(14):
+        resp = client.delete(url)
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == {"deleted": 1}
+
+    resp = client.delete(reverse(TIME_RECORD_INDEX_VIEW))
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST, resp.content
+
+    body = {"all": True}
+    resp = client.delete(reverse(TIME_RECORD_INDEX_VIEW), body, format="json")
+    assert resp.status_code == status.HTTP_200_OK, resp.content
+    assert resp.json() == {"deleted": 2}
+
+    assert list(TimeRecord.objects.all()) == [other_record]
+
+
+@pytest.mark.django_db
+def test_config_put_name_too_long(client, user):
+    data = {
+        "categories": [
+            {
+                "id": 1,
+                "user": user.username,
+                "name": "x" * 256,
+                "description": None,
+            }
+        ],
+        "projects": [],
+        "time_records": [],
+    }
+
+    resp = client.put(reverse(CONFIG_VIEW), data, format="json")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST, resp.content
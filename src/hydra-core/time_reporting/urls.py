@@ -3,9 +3,13 @@ from django.urls import path
 from .views import (
     CategoryDetail,
     CategoryList,
+    ChangeList,
     ConfigView,
     ProjectDetail,
     ProjectList,
+    ReportDaily,
+    ReportSummary,
+    TimeRecordBulk,
     TimeRecordDetail,
     TimeRecordList,
 )
@@ -34,11 +38,31 @@ urlpatterns = [
         TimeRecordList.as_view(),
         name="record_index",
     ),
+    path(
+        "v1/records/bulk/",
+        TimeRecordBulk.as_view(),
+        name="record_bulk",
+    ),
     path(
         "v1/records/<int:pk>/",
         TimeRecordDetail.as_view(),
         name="record_detail",
     ),
+    path(
+        "v1/reports/summary/",
+        ReportSummary.as_view(),
+        name="report_summary",
+    ),
+    path(
+        "v1/reports/daily/",
+        ReportDaily.as_view(),
+        name="report_daily",
+    ),
+    path(
+        "v1/changes/",
+        ChangeList.as_view(),
+        name="change_index",
+    ),
     path(
         "v1/config/",
         ConfigView.as_view(),
@@ -1,6 +1,13 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
-from django.http.response import Http404
+from django.db.models import Count, DurationField, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.http.response import Http404, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
 from rest_framework.request import Request
@@ -8,35 +15,45 @@ from rest_framework.response import Response
 from rest_framework.serializers import (
     BooleanField,
     CharField,
+    DateField,
     DateTimeField,
+    DictField,
     IntegerField,
+    ListField,
     ModelSerializer,
     PrimaryKeyRelatedField,
     Serializer,
-    SerializerMethodField,
     SlugRelatedField,
+    ValidationError,
 )
 
-from hydra_core.views import BaseAPIView
-
-from . import services
-from .models import Category, Project, TimeRecord
+from hydra_core.fastjson import RawJSON
+from hydra_core.pagination import KeysetPagination
+from hydra_core.views import BaseAPIView, BaseAsyncAPIView
+
+from . import changelog, export, services
+from .models import (
+    Category,
+    ChangeLogEntry,
+    DailyProjectTotal,
+    Project,
+    TimeRecord,
+)
 
 User = get_user_model()
 
 
-class CategoryList(BaseAPIView):
+class CategoryList(BaseAsyncAPIView):
+    conditional_get = True
+
     class OutputSerializer(Serializer):
         id = IntegerField()
         name = CharField()
         description = CharField(allow_null=True, allow_blank=True)
-        num_records = SerializerMethodField()
+        num_records = IntegerField()
         created = DateTimeField()
         updated = DateTimeField()
 
-        def get_num_records(self, obj):
-            return sum(p.records.count() for p in obj.projects.all())
-
     class InputSerializer(Serializer):
         name = CharField()
         description = CharField(allow_null=True, allow_blank=True)
@@ -44,21 +61,22 @@ class CategoryList(BaseAPIView):
     def get_queryset(self):
         return (
             Category.objects.filter(user=self.request.user)
-            .all()
+            .with_num_records()
             .order_by("created")
         )
 
-    def head(self, request: Request, format=None) -> Response:
+    async def head(self, request: Request, format=None) -> Response:
         queryset = self.get_queryset()
-        count = queryset.count()
+        count = await queryset.acount()
         return Response(headers={"X-Result-Count": count})
 
-    def get(self, request: Request, format=None) -> Response:
+    async def get(self, request: Request, format=None) -> Response:
         queryset = self.get_queryset()
-        count = queryset.count()
-        serializer = self.OutputSerializer(queryset, many=True)
+        count = await queryset.acount()
+        rows = queryset.values_list(*export.CATEGORY_FIELDS)
+        data = export.dump_categories([row async for row in rows])
         headers = {"X-Result-Count": count}
-        return Response(data=serializer.data, headers=headers)
+        return Response(data=data, headers=headers)
 
     def post(self, request: Request, format=None) -> Response:
         serializer = self.InputSerializer(data=request.data)
@@ -67,6 +85,7 @@ class CategoryList(BaseAPIView):
         category = services.create_category(
             user=request.user, **serializer.validated_data
         )
+        category = self.get_queryset().get(pk=category.pk)
         return Response(
             data=self.OutputSerializer(category).data,
             status=status.HTTP_201_CREATED,
@@ -74,11 +93,10 @@ class CategoryList(BaseAPIView):
 
 
 class CategoryDetail(BaseAPIView):
-    class OutputSerializer(ModelSerializer):
-        num_records = SerializerMethodField()
+    conditional_get = True
 
-        def get_num_records(self, obj):
-            return sum(p.records.count() for p in obj.projects.all())
+    class OutputSerializer(ModelSerializer):
+        num_records = IntegerField(read_only=True)
 
         class Meta:
             model = Category
@@ -101,10 +119,12 @@ class CategoryDetail(BaseAPIView):
         slug = CharField(required=False)
         description = CharField(required=False)
 
+    def get_queryset(self):
+        return Category.objects.filter(user=self.request.user)
+
     def get_object(self):
         obj = get_object_or_404(
-            Category.objects.filter(user=self.request.user).all(),
-            pk=self.kwargs["pk"],
+            self.get_queryset().with_num_records(), pk=self.kwargs["pk"]
         )
         self.check_object_permissions(self.request, obj)
         return obj
@@ -118,45 +138,48 @@ class CategoryDetail(BaseAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def put(self, request: Request, pk: int, format=None) -> Response:
-        category = self.get_object()
-        serializer = self.InputSerializer(category, data=request.data)
+        serializer = self.InputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            category = services.update_category(
-                pk=pk, user=request.user, **serializer.validated_data
+            services.update_category(
+                pk=pk,
+                queryset=self.get_queryset(),
+                user=request.user,
+                **serializer.validated_data,
             )
         except Category.DoesNotExist:
             raise Http404  # pylint: disable=raise-missing-from
-        return Response(data=self.OutputSerializer(category).data)
+        return Response(data=self.OutputSerializer(self.get_object()).data)
 
     def patch(self, request: Request, pk: int, format=None) -> Response:
-        category = self.get_object()
-        serializer = self.PartialInputSerializer(category, data=request.data)
+        serializer = self.PartialInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            category = services.patch_category(
-                pk=pk, user=request.user, **serializer.validated_data
+            services.patch_category(
+                pk=pk,
+                queryset=self.get_queryset(),
+                user=request.user,
+                **serializer.validated_data,
             )
         except Category.DoesNotExist:
             raise Http404  # pylint: disable=raise-missing-from
-        return Response(data=self.OutputSerializer(category).data)
+        return Response(data=self.OutputSerializer(self.get_object()).data)
+
 
+class ProjectList(BaseAsyncAPIView):
+    conditional_get = True
 
-class ProjectList(BaseAPIView):
     class OutputSerializer(Serializer):
         id = IntegerField()
         category = PrimaryKeyRelatedField(queryset=Category.objects.all())
         name = CharField()
         description = CharField(allow_blank=True, allow_null=True)
-        num_records = SerializerMethodField()
+        num_records = IntegerField()
         created = DateTimeField()
         updated = DateTimeField()
 
-        def get_num_records(self, obj):
-            return obj.records.count()
-
     class InputSerializer(Serializer):
         name = CharField()
         category = PrimaryKeyRelatedField(queryset=Category.objects.all())
@@ -165,27 +188,29 @@ class ProjectList(BaseAPIView):
     def get_queryset(self):
         return (
             Project.objects.filter(category__user=self.request.user)
-            .all()
+            .with_num_records()
             .order_by("created")
         )
 
-    def head(self, request: Request, format=None) -> Response:
+    async def head(self, request: Request, format=None) -> Response:
         queryset = self.get_queryset()
-        count = queryset.count()
+        count = await queryset.acount()
         return Response(headers={"X-Result-Count": count})
 
-    def get(self, request: Request, format=None) -> Response:
+    async def get(self, request: Request, format=None) -> Response:
         queryset = self.get_queryset()
-        count = queryset.count()
-        serializer = self.OutputSerializer(queryset, many=True)
+        count = await queryset.acount()
+        rows = queryset.values_list(*export.PROJECT_FIELDS)
+        data = export.dump_projects([row async for row in rows])
         headers = {"X-Result-Count": count}
-        return Response(data=serializer.data, headers=headers)
+        return Response(data=data, headers=headers)
 
     def post(self, request: Request, format=None) -> Response:
         serializer = self.InputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         project = services.create_project(**serializer.validated_data)
+        project = self.get_queryset().get(pk=project.pk)
         return Response(
             data=self.OutputSerializer(project).data,
             status=status.HTTP_201_CREATED,
@@ -193,11 +218,10 @@ class ProjectList(BaseAPIView):
 
 
 class ProjectDetail(BaseAPIView):
-    class OutputSerializer(ModelSerializer):
-        num_records = SerializerMethodField()
+    conditional_get = True
 
-        def get_num_records(self, obj):
-            return obj.records.count()
+    class OutputSerializer(ModelSerializer):
+        num_records = IntegerField(read_only=True)
 
         class Meta:
             model = Project
@@ -224,10 +248,12 @@ class ProjectDetail(BaseAPIView):
         slug = CharField(required=False)
         description = CharField(required=False)
 
+    def get_queryset(self):
+        return Project.objects.filter(category__user=self.request.user)
+
     def get_object(self):
         obj = get_object_or_404(
-            Project.objects.filter(category__user=self.request.user).all(),
-            pk=self.kwargs["pk"],
+            self.get_queryset().with_num_records(), pk=self.kwargs["pk"]
         )
         self.check_object_permissions(self.request, obj)
         return obj
@@ -242,33 +268,37 @@ class ProjectDetail(BaseAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def put(self, request: Request, pk: int, format=None) -> Response:
-        project = self.get_object()
-        serializer = self.InputSerializer(project, data=request.data)
+        serializer = self.InputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            project = services.update_project(
-                pk=pk, **serializer.validated_data
+            services.update_project(
+                pk=pk,
+                queryset=self.get_queryset(),
+                **serializer.validated_data,
             )
         except Project.DoesNotExist:
             raise Http404  # pylint: disable=raise-missing-from
-        return Response(data=self.OutputSerializer(project).data)
+        return Response(data=self.OutputSerializer(self.get_object()).data)
 
     def patch(self, request: Request, pk: int, format=None) -> Response:
-        project = self.get_object()
-        serializer = self.PartialInputSerializer(project, data=request.data)
+        serializer = self.PartialInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            project = services.patch_project(
-                pk=pk, **serializer.validated_data
+            services.patch_project(
+                pk=pk,
+                queryset=self.get_queryset(),
+                **serializer.validated_data,
             )
         except Project.DoesNotExist:
             raise Http404  # pylint: disable=raise-missing-from
-        return Response(data=self.OutputSerializer(project).data)
+        return Response(data=self.OutputSerializer(self.get_object()).data)
+
 
+class TimeRecordList(BaseAsyncAPIView):
+    conditional_get = True
 
-class TimeRecordList(BaseAPIView):
     class OutputSerializer(Serializer):
         id = IntegerField()
         project = PrimaryKeyRelatedField(queryset=Project.objects.all())
@@ -283,21 +313,100 @@ class TimeRecordList(BaseAPIView):
         stop_time = DateTimeField(required=False, allow_null=True)
         approved = BooleanField(required=False)
 
+    class FilterSerializer(Serializer):
+        start = DateTimeField(required=False)
+        end = DateTimeField(required=False)
+        project = IntegerField(required=False)
+        category = IntegerField(required=False)
+        approved = BooleanField(required=False, allow_null=True, default=None)
+
+    class SelectionSerializer(Serializer):
+        ids = ListField(
+            child=IntegerField(),
+            required=False,
+            max_length=settings.BULK_MAX_RECORDS,
+        )
+        all = BooleanField(required=False, default=False)
+
+    class BulkUpdateSerializer(SelectionSerializer):
+        project = PrimaryKeyRelatedField(
+            queryset=Project.objects.select_related("category"),
+            required=False,
+        )
+        approved = BooleanField(required=False)
+
+        def validate_project(self, project):
+            if project.category.user_id != self.context["request"].user.pk:
+                raise ValidationError(f"Unknown project {project.pk}")
+            return project
+
+        def validate(self, attrs):
+            if "project" not in attrs and "approved" not in attrs:
+                raise ValidationError("Nothing to update")
+            return attrs
+
+    pagination_class = KeysetPagination
+    ordering = ("start_time", "id")
+
     def get_queryset(self):
         return (
             TimeRecord.objects.filter(
                 project__category__user=self.request.user
             )
             .all()
-            .order_by("start_time")
+            .order_by(*self.ordering)
         )
 
-    def get(self, request: Request, format=None) -> Response:
-        queryset = self.get_queryset()
-        count = queryset.count()
-        serializer = self.OutputSerializer(queryset, many=True)
-        headers = {"X-Result-Count": count}
-        return Response(data=serializer.data, headers=headers)
+    def filter_queryset(self, queryset):
+        """Narrow down the records with the filters in the query string.
+
+        ``start`` and ``end`` select records that started within the
+        half-open interval ``[start, end)``.
+        """
+        serializer = self.FilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+
+        if "start" in filters:
+            queryset = queryset.filter(start_time__gte=filters["start"])
+        if "end" in filters:
+            queryset = queryset.filter(start_time__lt=filters["end"])
+        if "project" in filters:
+            queryset = queryset.filter(project=filters["project"])
+        if "category" in filters:
+            queryset = queryset.filter(project__category=filters["category"])
+        if filters.get("approved") is not None:
+            queryset = queryset.filter(approved=filters["approved"])
+
+        return queryset
+
+    def get_selected_queryset(self, selection):
+        """Select the records a bulk update or delete applies to.
+
+        Records are selected by the ``ids`` in the request body, otherwise
+        by the same filters as the listing. Selecting all records of the
+        user requires passing ``all`` explicitly.
+        """
+        queryset = self.get_queryset().order_by()
+
+        if selection.get("ids") is not None:
+            return queryset.filter(pk__in=selection["ids"])
+
+        filters = self.FilterSerializer().fields
+        if not selection["all"] and not any(
+            name in self.request.query_params for name in filters
+        ):
+            raise ValidationError(
+                "Select the records with ids, with filters or with all"
+            )
+
+        return self.filter_queryset(queryset)
+
+    async def get(self, request: Request, format=None) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*export.TIME_RECORD_FIELDS, named=True)
+        page = await self.apaginate_queryset(rows)
+        return self.get_paginated_response(export.dump_time_records(page))
 
     def post(self, request: Request, format=None) -> Response:
         serializer = self.InputSerializer(data=request.data)
@@ -310,8 +419,97 @@ class TimeRecordList(BaseAPIView):
             status=status.HTTP_201_CREATED,
         )
 
+    def patch(self, request: Request, format=None) -> Response:
+        serializer = self.BulkUpdateSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        queryset = self.get_selected_queryset(serializer.validated_data)
+        updated = services.update_records(
+            queryset,
+            project=serializer.validated_data.get("project"),
+            approved=serializer.validated_data.get("approved"),
+        )
+
+        return Response(data={"updated": updated})
+
+    def delete(self, request: Request, format=None) -> Response:
+        serializer = self.SelectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = self.get_selected_queryset(serializer.validated_data)
+        deleted = services.delete_records(queryset)
+
+        return Response(data={"deleted": deleted})
+
+
+class TimeRecordBulk(BaseAPIView):
+    class ItemSerializer(Serializer):
+        project = IntegerField()
+        start_time = DateTimeField()
+        stop_time = DateTimeField(required=False, allow_null=True)
+        approved = BooleanField(required=False)
+
+    class OutputSerializer(Serializer):
+        id = IntegerField()
+        project = PrimaryKeyRelatedField(queryset=Project.objects.all())
+        start_time = DateTimeField()
+        stop_time = DateTimeField(allow_null=True)
+        total_seconds = IntegerField()
+        approved = BooleanField()
+
+    def post(self, request: Request, format=None) -> Response:
+        """Create the list of records in the request body.
+
+        Every item is validated separately, the valid records are created
+        and the response holds one result per item, in the same order. The
+        response status is 207 when only some of the records were created.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError("Expected a list of records")
+        if len(items) > settings.BULK_MAX_RECORDS:
+            raise ValidationError(
+                f"At most {settings.BULK_MAX_RECORDS} records are accepted"
+            )
+
+        results: list[dict | None] = [None] * len(items)
+        valid = []
+
+        item_serializer = self.ItemSerializer()
+        for i, item in enumerate(items):
+            try:
+                valid.append((i, item_serializer.run_validation(item)))
+            except ValidationError as exc:
+                results[i] = {"status": 400, "errors": exc.detail}
+
+        created = services.create_records(
+            user=request.user, records=[data for _, data in valid]
+        )
+        for (i, _), result in zip(valid, created):
+            if isinstance(result, DjangoValidationError):
+                results[i] = {"status": 400, "errors": result.message_dict}
+            else:
+                results[i] = {
+                    "status": 201,
+                    "record": self.OutputSerializer(result).data,
+                }
+
+        num_created = sum(1 for r in created if isinstance(r, TimeRecord))
+        if num_created == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif num_created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(data=results, status=response_status)
+
 
 class TimeRecordDetail(BaseAPIView):
+    conditional_get = True
+
     class OutputSerializer(ModelSerializer):
         class Meta:
             model = TimeRecord
@@ -339,13 +537,13 @@ class TimeRecordDetail(BaseAPIView):
         stop_time = DateTimeField(required=False, allow_null=True)
         approved = BooleanField(required=False)
 
-    def get_object(self):
-        obj = get_object_or_404(
-            TimeRecord.objects.filter(
-                project__category__user=self.request.user
-            ).all(),
-            pk=self.kwargs["pk"],
+    def get_queryset(self):
+        return TimeRecord.objects.filter(
+            project__category__user=self.request.user
         )
+
+    def get_object(self):
+        obj = get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
         self.check_object_permissions(self.request, obj)
         return obj
 
@@ -359,30 +557,293 @@ class TimeRecordDetail(BaseAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def put(self, request: Request, pk: int, format=None) -> Response:
-        record = self.get_object()
-        serializer = self.InputSerializer(record, data=request.data)
+        serializer = self.InputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            record = services.update_record(pk=pk, **serializer.validated_data)
+            record = services.update_record(
+                pk=pk,
+                queryset=self.get_queryset(),
+                **serializer.validated_data,
+            )
         except TimeRecord.DoesNotExist:
             raise Http404  # pylint: disable=raise-missing-from
 
         return Response(data=self.OutputSerializer(record).data)
 
     def patch(self, request: Request, pk: int, format=None) -> Response:
-        record = self.get_object()
-        serializer = self.PartialInputSerializer(record, data=request.data)
+        serializer = self.PartialInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            record = services.patch_record(pk=pk, **serializer.validated_data)
+            record = services.patch_record(
+                pk=pk,
+                queryset=self.get_queryset(),
+                **serializer.validated_data,
+            )
         except TimeRecord.DoesNotExist:
             raise Http404  # pylint: disable=raise-missing-from
 
         return Response(data=self.OutputSerializer(record).data)
 
 
+class ReportSummary(BaseAPIView):
+    """Total time spent, grouped by project, category and/or period.
+
+    Totals are computed by the database, so the size of the response only
+    depends on the number of groups and not on the number of records.
+    Records that are still running are not included.
+    """
+
+    conditional_get = True
+
+    class InputSerializer(Serializer):
+        start = DateTimeField(required=False)
+        end = DateTimeField(required=False)
+        group_by = CharField(required=False, default="project")
+
+        def validate_group_by(self, value):
+            group_by = [v.strip() for v in value.split(",") if v.strip()]
+            unknown = set(group_by) - set(ReportSummary.groupings)
+            if unknown or not group_by:
+                raise ValidationError(
+                    "Must be a comma separated list of: %s"
+                    % ", ".join(ReportSummary.groupings)
+                )
+            return list(dict.fromkeys(group_by))
+
+    class OutputSerializer(Serializer):
+        project = IntegerField(required=False)
+        category = IntegerField(required=False)
+        day = DateField(required=False)
+        week = DateField(required=False)
+        month = DateField(required=False)
+        total_seconds = IntegerField()
+        num_records = IntegerField()
+
+    groupings = {
+        "project": "project",
+        "category": F("project__category"),
+        "day": TruncDay,
+        "week": TruncWeek,
+        "month": TruncMonth,
+    }
+
+    def get_queryset(self):
+        return TimeRecord.objects.filter(
+            project__category__user=self.request.user,
+            stop_time__isnull=False,
+        )
+
+    def get_data(self, start=None, end=None, group_by=("project",)):
+        queryset = self.get_queryset()
+        if start is not None:
+            queryset = queryset.filter(start_time__gte=start)
+        if end is not None:
+            queryset = queryset.filter(start_time__lt=end)
+
+        tzinfo = timezone.get_current_timezone()
+        fields, expressions = [], {}
+        for name in group_by:
+            grouping = self.groupings[name]
+            if isinstance(grouping, str):
+                fields.append(grouping)
+            elif isinstance(grouping, F):
+                expressions[name] = grouping
+            else:
+                expressions[name] = grouping("start_time", tzinfo=tzinfo)
+
+        rows = (
+            queryset.values(*fields, **expressions)
+            .annotate(
+                duration=Sum(
+                    F("stop_time") - F("start_time"),
+                    output_field=DurationField(),
+                ),
+                num_records=Count("id"),
+            )
+            .order_by(*group_by)
+        )
+
+        for row in rows:
+            for name in {"day", "week", "month"} & set(row):
+                row[name] = timezone.localtime(row[name], tzinfo).date()
+            row["total_seconds"] = int(row.pop("duration").total_seconds())
+            yield row
+
+    def get(self, request: Request, format=None) -> Response:
+        serializer = self.InputSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        data = list(self.get_data(**serializer.validated_data))
+        return Response(
+            data=self.OutputSerializer(data, many=True).data,
+            headers={"X-Result-Count": len(data)},
+        )
+
+
+class ReportDaily(BaseAPIView):
+    """Time spent per project and day.
+
+    Days are calendar days in ``settings.TIME_ZONE``, records crossing
+    midnight count towards every day they cover. The totals are maintained
+    as records are written, so a month only takes one indexed row per
+    project and day. Records that are still running are not included.
+    """
+
+    conditional_get = True
+
+    class InputSerializer(Serializer):
+        start = DateField(required=False)
+        end = DateField(required=False)
+        project = IntegerField(required=False)
+
+    class OutputSerializer(Serializer):
+        project = IntegerField()
+        day = DateField()
+        total_seconds = IntegerField()
+        num_records = IntegerField()
+
+    def get_queryset(self):
+        return DailyProjectTotal.objects.filter(
+            project__category__user=self.request.user
+        )
+
+    def get_data(self, start=None, end=None, project=None):
+        queryset = self.get_queryset()
+        if start is not None:
+            queryset = queryset.filter(day__gte=start)
+        if end is not None:
+            queryset = queryset.filter(day__lt=end)
+        if project is not None:
+            queryset = queryset.filter(project=project)
+
+        rows = queryset.order_by("day", "project").values(
+            "project", "day", "duration", "num_records"
+        )
+        for row in rows:
+            row["total_seconds"] = int(row.pop("duration").total_seconds())
+            yield row
+
+    def get(self, request: Request, format=None) -> Response:
+        serializer = self.InputSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        data = list(self.get_data(**serializer.validated_data))
+        return Response(
+            data=self.OutputSerializer(data, many=True).data,
+            headers={"X-Result-Count": len(data)},
+        )
+
+
+class ChangeList(BaseAPIView):
+    """Changes to the data of the user after the sequence ``since``.
+
+    Every change carries the current state of the row as the listings
+    return it, or ``null`` if the row has been deleted since. Clients pass
+    the returned ``sequence`` back as ``since`` to fetch the next changes,
+    until ``more`` is false.
+
+    ``reset`` means the changes after ``since`` are no longer available,
+    because they have been purged or all data has been replaced. The client
+    then has to reload all data and continue from the returned
+    ``sequence``.
+    """
+
+    conditional_get = True
+
+    class InputSerializer(Serializer):
+        since = IntegerField(min_value=0, default=0)
+
+    class OutputSerializer(Serializer):
+        class ChangeOutputSerializer(Serializer):
+            sequence = IntegerField()
+            resource = CharField()
+            id = IntegerField(source="object_id", allow_null=True)
+            action = CharField()
+            data = DictField(allow_null=True)
+
+        sequence = IntegerField()
+        reset = BooleanField()
+        more = BooleanField()
+        changes = ChangeOutputSerializer(many=True)
+
+    def get_resources(self):
+        user = self.request.user
+        return {
+            ChangeLogEntry.Resource.CATEGORY: (
+                Category.objects.filter(user=user).with_num_records(),
+                CategoryList.OutputSerializer,
+            ),
+            ChangeLogEntry.Resource.PROJECT: (
+                Project.objects.filter(category__user=user).with_num_records(),
+                ProjectList.OutputSerializer,
+            ),
+            ChangeLogEntry.Resource.RECORD: (
+                TimeRecord.objects.filter(project__category__user=user),
+                TimeRecordList.OutputSerializer,
+            ),
+        }
+
+    def get_data(self, since: int) -> dict:
+        first, last = changelog.bounds(self.request.user.pk)
+        page_size = settings.CHANGES_PAGE_SIZE
+        entries = list(
+            ChangeLogEntry.objects.filter(
+                user=self.request.user, sequence__gt=since
+            ).order_by("sequence")[: page_size + 1]
+        )
+
+        if (
+            (last is None and since > 0)
+            or (
+                first is not None
+                and last is not None
+                and not first - 1 <= since <= last
+            )
+            or (entries and entries[0].action == ChangeLogEntry.Action.RESET)
+        ):
+            return {
+                "sequence": last or 0,
+                "reset": True,
+                "more": False,
+                "changes": [],
+            }
+
+        more = len(entries) > page_size
+        entries = entries[:page_size]
+
+        ids = defaultdict(set)
+        for entry in entries:
+            ids[entry.resource].add(entry.object_id)
+
+        data = {}
+        for resource, (queryset, serializer) in self.get_resources().items():
+            if ids[resource]:
+                objects = queryset.filter(pk__in=ids[resource])
+                data[resource] = {
+                    item["id"]: item
+                    for item in serializer(objects, many=True).data
+                }
+
+        for entry in entries:
+            entry.data = data.get(entry.resource, {}).get(entry.object_id)
+
+        return {
+            "sequence": entries[-1].sequence if entries else since,
+            "reset": False,
+            "more": more,
+            "changes": entries,
+        }
+
+    def get(self, request: Request, format=None) -> Response:
+        serializer = self.InputSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        data = self.get_data(**serializer.validated_data)
+        return Response(data=self.OutputSerializer(data).data)
+
+
 class ConfigView(BaseAPIView):
     class InputSerializer(Serializer):
         class CategoryInputSerializer(CategoryList.InputSerializer):
@@ -418,16 +879,12 @@ class ConfigView(BaseAPIView):
         projects = ProjectOutputSerializer(many=True)
         time_records = TimeRecordOutputSerializer(many=True)
 
-    def get_serialized(self):
-        config = {
-            "categories": Category.objects.order_by("id"),
-            "projects": Project.objects.order_by("id"),
-            "time_records": TimeRecord.objects.order_by("id"),
-        }
-        return self.OutputSerializer(config).data
-
     def get(self, request: Request, format="json"):
-        return Response(data=self.get_serialized())
+        if request.query_params.get("stream", "").lower() in {"1", "true"}:
+            return StreamingHttpResponse(
+                export.iter_config_json(), content_type="application/json"
+            )
+        return Response(data=RawJSON(b"".join(export.iter_config_json())))
 
     @transaction.atomic
     def put(self, request: Request, format="json"):
@@ -1,9 +1,62 @@
+"""Import the projects and time records from Kronos into Hydra.
+
+The Kronos records are pushed to Hydra's bulk endpoint in batches, several
+batches at a time, over a pooled HTTP session. Requests which the server
+didn't process (429 and 503 responses, and connections which couldn't be
+established) are retried with an exponential backoff. Reads and deletes are
+idempotent, so they are also retried after 502 and 504 responses and lost
+connections. Posts are not: the server may have created the records before
+the connection broke, and posting them again would create duplicates.
+
+The number of imported records is written to a checkpoint file after every
+batch. If the import is interrupted, run it again with ``--resume`` to pick up
+after the last checkpoint instead of starting over.
+"""
 import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+# Responses telling that the request wasn't processed
+RETRY_STATUS = {429, 503}
+# Responses of a proxy which may or may not have forwarded the request
+RETRY_IDEMPOTENT_STATUS = {502, 504}
+IDEMPOTENT_METHODS = {"get", "head", "put", "delete"}
+
+
+class ImportFailed(Exception):
+    pass
 
 
-def main():
+class Stats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.batches = 0
+        self.created = 0
+        self.rejected = 0
+        self.skipped = 0
+        self.retries = 0
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.created / elapsed if elapsed else 0
+        return (
+            f"Imported {self.created} records in {self.batches} batches "
+            f"in {elapsed:.1f}s ({rate:,.0f} records/s), "
+            f"{self.rejected} rejected, {self.skipped} skipped, "
+            f"{self.retries} retries"
+        )
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--project", help="Name of default project", default="Default")
     parser.add_argument(
@@ -20,76 +73,312 @@ def main():
     )
     parser.add_argument("--username", required=True)
     parser.add_argument("--password", required=True)
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Records per request"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Number of concurrent requests"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=5, help="Attempts per request before giving up"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=".import_kronos.json",
+        help="File keeping track of the imported records",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted import from the checkpoint",
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    resp = requests.post(
+    session = create_session(args.concurrency)
+    stats = Stats()
+
+    resp = request(
+        session,
+        "post",
         args.output_url + "/v1/auth/login/",
+        retries=args.retries,
+        stats=stats,
         json={"username": args.username, "password": args.password},
     )
-    resp.raise_for_status()
-    token = resp.json()["auth_token"]
+    session.headers["authorization"] = f"Token {resp.json()['auth_token']}"
+    # Authenticate with the token only, the session would require a CSRF token
+    session.cookies.clear()
+
+    id_map = create_projects(session, args, stats)
+    records = list(read_records(session, args, id_map, stats))
+
+    offset = 0
+    if args.resume:
+        offset = resume_offset(records, load_checkpoint(args.checkpoint, args))
+        if offset < len(records):
+            # Batches after the checkpoint may have been imported partially
+            # or out of order, remove them before importing them again.
+            clear_records(session, args, stats, start=records[offset]["start_time"])
+    else:
+        clear_records(session, args, stats)
+
+    try:
+        import_records(session, args, records, offset, stats)
+    finally:
+        print(stats.summary())
+
 
+def create_session(concurrency):
     session = requests.Session()
-    session.headers = {"authorization": f"Token {token}"}
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-    # Populate the project id_map
-    id_map = {}
-    resp = session.get(args.output_url + "/v1/categories/")
-    resp.raise_for_status()
-    for project in resp.json():
-        id_map[project["name"]] = project["id"]
 
-    # Fetch list of projects from Kronos
-    resp = requests.get(args.input_url + "/api/projects")
-    resp.raise_for_status()
-    projects = resp.json()
+def request(session, method, url, retries, stats, accept=(), **kwargs):
+    """Send a request, retrying the ones the server didn't process.
+
+    Raises on error responses, except for the status codes in ``accept``.
+    """
+    idempotent = method.lower() in IDEMPOTENT_METHODS
+    retry_status = RETRY_STATUS | (RETRY_IDEMPOTENT_STATUS if idempotent else set())
+
+    for attempt in range(retries):
+        try:
+            resp = session.request(method, url, timeout=(10, 300), **kwargs)
+        except requests.ConnectionError as exc:
+            if not (idempotent or not_sent(exc)):
+                raise ImportFailed(
+                    f"{method.upper()} {url} failed ({exc}), it may have been "
+                    "processed and is not retried"
+                ) from exc
+            error = exc
+        else:
+            if resp.status_code not in retry_status:
+                if resp.status_code not in accept:
+                    resp.raise_for_status()
+                return resp
+            error = requests.HTTPError(f"{resp.status_code} for {url}", response=resp)
+
+        if attempt + 1 < retries:
+            delay = min(0.5 * 2**attempt, 30) * random.uniform(0.5, 1.5)
+            print(f"{method.upper()} {url} failed ({error}), retrying in {delay:.1f}s")
+            stats.retries += 1
+            time.sleep(delay)
 
+    raise ImportFailed(f"{method.upper()} {url} failed {retries} times") from error
+
+
+def not_sent(exc):
+    """Whether a connection error happened before the request was sent."""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    # Refused connections and failed name lookups are NewConnectionErrors
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def create_projects(session, args, stats):
+    """Make sure every Kronos project exists, return slug -> project id."""
+    categories = request(
+        session, "get", args.output_url + "/v1/categories/", args.retries, stats
+    ).json()
+    projects = request(
+        session, "get", args.output_url + "/v1/projects/", args.retries, stats
+    ).json()
+
+    category_names = {c["id"]: c["name"] for c in categories}
+    id_map = {}
     for project in projects:
+        if project["name"] == args.project:
+            id_map[category_names[project["category"]]] = project["id"]
+
+    kronos_projects = request(
+        session, "get", args.input_url + "/api/projects", args.retries, stats
+    ).json()
+
+    category_ids = {name: pk for pk, name in category_names.items()}
+    for project in kronos_projects:
         category_name = project["slug"]
 
         if category_name in id_map:
             continue
 
-        body = {
-            "name": category_name,
-            "description": project["description"],
-        }
-        resp = session.post(args.output_url + "/v1/categories/", json=body)
-
-        if resp.status_code == 201:
-            resp = session.post(
-                args.output_url + "/v1/projects/",
-                json={
-                    "name": args.project,
-                    "description": "Created by import script",
-                    "category": resp.json()["id"],
-                },
+        if category_name not in category_ids:
+            resp = request(
+                session,
+                "post",
+                args.output_url + "/v1/categories/",
+                args.retries,
+                stats,
+                json={"name": category_name, "description": project["description"]},
             )
+            category_ids[category_name] = resp.json()["id"]
+
+        resp = request(
+            session,
+            "post",
+            args.output_url + "/v1/projects/",
+            args.retries,
+            stats,
+            json={
+                "name": args.project,
+                "description": "Created by import script",
+                "category": category_ids[category_name],
+            },
+        )
+        id_map[category_name] = resp.json()["id"]
+
+    return id_map
 
-            if resp.status_code == 201:
-                id_map[category_name] = resp.json()["id"]
 
-    # Clean out existing records
-    resp = session.get(args.output_url + "/v1/records/")
-    resp.raise_for_status()
-    for record in resp.json():
-        session.delete(args.output_url + f"/v1/records/{record['id']}")
+def read_records(session, args, id_map, stats):
+    """Yield the Kronos records mapped to Hydra records, oldest first.
+
+    The Kronos API has no paging, so the list is fetched at once and then
+    mapped record by record.
+    """
+    resp = request(session, "get", args.input_url + "/api/records", args.retries, stats)
 
-    # Insert new records from Kronos
-    resp = requests.get(args.input_url + "/api/records")
-    resp.raise_for_status()
     for record in reversed(resp.json()):
-        body = {
+        if record["startTime"] is None or record["stopTime"] is None:
+            stats.skipped += 1
+            continue
+
+        yield {
             "project": id_map[record["project"]],
             "start_time": record["startTime"],
             "stop_time": record["stopTime"],
         }
 
-        if record["startTime"] is None or record["stopTime"] is None:
+
+def clear_records(session, args, stats, start=None):
+    """Delete the records in Hydra, or only those started at ``start`` or later."""
+    url, body = args.output_url + "/v1/records/", {"all": True}
+    if start is not None:
+        url, body = url + "?" + urlencode({"start": start}), {}
+
+    resp = request(session, "delete", url, args.retries, stats, json=body)
+    print(f"Deleted {resp.json()['deleted']} existing records")
+
+
+def import_records(session, args, records, offset, stats):
+    """Push ``records[offset:]`` in batches with bounded concurrency.
+
+    The checkpoint only advances over the batches which completed without
+    a gap before them, so resuming never skips a batch.
+    """
+    url = args.output_url + "/v1/records/bulk/"
+    batches = [
+        (start, records[start : start + args.batch_size])
+        for start in range(offset, len(records), args.batch_size)
+    ]
+    print(f"Importing {len(records) - offset} records in {len(batches)} batches")
+
+    def push(batch):
+        # A 400 response holds the errors when all records were rejected
+        resp = request(
+            session, "post", url, args.retries, stats, accept={400}, json=batch
+        )
+        results = resp.json()
+        if not isinstance(results, list):
+            raise ImportFailed(f"Batch rejected: {results}")
+        return [r for r in results if r["status"] != 201]
+
+    done = {}
+    pending = {}
+    checkpoint = offset
+
+    def wait_for_batch():
+        nonlocal checkpoint
+        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+        error = collect(finished, pending, done, stats)
+
+        while checkpoint in done:
+            checkpoint += done.pop(checkpoint)
+        save_checkpoint(args.checkpoint, args, checkpoint)
+
+        if error is not None:
+            raise error
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        try:
+            for start, batch in batches:
+                if len(pending) >= args.concurrency:
+                    wait_for_batch()
+                pending[executor.submit(push, batch)] = (start, len(batch))
+
+            while pending:
+                wait_for_batch()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            print(f"Import interrupted, resume with --resume from record {checkpoint}")
+            raise
+
+    if os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+
+def collect(finished, pending, done, stats):
+    """Record the results of the finished batches, return the first error."""
+    error = None
+    for future in finished:
+        start, size = pending.pop(future)
+        try:
+            rejected = future.result()
+        except Exception as exc:  # pylint: disable=broad-except
+            error = error or exc
             continue
 
-        session.post(args.output_url + "/v1/records/", json=body).raise_for_status()
+        for result in rejected:
+            print(f"Rejected record: {result['errors']}", file=sys.stderr)
+
+        stats.batches += 1
+        stats.created += size - len(rejected)
+        stats.rejected += len(rejected)
+        done[start] = size
+
+    return error
+
+
+def load_checkpoint(path, args):
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0
+
+    if checkpoint["output_url"] != args.output_url:
+        raise ImportFailed(
+            f"{path} belongs to an import into {checkpoint['output_url']}"
+        )
+
+    return checkpoint["records"]
+
+
+def save_checkpoint(path, args, records):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"output_url": args.output_url, "records": records}, f)
+    os.replace(tmp, path)
+
+
+def resume_offset(records, offset):
+    """Move the offset back to the first record sharing its start time.
+
+    Those records are removed before resuming, and are imported again.
+    """
+    offset = min(offset, len(records))
+    if offset == len(records):
+        return offset
+
+    start_time = records[offset]["start_time"]
+    while offset > 0 and records[offset - 1]["start_time"] == start_time:
+        offset -= 1
+    return offset
 
 
 if __name__ == "__main__":
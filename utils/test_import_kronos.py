@@ -0,0 +1,208 @@
+"""Tests of the Kronos importer against a local stub of both APIs.
+
+Run with ``pytest utils``.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+import import_kronos
+import pytest
+import requests
+
+
+class Stub:
+    """In-memory Kronos and Hydra APIs, served on the same address."""
+
+    def __init__(self, num_records):
+        self.kronos_projects = [{"slug": "alpha", "description": "Alpha"}]
+        # Kronos lists the newest records first
+        self.kronos_records = [
+            {
+                "project": "alpha",
+                "startTime": f"2022-01-01T00:{i // 60:02}:{i % 60:02}Z",
+                "stopTime": f"2022-01-01T01:{i // 60:02}:{i % 60:02}Z",
+            }
+            for i in reversed(range(num_records))
+        ]
+        self.categories = []
+        self.projects = []
+        self.records = []
+        self.batches = []
+        self.deletes = []
+        # What to do with the next bulk posts: a status code to answer
+        # with, or "drop" to process the batch and close the connection
+        self.bulk_failures = []
+        self.lock = threading.Lock()
+
+    def handle(self, method, url, body):
+        path = urlsplit(url).path
+        if (method, path) == ("POST", "/v1/auth/login/"):
+            return 200, {"auth_token": "token"}
+        if path == "/api/projects":
+            return 200, self.kronos_projects
+        if path == "/api/records":
+            return 200, self.kronos_records
+        if path == "/v1/categories/":
+            if method == "GET":
+                return 200, self.categories
+            self.categories.append({"id": len(self.categories) + 1, **body})
+            return 201, self.categories[-1]
+        if path == "/v1/projects/":
+            if method == "GET":
+                return 200, self.projects
+            self.projects.append({"id": len(self.projects) + 1, **body})
+            return 201, self.projects[-1]
+        if (method, path) == ("DELETE", "/v1/records/"):
+            return 200, {"deleted": self.delete(url)}
+        if (method, path) == ("POST", "/v1/records/bulk/"):
+            return self.bulk(body)
+        return 404, {"detail": "Not found."}
+
+    def delete(self, url):
+        start = parse_qs(urlsplit(url).query).get("start")
+        self.deletes.append(start[0] if start else None)
+        kept = [r for r in self.records if start and r["start_time"] < start[0]]
+        deleted, self.records = len(self.records) - len(kept), kept
+        return deleted
+
+    def bulk(self, batch):
+        failure = self.bulk_failures.pop(0) if self.bulk_failures else None
+        if isinstance(failure, int):
+            return failure, {"detail": "Unavailable"}
+
+        self.batches.append(len(batch))
+        self.records.extend(batch)
+        if failure == "drop":
+            return None, None
+        return 200, [{"status": 201} for _ in batch]
+
+
+@pytest.fixture
+def stub():
+    return Stub(num_records=25)
+
+
+@pytest.fixture
+def server(stub):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            with stub.lock:
+                status, data = stub.handle(self.command, self.path, body)
+            if status is None:
+                self.close_connection = True
+                return
+
+            content = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_DELETE = _handle
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(import_kronos.time, "sleep", lambda delay: None)
+
+
+def _import(server, tmp_path, *args):
+    import_kronos.main(
+        [
+            "--username=user",
+            "--password=secret",
+            f"--input-url={server}",
+            f"--output-url={server}",
+            f"--checkpoint={tmp_path / 'checkpoint.json'}",
+            "--batch-size=10",
+            "--concurrency=2",
+            "--retries=3",
+            *args,
+        ]
+    )
+
+
+def _start_times(records):
+    return sorted(r["start_time"] for r in records)
+
+
+def test_import_in_batches(stub, server, tmp_path, capsys):
+    _import(server, tmp_path)
+
+    assert sorted(stub.batches) == [5, 10, 10]
+    assert _start_times(stub.records) == _start_times(
+        {"start_time": r["startTime"]} for r in stub.kronos_records
+    )
+    assert stub.records[0]["project"] == stub.projects[0]["id"]
+    assert stub.deletes == [None]
+    assert not (tmp_path / "checkpoint.json").exists()
+    assert "Imported 25 records in 3 batches" in capsys.readouterr().out
+
+
+def test_retry_unprocessed_batch(stub, server, tmp_path, capsys):
+    stub.bulk_failures = [503, 429]
+
+    _import(server, tmp_path, "--concurrency=1")
+
+    assert stub.batches == [10, 10, 5]
+    assert len(stub.records) == 25
+    assert "2 retries" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("failure", [502, 504, "drop"])
+def test_batch_maybe_processed_not_retried(stub, server, tmp_path, failure):
+    stub.bulk_failures = [None, failure]
+
+    with pytest.raises((import_kronos.ImportFailed, requests.HTTPError)):
+        _import(server, tmp_path, "--concurrency=1", "--retries=5")
+
+    # The failed batch is never posted twice
+    assert len(stub.batches) == (2 if failure == "drop" else 1)
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert checkpoint["records"] == 10
+
+
+def test_resume(stub, server, tmp_path):
+    stub.bulk_failures = [None, "drop"]
+    with pytest.raises(import_kronos.ImportFailed):
+        _import(server, tmp_path, "--concurrency=1")
+    # The dropped batch was created anyway
+    assert len(stub.records) == 20
+
+    resumed_from = _start_times(stub.records)[10]
+
+    _import(server, tmp_path, "--resume")
+
+    # The batches after the checkpoint are cleared and imported again
+    assert stub.deletes == [None, resumed_from]
+    assert stub.batches[:2] == [10, 10]
+    assert sorted(stub.batches[2:]) == [5, 10]
+    assert len(stub.records) == 25
+    assert len({r["start_time"] for r in stub.records}) == 25
+    assert not (tmp_path / "checkpoint.json").exists()
+
+
+def test_request_retries_connections_not_established():
+    stats = import_kronos.Stats()
+    session = requests.Session()
+
+    with pytest.raises(import_kronos.ImportFailed, match="failed 3 times"):
+        # Nothing listens on the discard port
+        import_kronos.request(session, "post", "http://127.0.0.1:9/", 3, stats, json={})
+
+    assert stats.retries == 2